@@ -0,0 +1,36 @@
+import multiprocessing
+import os
+
+# Gunicorn settings, read automatically when gunicorn starts in this
+# directory (see Procfile).
+#
+# The site runs as an ASGI application (tale_of_talents/asgi.py) on uvicorn
+# workers: each worker process is one event loop. A request waiting on a slow
+# client, a media download or the moderation event stream costs a coroutine
+# instead of blocking the whole worker as it does with gunicorn's sync
+# workers. Synchronous code (templates, the cache, sync views) runs in
+# threads next to the loop, so a few processes per CPU are enough.
+#
+#   WEB_CONCURRENCY        worker processes (default: one per CPU, at least 2)
+#   GUNICORN_WORKER_CLASS  'sync' to fall back to WSGI:
+#                          GUNICORN_WORKER_CLASS=sync gunicorn tale_of_talents.wsgi
+#   PORT                   port to listen on (set by the platform)
+#
+# `manage.py benchmark_concurrency` compares both modes on the public pages.
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'uvicorn.workers.UvicornWorker')
+workers = int(os.environ.get('WEB_CONCURRENCY', max(2, multiprocessing.cpu_count())))
+
+# Seconds a worker may go without notifying the master before it is
+# restarted; event-loop workers notify while requests are in flight
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then so a slow leak cannot grow without bound
+max_requests = 2000
+max_requests_jitter = 200
+
+accesslog = '-'
+errorlog = '-'
@@ -0,0 +1,13 @@
+"""
+ASGI config for tale_of_talents project.
+
+Served by uvicorn workers under gunicorn, see gunicorn.conf.py.
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tale_of_talents.settings')
+
+application = get_asgi_application()
\ No newline at end of file
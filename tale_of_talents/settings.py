@@ -34,7 +34,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'talents.middleware.WhiteNoiseMiddleware',  # WhiteNoise with an async path for ASGI
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',  # Add this line
     'django.middleware.common.CommonMiddleware',
@@ -77,6 +77,15 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                # Wait for concurrent writers instead of failing with "database is locked"
+                'timeout': 20,
+            },
+            # A file rather than shared-cache memory, whose table locks fail at
+            # once instead of waiting: the concurrency tests need the timeout
+            'TEST': {
+                'NAME': BASE_DIR / 'test_db.sqlite3',
+            },
         }
     }
 
@@ -127,16 +136,40 @@ LOCALE_PATHS = [
 # Language cookie name
 LANGUAGE_COOKIE_NAME = 'django_language'
 
+# Sessions of anonymous visitors live in a signed cookie, those of logged-in
+# users in the database (see talents/sessions.py); flash messages always
+# travel in a signed cookie. Neither costs anonymous requests a query.
+SESSION_ENGINE = 'talents.sessions'
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [BASE_DIR / 'static']  # Do NOT include media here
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# CompressedManifestStaticFilesStorage that also rebuilds css/site.css from the
+# Tailwind classes used in STYLESHEET_CONTENT (see talents/stylesheet.py)
+STATICFILES_STORAGE = 'talents.storage.StylesheetManifestStorage'
+STYLESHEET_CONTENT = [
+    'templates/**/*.html',
+    'components/**/*.tsx',
+    'talents/forms.py',
+    'talents/templatetags/*.py',
+]
 
-# Media files (served by Django only in DEBUG=True; use object storage in prod)
+# Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploads are stored once per content hash and shared (see talents/storage.py)
+DEFAULT_FILE_STORAGE = 'talents.storage.ContentAddressedStorage'
+
+# How /media/ responses are sent once access is checked (see talents/media.py):
+# 'stream' (Django streams the file), 'nginx' (X-Accel-Redirect to an internal
+# location serving MEDIA_ROOT under MEDIA_ACCEL_PREFIX) or 'sendfile' (X-Sendfile).
+# nginx example:  location /protected-media/ { internal; alias /app/media/; }
+MEDIA_SERVE_MODE = os.environ.get('MEDIA_SERVE_MODE', 'stream')
+MEDIA_ACCEL_PREFIX = os.environ.get('MEDIA_ACCEL_PREFIX', '/protected-media/')
+
 # Security settings for production
 if not DEBUG:
     # Comment out SSL redirect for now as it can cause issues
@@ -146,6 +179,77 @@ if not DEBUG:
     SECURE_BROWSER_XSS_FILTER = True
     SECURE_CONTENT_TYPE_NOSNIFF = True
 
+# Cache shared by all workers on the node (public page fragments, see talents/caching.py)
+CACHES = {
+    # Per-process LRU in front of 'shared' (see talents/cache_backends.py)
+    'default': {
+        'BACKEND': 'talents.cache_backends.TieredCache',
+        'LOCATION': 'shared',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'LOCAL_MAX_ENTRIES': 1000,
+            'LOCAL_TIMEOUT': 60,
+        },
+    },
+    # Seen by every worker process on the host. FileBasedCache with a
+    # directory as LOCATION works here too.
+    'shared': {
+        'BACKEND': 'talents.cache_backends.SQLiteCache',
+        'LOCATION': os.path.join(os.environ.get('CACHE_DIR', str(BASE_DIR / '.cache')), 'cache.sqlite3'),
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+
+# Lifetime of cached fragments for anonymous visitors, in seconds, spread by
+# +/- PUBLIC_CACHE_JITTER so they do not all expire at once; a fragment being
+# computed holds its key for up to PUBLIC_CACHE_LOCK_SECONDS
+PUBLIC_CACHE_TIMEOUT = 300
+PUBLIC_CACHE_JITTER = 0.1
+PUBLIC_CACHE_LOCK_SECONDS = 10
+
+# Pagination (cursor based, see talents/pagination.py)
+TALENTS_PAGE_SIZE = 24
+MODERATOR_PAGE_SIZE = 50
+
+# Moderator work queue (see talents/queue.py): profiles handed out per claim
+# and how long a claim lasts before the profiles go back to the queue
+MODERATION_QUEUE_BATCH = 10
+MODERATION_LEASE_SECONDS = 15 * 60
+
+# Live moderation events (talents/events.py). The stream endpoint is async:
+# serve it with the ASGI app (tale_of_talents/asgi.py) so open connections
+# do not each hold a worker thread.
+MODERATION_EVENTS_POLL_SECONDS = 2
+MODERATION_EVENTS_HEARTBEAT_SECONDS = 15
+MODERATION_EVENTS_STREAM_SECONDS = 5 * 60
+
+# Upload limits per form field (see talents/uploads.py). Types are sniffed
+# from the file contents; max_pixels is width * height.
+TALENTS_UPLOAD_IMAGE_LIMITS = {
+    'max_size': 8 * 1024 * 1024,
+    'types': ['image/jpeg', 'image/png', 'image/webp'],
+    'max_pixels': 40_000_000,
+}
+TALENTS_UPLOAD_LIMITS = {
+    'profile_image': TALENTS_UPLOAD_IMAGE_LIMITS,
+    'image': TALENTS_UPLOAD_IMAGE_LIMITS,
+    'cv_file': {
+        'max_size': 10 * 1024 * 1024,
+        'types': ['application/pdf'],
+    },
+}
+# Bodies larger than this are refused before any of it is read
+TALENTS_UPLOAD_MAX_REQUEST_SIZE = 25 * 1024 * 1024
+
+# Resized copies of uploaded images (see talents/images.py)
+TALENTS_IMAGE_WIDTHS = [160, 320, 640, 1280]
+TALENTS_IMAGE_QUALITY = 80
+# Background threads per process resizing uploads (talents/images.py); 0 resizes after the commit, in the request
+TALENTS_IMAGE_WORKERS = 2
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
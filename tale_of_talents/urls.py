@@ -2,25 +2,25 @@
 URL configuration for tale_of_talents project.
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
-from django.views.static import serve
+
+from talents import media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('talents.urls')),
 ]
 
-# Static and media files handling
+# Media files: access checked, then handed to the proxy or streamed (see talents/media.py)
+urlpatterns += [
+    re_path(r'^%s(?P<path>.+)$' % settings.MEDIA_URL.lstrip('/'), media.serve, name='media'),
+]
+
+# Static files handling
 if settings.DEBUG:
-    # Development: Django serves static and media files
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    # Development: Django serves static files
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
     # Also serve from STATICFILES_DIRS
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.BASE_DIR / 'static')
-else:
-    # Production: Serve media files through static URLs
-    urlpatterns += [
-        path('media/<path:path>', serve, {'document_root': settings.MEDIA_ROOT}),
-    ]
\ No newline at end of file
+    urlpatterns += static(settings.STATIC_URL, document_root=settings.BASE_DIR / 'static')
\ No newline at end of file
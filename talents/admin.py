@@ -3,6 +3,7 @@ from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 from .models import TalentProfile, TalentPhoto, TalentVideo, ProfileUpdateHistory
+from . import caching, moderation, showcase
 
 @admin.register(TalentProfile)
 class TalentProfileAdmin(admin.ModelAdmin):
@@ -44,29 +45,29 @@ class TalentProfileAdmin(admin.ModelAdmin):
             return f"{obj.user.first_name} {obj.user.last_name}".strip()
     display_name.short_description = 'Display Name'
     
+    def moderate(self, request, queryset, action):
+        # Same transaction, history rows and counter updates as the moderator dashboard
+        ids = list(queryset.values_list('pk', flat=True))
+        outcomes = moderation.moderate(ids, action, request.user)
+        return sum(len(pks) for pks in outcomes.values())
+    
     def approve_profiles(self, request, queryset):
-        from django.utils import timezone
-        updated = queryset.update(
-            status='approved',
-            is_publicly_visible=True,
-            last_approved_at=timezone.now(),
-            approved_by=request.user
-        )
+        updated = self.moderate(request, queryset, 'approve')
         self.message_user(request, f'{updated} profiles have been approved.')
     approve_profiles.short_description = "Approve selected profiles"
     
     def reject_profiles(self, request, queryset):
-        updated = queryset.update(status='rejected', is_publicly_visible=False)
+        updated = self.moderate(request, queryset, 'reject')
         self.message_user(request, f'{updated} profiles have been rejected.')
     reject_profiles.short_description = "Reject selected profiles"
     
     def make_public(self, request, queryset):
-        updated = queryset.update(is_publicly_visible=True)
+        updated = self.moderate(request, queryset, 'make_public')
         self.message_user(request, f'{updated} profiles are now publicly visible.')
     make_public.short_description = "Make selected profiles public"
     
     def make_private(self, request, queryset):
-        updated = queryset.update(is_publicly_visible=False)
+        updated = self.moderate(request, queryset, 'make_private')
         self.message_user(request, f'{updated} profiles are now private.')
     make_private.short_description = "Make selected profiles private"
     
@@ -86,12 +87,16 @@ class TalentPhotoAdmin(admin.ModelAdmin):
     actions = ['approve_photos', 'reject_photos']
     
     def approve_photos(self, request, queryset):
+        talent_ids = list(queryset.values_list('talent_id', flat=True))
         updated = queryset.update(is_approved=True)
+        caching.invalidate(*(caching.profile_tag(pk) for pk in talent_ids))
         self.message_user(request, f'{updated} photos have been approved.')
     approve_photos.short_description = "Approve selected photos"
     
     def reject_photos(self, request, queryset):
+        talent_ids = list(queryset.values_list('talent_id', flat=True))
         updated = queryset.update(is_approved=False)
+        caching.invalidate(*(caching.profile_tag(pk) for pk in talent_ids))
         self.message_user(request, f'{updated} photos have been rejected.')
     reject_photos.short_description = "Reject selected photos"
 
@@ -103,12 +108,16 @@ class TalentVideoAdmin(admin.ModelAdmin):
     actions = ['approve_videos', 'reject_videos']
     
     def approve_videos(self, request, queryset):
+        talent_ids = list(queryset.values_list('talent_id', flat=True))
         updated = queryset.update(is_approved=True)
+        showcase.refresh_video_flags(talent_ids)
         self.message_user(request, f'{updated} videos have been approved.')
     approve_videos.short_description = "Approve selected videos"
     
     def reject_videos(self, request, queryset):
+        talent_ids = list(queryset.values_list('talent_id', flat=True))
         updated = queryset.update(is_approved=False)
+        showcase.refresh_video_flags(talent_ids)
         self.message_user(request, f'{updated} videos have been rejected.')
     reject_videos.short_description = "Reject selected videos"
 
@@ -117,7 +126,7 @@ class ProfileUpdateHistoryAdmin(admin.ModelAdmin):
     list_display = ['talent', 'updated_by', 'previous_status', 'new_status', 'updated_at']
     list_filter = ['previous_status', 'new_status', 'updated_at']
     search_fields = ['talent__public_id', 'updated_by__username']
-    readonly_fields = ['talent', 'updated_by', 'updated_at', 'previous_status', 'new_status', 'changes_summary']
+    readonly_fields = ['talent', 'updated_by', 'updated_at', 'previous_status', 'new_status', 'changes_summary', 'changed_fields']
     
     def has_add_permission(self, request):
         return False
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class TalentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'talents'
\ No newline at end of file
+    name = 'talents'
+
+    def ready(self):
+        from . import signals  # noqa: F401
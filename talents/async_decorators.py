@@ -0,0 +1,57 @@
+import datetime
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.utils.http import http_date
+
+# cache_control() and condition() for async views.
+#
+# The decorators in django.views.decorators only await the view from Django
+# 5.0 on; in 4.2 they call it synchronously and would patch the headers of a
+# coroutine. These behave like Django's. The ETag and Last-Modified functions
+# stay synchronous (they read the cache and request.user, which may query the
+# database) and run in a worker thread.
+
+
+def cache_control(**kwargs):
+    def decorator(view):
+        @wraps(view)
+        async def inner(request, *args, **view_kwargs):
+            response = await view(request, *args, **view_kwargs)
+            patch_cache_control(response, **kwargs)
+            return response
+        return inner
+    return decorator
+
+
+def _validators(request, etag_func, last_modified_func, args, kwargs):
+    etag = etag_func(request, *args, **kwargs) if etag_func else None
+    etag = quote_etag(etag) if etag is not None else None
+    last_modified = last_modified_func(request, *args, **kwargs) if last_modified_func else None
+    if last_modified:
+        if not timezone.is_aware(last_modified):
+            last_modified = timezone.make_aware(last_modified, datetime.timezone.utc)
+        last_modified = int(last_modified.timestamp())
+    return etag, last_modified or None
+
+
+def condition(etag_func=None, last_modified_func=None):
+    def decorator(view):
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            etag, last_modified = await sync_to_async(_validators)(
+                request, etag_func, last_modified_func, args, kwargs
+            )
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD'):
+                if last_modified and not response.has_header('Last-Modified'):
+                    response.headers['Last-Modified'] = http_date(last_modified)
+                if etag:
+                    response.headers.setdefault('ETag', etag)
+            return response
+        return inner
+    return decorator
@@ -0,0 +1,120 @@
+import posixpath
+from collections import Counter
+
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from . import caching, images
+from .models import ProfileRevision, StoredBlob, TalentPhoto, TalentProfile
+
+# Reference counts of stored uploads.
+#
+# Identical uploads share one file (see talents/storage.py), so a file can only
+# be deleted once no row points at it any more. The receivers in
+# talents/signals.py call apply_change() whenever a file field changes or a row
+# is deleted; rebuild() recounts everything from the tables.
+
+FILE_FIELDS = {
+    TalentProfile: ('profile_image', 'cv_file'),
+    TalentPhoto: ('image',),
+}
+# Fields whose files have resized variants (talents/images.py)
+IMAGE_FIELDS = {'profile_image', 'image'}
+
+
+def names_of(instance):
+    """{field: stored name} for the non-empty file fields of a row"""
+    names = {}
+    for field in FILE_FIELDS.get(type(instance), ()):
+        value = getattr(instance, field)
+        if value:
+            names[field] = value.name
+    return names
+
+
+def stored_names(model, pk):
+    """names_of() for the row as it currently is in the database"""
+    fields = FILE_FIELDS.get(model, ())
+    if not fields or pk is None:
+        return {}
+    row = model.objects.filter(pk=pk).values(*fields).first() or {}
+    return {field: name for field, name in row.items() if name}
+
+
+def _bump(name, delta):
+    """Add delta to the count of name and return the new count"""
+    if StoredBlob.objects.filter(name=name).update(refcount=F('refcount') + delta):
+        return StoredBlob.objects.filter(name=name).values_list('refcount', flat=True).first()
+    try:
+        with transaction.atomic():
+            StoredBlob.objects.create(name=name, refcount=delta)
+    except IntegrityError:
+        # Created concurrently by another writer
+        StoredBlob.objects.filter(name=name).update(refcount=F('refcount') + delta)
+    return StoredBlob.objects.filter(name=name).values_list('refcount', flat=True).first()
+
+
+def _release(name, has_variants, storage):
+    def delete():
+        # A new reference may have appeared since the count reached zero
+        if StoredBlob.objects.filter(name=name, refcount__gt=0).exists():
+            return
+        StoredBlob.objects.filter(name=name).delete()
+        if storage.exists(name):
+            storage.delete(name)
+        if has_variants:
+            images.delete_variants(name, storage)
+
+    transaction.on_commit(delete)
+
+
+def apply_change(old_names, new_names, storage=None):
+    """
+    Move references from old_names to new_names (both {field: name}) and
+    delete every file whose count drops to zero once the transaction commits.
+    """
+    storage = storage or default_storage
+    delta = Counter()
+    image_names = set()
+    for names, sign in ((old_names, -1), (new_names, 1)):
+        for field, name in names.items():
+            delta[name] += sign
+            if field in IMAGE_FIELDS:
+                image_names.add(name)
+    changed = {name: amount for name, amount in delta.items() if amount}
+    if not changed:
+        return
+    with transaction.atomic():
+        for name in sorted(changed):
+            if _bump(name, changed[name]) <= 0:
+                _release(name, name in image_names, storage)
+        # Who may download the file (talents/media.py)
+        caching.invalidate(*(caching.media_tag(posixpath.splitext(name)[0]) for name in changed))
+
+
+def references():
+    """Counter of stored name -> number of rows referencing it"""
+    counts = Counter()
+    for model, fields in FILE_FIELDS.items():
+        for row in model.objects.values_list(*fields).iterator():
+            counts.update(name for name in row if name)
+    # Files proposed by edits waiting for review (talents/revisions.py)
+    pending = ProfileRevision.objects.filter(status='pending').values_list('changes', flat=True)
+    for changes in pending.iterator():
+        counts.update(
+            change[1] for field, change in changes.items()
+            if field in ProfileRevision.FILE_FIELDS and change[1]
+        )
+    return counts
+
+
+def rebuild():
+    """Recount every reference from the tables"""
+    counts = references()
+    with transaction.atomic():
+        StoredBlob.objects.all().delete()
+        StoredBlob.objects.bulk_create(
+            StoredBlob(name=name, refcount=count) for name, count in counts.items()
+        )
+    return len(counts)
@@ -0,0 +1,297 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+# Cache backends that need no outside service.
+#
+# SQLiteCache is the shared tier: one SQLite file (WAL mode) that every worker
+# process of the host reads and writes, with expiry and culling done in SQL
+# and an atomic incr(). FileBasedCache works as the shared tier as well.
+#
+# TieredCache puts a bounded per-process LRU in front of a shared cache (another
+# CACHES alias). Reads are served from process memory when possible; writes
+# go to both tiers. An entry stays in the LRU for at most LOCAL_TIMEOUT
+# seconds, so a value changed by another process is seen again at the latest
+# after that. talents/caching.py only stores values under keys that embed
+# their tag versions (they never change once written) and reads the
+# versions, counters and locks from `.shared`, so invalidations are seen at
+# once. Entries pushed out of the LRU are counted per key prefix in
+# `.evictions` (talents/caching.py reports them).
+
+_MISSING = object()
+
+
+class SQLiteCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = location
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Autocommit; multi-statement writes open their own transaction
+            connection = sqlite3.connect(self._path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS cache_entry ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS cache_entry_expires ON cache_entry (expires)')
+            self._local.connection = connection
+        return connection
+
+    def _write(self, sql, key, value, timeout):
+        connection = self._connection()
+        now = time.time()
+        expires = self.get_backend_timeout(timeout)
+        if expires is not None and expires <= now:
+            # timeout <= 0: nothing to keep
+            connection.execute('DELETE FROM cache_entry WHERE key = ?', (key,))
+            return False
+        blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        written = connection.execute(sql, {'key': key, 'value': blob, 'expires': expires, 'now': now}).rowcount
+        self._cull(connection, now)
+        return bool(written)
+
+    def _cull(self, connection, now):
+        connection.execute('DELETE FROM cache_entry WHERE expires <= ?', (now,))
+        (count,) = connection.execute('SELECT COUNT(*) FROM cache_entry').fetchone()
+        if count > self._max_entries:
+            # Drop the entries closest to expiring (never-expiring ones last)
+            connection.execute(
+                'DELETE FROM cache_entry WHERE key IN ('
+                'SELECT key FROM cache_entry ORDER BY expires IS NULL, expires LIMIT ?)',
+                (max(count - self._max_entries, count // self._cull_frequency if self._cull_frequency else count),),
+            )
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._write(
+            'INSERT INTO cache_entry (key, value, expires) VALUES (:key, :value, :expires) '
+            'ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires = excluded.expires '
+            'WHERE cache_entry.expires <= :now',
+            key, value, timeout,
+        )
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._connection().execute(
+            'SELECT value FROM cache_entry WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (key, time.time()),
+        ).fetchone()
+        return default if row is None else pickle.loads(row[0])
+
+    def get_many(self, keys, version=None):
+        made = {self.make_and_validate_key(key, version=version): key for key in keys}
+        if not made:
+            return {}
+        placeholders = ', '.join('?' * len(made))
+        rows = self._connection().execute(
+            f'SELECT key, value FROM cache_entry WHERE key IN ({placeholders}) '
+            'AND (expires IS NULL OR expires > ?)',
+            (*made, time.time()),
+        )
+        return {made[key]: pickle.loads(value) for key, value in rows}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._write(
+            'INSERT OR REPLACE INTO cache_entry (key, value, expires) VALUES (:key, :value, :expires)',
+            key, value, timeout,
+        )
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return bool(self._connection().execute(
+            'UPDATE cache_entry SET expires = ? WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (self.get_backend_timeout(timeout), key, time.time()),
+        ).rowcount)
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return bool(self._connection().execute('DELETE FROM cache_entry WHERE key = ?', (key,)).rowcount)
+
+    def delete_many(self, keys, version=None):
+        made = [self.make_and_validate_key(key, version=version) for key in keys]
+        if made:
+            placeholders = ', '.join('?' * len(made))
+            self._connection().execute(f'DELETE FROM cache_entry WHERE key IN ({placeholders})', made)
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version=version) is not _MISSING
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        connection = self._connection()
+        # BEGIN IMMEDIATE takes the write lock before the read
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                'SELECT value FROM cache_entry WHERE key = ? AND (expires IS NULL OR expires > ?)',
+                (key, time.time()),
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Key '{key}' not found")
+            value = pickle.loads(row[0]) + delta
+            connection.execute(
+                'UPDATE cache_entry SET value = ? WHERE key = ?',
+                (pickle.dumps(value, pickle.HIGHEST_PROTOCOL), key),
+            )
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return value
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache_entry')
+
+    def close(self, **kwargs):
+        # Connections are kept per thread for the life of the process
+        pass
+
+
+class TieredCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        # LOCATION names the CACHES alias of the shared tier
+        self._shared_alias = location or 'shared'
+        self._local_max_entries = int(options.get('LOCAL_MAX_ENTRIES', 1000))
+        self._local_timeout = options.get('LOCAL_TIMEOUT', 60)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = Counter()
+
+    @property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    @staticmethod
+    def _prefix(key):
+        return str(key).split(':', 1)[0]
+
+    def _remember(self, key, value, timeout=DEFAULT_TIMEOUT):
+        now = time.time()
+        expires = now + self._local_timeout
+        shared_expires = self.get_backend_timeout(timeout)
+        if shared_expires is not None:
+            if shared_expires <= now:
+                return
+            expires = min(expires, shared_expires)
+        local_key = self.make_key(key)
+        blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._entries[local_key] = (blob, expires, self._prefix(key))
+            self._entries.move_to_end(local_key)
+            while len(self._entries) > self._local_max_entries:
+                _, (_, _, prefix) = self._entries.popitem(last=False)
+                self.evictions[prefix] += 1
+
+    def _recall(self, key):
+        local_key = self.make_key(key)
+        with self._lock:
+            entry = self._entries.get(local_key)
+            if entry is None:
+                return _MISSING
+            blob, expires, _ = entry
+            if expires <= time.time():
+                del self._entries[local_key]
+                return _MISSING
+            self._entries.move_to_end(local_key)
+        return pickle.loads(blob)
+
+    def _forget(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(self.make_key(key), None)
+
+    def drain_evictions(self):
+        """Return and reset the eviction counts of this process"""
+        with self._lock:
+            evictions, self.evictions = self.evictions, Counter()
+        return evictions
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.validate_key(key)
+        added = self.shared.add(key, value, timeout, version=version)
+        if added and version is None:
+            self._remember(key, value, timeout)
+        return added
+
+    def get(self, key, default=None, version=None):
+        if version is None:
+            value = self._recall(key)
+            if value is not _MISSING:
+                return value
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            return default
+        if version is None:
+            self._remember(key, value)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = {}
+        if version is None:
+            for key in keys:
+                value = self._recall(key)
+                if value is not _MISSING:
+                    found[key] = value
+        missing = [key for key in keys if key not in found]
+        if missing:
+            fetched = self.shared.get_many(missing, version=version)
+            if version is None:
+                for key, value in fetched.items():
+                    self._remember(key, value)
+            found.update(fetched)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.validate_key(key)
+        self.shared.set(key, value, timeout, version=version)
+        if version is None:
+            self._remember(key, value, timeout)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self._forget(key)
+        return self.shared.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self._forget(key)
+        return self.shared.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        self._forget(*keys)
+        self.shared.delete_many(keys, version=version)
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version=version) is not _MISSING
+
+    def incr(self, key, delta=1, version=None):
+        self._forget(key)
+        return self.shared.incr(key, delta, version=version)
+
+    def decr(self, key, delta=1, version=None):
+        self._forget(key)
+        return self.shared.decr(key, delta, version=version)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        self.shared.clear()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
@@ -0,0 +1,250 @@
+import hashlib
+import random
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+# Tagged cache for anonymous public pages.
+#
+# Every tag has a version number stored in the cache. An entry is stored
+# under a key that embeds the current versions of all its tags, so bumping
+# a tag's version makes every entry carrying that tag unreachable at once;
+# stale entries simply expire. Reading an entry costs one get_many for the
+# tag versions plus one get for the value.
+#
+# Entries are written once and never change, so the per-process tier of
+# talents.cache_backends.TieredCache can serve them from memory; tag
+# versions, counters and locks always go to the shared tier (shared_cache()),
+# so an invalidation is seen by every process at once. Lifetimes get a random
+# jitter so entries written together do not all expire together, and
+# get_or_set() computes a missing value once however many requests miss it
+# at the same time (single flight, across threads and processes).
+
+TAG_PREFIX = 'tag:'
+LOCK_PREFIX = 'lock:'
+PUBLIC_STAMP_KEY = 'public-changed-at'
+METRIC_PREFIX = 'metrics:'
+METRIC_EVENTS = ('hit', 'miss', 'invalidate', 'evict')
+# Key namespaces and tag prefixes that metrics are reported for
+NAMESPACES = ('home', 'showcase', 'detail', 'facets', 'validators', 'profile', 'facet', 'media')
+# Counters are summed in process and written to the shared tier this often
+METRICS_FLUSH_SECONDS = 5
+# How often a request waiting for another one's computation looks again
+LOCK_POLL_SECONDS = 0.05
+
+# Tags used across the app
+HOME_TAG = 'home'
+SHOWCASE_TAG = 'showcase'
+FACETS_TAG = 'facets'
+
+
+def profile_tag(pk):
+    return f'profile:{pk}'
+
+
+def facet_tag(facet, value):
+    return f'facet:{facet}:{(value or "").strip().lower()}'
+
+
+def media_tag(stem):
+    """Tag of an upload and its resized variants, by file name without extension"""
+    return f'media:{stem}'
+
+
+def timeout():
+    return getattr(settings, 'PUBLIC_CACHE_TIMEOUT', 300)
+
+
+def jittered_timeout():
+    """timeout() spread by +/- PUBLIC_CACHE_JITTER (a fraction)"""
+    jitter = getattr(settings, 'PUBLIC_CACHE_JITTER', 0.1)
+    return max(1, round(timeout() * random.uniform(1 - jitter, 1 + jitter)))
+
+
+def lock_timeout():
+    """How long a computation may hold its key before others compute too"""
+    return getattr(settings, 'PUBLIC_CACHE_LOCK_SECONDS', 10)
+
+
+def shared_cache():
+    """The tier every process sees (the cache itself when it has no tiers)"""
+    return getattr(cache, 'shared', cache)
+
+
+def make_key(namespace, *parts):
+    digest = hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'{namespace}:{digest}'
+
+
+def _tag_key(tag):
+    return TAG_PREFIX + hashlib.md5(tag.encode()).hexdigest()
+
+
+def _versioned_key(key, tags):
+    shared = shared_cache()
+    tag_keys = [_tag_key(tag) for tag in sorted(set(tags))]
+    versions = shared.get_many(tag_keys)
+    missing = {tag_key: 1 for tag_key in tag_keys if tag_key not in versions}
+    if missing:
+        # Tag versions never expire; their entries do
+        for tag_key in missing:
+            shared.add(tag_key, 1, None)
+        versions.update(shared.get_many(list(missing)))
+    stamp = '.'.join(str(versions.get(tag_key, 1)) for tag_key in tag_keys)
+    return f'{key}@{stamp}'
+
+
+_counts = Counter()
+_counts_lock = threading.Lock()
+_flushed_at = time.monotonic()
+
+
+def _record(namespace, event, count=1):
+    with _counts_lock:
+        _counts[namespace, event] += count
+        due = time.monotonic() - _flushed_at >= METRICS_FLUSH_SECONDS
+    if due:
+        flush_stats()
+
+
+def flush_stats():
+    """Add the counts of this process to the shared counters"""
+    global _flushed_at
+    drain = getattr(cache, 'drain_evictions', None)
+    evictions = drain() if drain else {}
+    with _counts_lock:
+        counts = dict(_counts)
+        _counts.clear()
+        _flushed_at = time.monotonic()
+    for prefix, count in evictions.items():
+        counts[prefix, 'evict'] = counts.get((prefix, 'evict'), 0) + count
+    shared = shared_cache()
+    for (namespace, event), count in counts.items():
+        metric = f'{METRIC_PREFIX}{namespace}:{event}'
+        if not shared.add(metric, count, None):
+            try:
+                shared.incr(metric, count)
+            except ValueError:
+                shared.set(metric, count, None)
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def _wait_for(versioned, deadline):
+    """The value another process is computing, None if it does not show up in time"""
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_SECONDS)
+        value = cache.get(versioned)
+        if value is not None:
+            return value
+    return None
+
+
+def get_or_set(key, tags, default):
+    """
+    Return the cached value for key, computing it with default() on a miss.
+    Concurrent misses wait for the first one's result instead of computing
+    it again, for at most lock_timeout() seconds.
+    """
+    namespace = key.split(':', 1)[0]
+    versioned = _versioned_key(key, tags)
+    value = cache.get(versioned)
+    _record(namespace, 'hit' if value is not None else 'miss')
+    if value is not None:
+        return value
+
+    deadline = time.monotonic() + lock_timeout()
+    with _flights_lock:
+        flight = _flights.get(versioned)
+        leader = flight is None
+        if leader:
+            flight = _flights[versioned] = threading.Event()
+    if not leader:
+        # Another thread of this process is computing it
+        flight.wait(lock_timeout())
+        value = cache.get(versioned)
+        if value is not None:
+            return value
+    try:
+        shared = shared_cache()
+        lock_key = LOCK_PREFIX + hashlib.md5(versioned.encode()).hexdigest()
+        locked = shared.add(lock_key, 1, lock_timeout())
+        if not locked:
+            # Another process is computing it
+            value = _wait_for(versioned, deadline)
+            if value is not None:
+                return value
+        try:
+            value = default()
+            cache.set(versioned, value, jittered_timeout())
+        finally:
+            if locked:
+                shared.delete(lock_key)
+        return value
+    finally:
+        if leader:
+            with _flights_lock:
+                _flights.pop(versioned, None)
+            flight.set()
+
+
+def invalidate(*tags):
+    """Bump the version of every tag once the current transaction commits"""
+    tags = {tag for tag in tags if tag}
+    if not tags:
+        return
+
+    def bump():
+        shared = shared_cache()
+        for tag in tags:
+            tag_key = _tag_key(tag)
+            if not shared.add(tag_key, 2, None):
+                try:
+                    shared.incr(tag_key)
+                except ValueError:
+                    shared.set(tag_key, 2, None)
+            _record(tag.split(':', 1)[0], 'invalidate')
+        if tags & {HOME_TAG, SHOWCASE_TAG, FACETS_TAG}:
+            shared.set(PUBLIC_STAMP_KEY, timezone.now(), None)
+
+    transaction.on_commit(bump)
+
+
+def public_changed_at():
+    """When anything on the public list pages last changed (used for HTTP validators)"""
+    shared = shared_cache()
+    stamp = shared.get(PUBLIC_STAMP_KEY)
+    if stamp is None:
+        # Unknown (e.g. cache cleared): assume it changed just now
+        shared.add(PUBLIC_STAMP_KEY, timezone.now(), None)
+        stamp = shared.get(PUBLIC_STAMP_KEY)
+    return stamp
+
+
+def stats():
+    """Return {namespace: {event: count}} for every namespace seen so far"""
+    flush_stats()
+    keys = [f'{METRIC_PREFIX}{ns}:{event}' for ns in NAMESPACES for event in METRIC_EVENTS]
+    values = shared_cache().get_many(keys)
+    result = {}
+    for ns in NAMESPACES:
+        counts = {event: values.get(f'{METRIC_PREFIX}{ns}:{event}', 0) for event in METRIC_EVENTS}
+        if any(counts.values()):
+            result[ns] = counts
+    return result
+
+
+def reset_stats():
+    flush_stats()
+    shared_cache().delete_many([
+        f'{METRIC_PREFIX}{ns}:{event}'
+        for ns in NAMESPACES
+        for event in METRIC_EVENTS
+    ])
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from . import facets
+from .models import ProfileUpdateHistory
+
+# Live moderation events for the moderator dashboard (Server-Sent Events).
+#
+# ProfileUpdateHistory already records every submission and moderation
+# decision, in order, with an auto-increment id: it doubles as the event log,
+# so no broker is needed and every worker process sees the same stream. The
+# async stream() polls for rows past the last id it sent (a primary key range
+# scan) and sleeps in between without holding a thread, so under ASGI an open
+# connection costs a coroutine, not a worker. The SSE id is the history id:
+# a reconnecting EventSource sends Last-Event-ID and resumes where it stopped.
+#
+# The stream is only served under ASGI: under WSGI it would pin a worker for
+# stream_duration(). There the view answers 204, which stops the EventSource
+# for good, and the dashboard polls poll() every poll_interval() instead.
+
+EVENT_FIELDS = (
+    'id', 'event', 'talent_id', 'talent__public_id', 'previous_status', 'new_status',
+    'changes_summary', 'changed_fields', 'updated_at', 'updated_by__username',
+)
+# Rows sent per poll; a backlog drains over consecutive polls
+BATCH_SIZE = 100
+
+
+def poll_interval():
+    return getattr(settings, 'MODERATION_EVENTS_POLL_SECONDS', 2)
+
+
+def heartbeat_interval():
+    return getattr(settings, 'MODERATION_EVENTS_HEARTBEAT_SECONDS', 15)
+
+
+def stream_duration():
+    return getattr(settings, 'MODERATION_EVENTS_STREAM_SECONDS', 300)
+
+
+def latest_id():
+    return ProfileUpdateHistory.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def since(last_id, limit=BATCH_SIZE):
+    """Events after last_id, oldest first"""
+    return list(
+        ProfileUpdateHistory.objects.filter(id__gt=last_id).exclude(event='')
+        .order_by('id').values(*EVENT_FIELDS)[:limit]
+    )
+
+
+def event_data(row, stats=None):
+    """The JSON payload of one history row"""
+    data = {
+        'id': row['id'],
+        'event': row['event'],
+        'talent_id': row['talent_id'],
+        'public_id': row['talent__public_id'],
+        'previous_status': row['previous_status'],
+        'status': row['new_status'],
+        'summary': row['changes_summary'],
+        'fields': row['changed_fields'],
+        'by': row['updated_by__username'],
+        'at': row['updated_at'],
+    }
+    if stats is not None:
+        data['stats'] = stats
+    return data
+
+
+def format_event(row, stats=None):
+    """One SSE message for a history row"""
+    data = json.dumps(event_data(row, stats), cls=DjangoJSONEncoder)
+    return f"id: {row['id']}\nevent: moderation\ndata: {data}\n\n"
+
+
+def batch(last_id):
+    """(rows, stats): the next events after last_id and, with any, the dashboard counters"""
+    rows = since(last_id)
+    # The dashboard counters ride along with the last event of a batch
+    return rows, (facets.moderation_stats() if rows else None)
+
+
+def poll(last_id):
+    """One batch as JSON data, for browsers without a stream (see views.moderator_events)"""
+    rows, stats = batch(last_id)
+    return {
+        'events': [event_data(row, stats if index == len(rows) - 1 else None) for index, row in enumerate(rows)],
+        'last_id': rows[-1]['id'] if rows else last_id,
+    }
+
+
+async def stream(last_id):
+    """
+    Yield SSE messages for events after last_id until stream_duration()
+    has passed; the browser then reconnects on its own.
+    """
+    deadline = time.monotonic() + stream_duration()
+    quiet_since = time.monotonic()
+    yield f"retry: {int(poll_interval() * 1000)}\n\n"
+    while time.monotonic() < deadline:
+        rows, stats = await sync_to_async(batch)(last_id)
+        for index, row in enumerate(rows):
+            yield format_event(row, stats if index == len(rows) - 1 else None)
+            last_id = row['id']
+        if rows:
+            quiet_since = time.monotonic()
+        elif time.monotonic() - quiet_since >= heartbeat_interval():
+            # Keeps proxies from closing an idle connection
+            yield ': keep-alive\n\n'
+            quiet_since = time.monotonic()
+        if len(rows) < BATCH_SIZE:
+            await asyncio.sleep(poll_interval())
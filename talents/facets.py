@@ -0,0 +1,214 @@
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+
+from . import caching
+from .models import FacetCount, ShowcaseCard, TalentProfile
+
+# Two kinds of counters share the FacetCount table.
+#
+# The 'status' rows count profiles per (status, visibility) for the moderator
+# stats. The profile write paths keep them: the save() signals, moderation.py
+# and track() around bulk updates.
+#
+# The other facets count the showcase cards, i.e. what the public listings
+# show, under the (approved, public) bucket. A card is built from the
+# published snapshot and stays listed while an edit of its profile waits for
+# review, so these rows follow the cards rather than the live profile:
+# talents/showcase.py moves them whenever it writes cards. The showcase reads
+# all of them in one query (public_counts()).
+
+# facet name -> ShowcaseCard field
+CARD_FACET_FIELDS = {
+    'role': 'role',
+    'registration_type': 'registration_type',
+    'gender': 'gender_identification',
+    'city': 'city',
+}
+CARD_BUCKET = ('approved', True)
+STATE_FIELDS = ['id', 'status', 'is_publicly_visible']
+STAT_NAMES = ('total', 'pending', 'approved', 'rejected', 'public')
+
+
+def _keys(state):
+    """The status key of one profile, given a dict of STATE_FIELDS"""
+    return [(state['status'], state['is_publicly_visible'], 'status', state['status'])]
+
+
+def _card_keys(card):
+    """Facet keys contributed by one card, given a dict of its CARD_FACET_FIELDS"""
+    keys = []
+    for facet, field in CARD_FACET_FIELDS.items():
+        value = (card.get(field) or '').strip()
+        if value:
+            keys.append((*CARD_BUCKET, facet, value))
+    return keys
+
+
+def state_of(profile):
+    return {field: getattr(profile, field if field != 'id' else 'pk') for field in STATE_FIELDS}
+
+
+def _bump(key, delta):
+    status, visible, facet, value = key
+    lookup = dict(status=status, is_publicly_visible=visible, facet=facet, value=value)
+    if FacetCount.objects.filter(**lookup).update(count=F('count') + delta):
+        return
+    try:
+        with transaction.atomic():
+            FacetCount.objects.create(count=delta, **lookup)
+    except IntegrityError:
+        # Created concurrently by another writer
+        FacetCount.objects.filter(**lookup).update(count=F('count') + delta)
+
+
+def _apply(keys_of, old, new):
+    delta = Counter()
+    for item in old:
+        for key in keys_of(item):
+            delta[key] -= 1
+    for item in new:
+        for key in keys_of(item):
+            delta[key] += 1
+    changed = {key: amount for key, amount in delta.items() if amount}
+    if not changed:
+        return
+    with transaction.atomic():
+        for key in sorted(changed):
+            _bump(key, changed[key])
+        caching.invalidate(caching.FACETS_TAG)
+
+
+def apply_change(old_states, new_states):
+    """Move the status counts from the old profile states to the new ones"""
+    _apply(_keys, old_states, new_states)
+
+
+def apply_card_change(old_cards, new_cards):
+    """Move the public facet counts from the removed cards to the written ones (dicts of card fields)"""
+    _apply(_card_keys, old_cards, new_cards)
+
+
+@contextmanager
+def track(queryset):
+    """
+    Keep facet counts correct around bulk writes that bypass save(),
+    e.g. ``queryset.update()`` in admin actions. The write and the counter
+    change commit together, with the rows locked in between.
+    """
+    with transaction.atomic():
+        ids = list(queryset.values_list('id', flat=True))
+        old_states = list(TalentProfile.objects.select_for_update().filter(id__in=ids).values(*STATE_FIELDS))
+        yield
+        new_states = list(TalentProfile.objects.filter(id__in=ids).values(*STATE_FIELDS))
+        apply_change(old_states, new_states)
+
+
+def public_counts():
+    """Return {facet: {value: count}} over the showcase cards in a single read"""
+    counts = {facet: {} for facet in CARD_FACET_FIELDS}
+    status, visible = CARD_BUCKET
+    rows = FacetCount.objects.filter(
+        status=status,
+        is_publicly_visible=visible,
+        facet__in=list(CARD_FACET_FIELDS),
+        count__gt=0,
+    ).values_list('facet', 'value', 'count')
+    for facet, value, count in rows:
+        counts[facet][value] = count
+    return counts
+
+
+def moderation_stats():
+    """Moderator dashboard totals, read from the 'status' counters (at most six rows)"""
+    stats = dict.fromkeys(STAT_NAMES, 0)
+    rows = FacetCount.objects.filter(facet='status').values_list('status', 'is_publicly_visible', 'count')
+    for status, visible, count in rows:
+        stats['total'] += count
+        if status in stats:
+            stats[status] += count
+        if visible:
+            stats['public'] += count
+    return stats
+
+
+def live_stats():
+    """The same totals counted from the profile table in one conditional aggregate"""
+    return TalentProfile.objects.aggregate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(status='pending')),
+        approved=Count('id', filter=Q(status='approved')),
+        rejected=Count('id', filter=Q(status='rejected')),
+        public=Count('id', filter=Q(is_publicly_visible=True)),
+    )
+
+
+def _expected_card_counts():
+    counts = Counter()
+    for facet, field in CARD_FACET_FIELDS.items():
+        grouped = ShowcaseCard.objects.exclude(**{field: ''}).values(field).annotate(total=Count('pk')).order_by()
+        for row in grouped:
+            value = row[field].strip()
+            if value:
+                counts[(*CARD_BUCKET, facet, value)] += row['total']
+    return counts
+
+
+def expected_counts():
+    """{(status, is_publicly_visible, facet, value): count} recounted from the profiles and cards"""
+    counts = _expected_card_counts()
+    grouped = TalentProfile.objects.values('status', 'is_publicly_visible').annotate(total=Count('id')).order_by()
+    for row in grouped:
+        counts[(row['status'], row['is_publicly_visible'], 'status', row['status'])] += row['total']
+    return counts
+
+
+def drift():
+    """{key: (stored, expected)} for every counter that disagrees with the profiles and cards"""
+    stored = {
+        (row.status, row.is_publicly_visible, row.facet, row.value): row.count
+        for row in FacetCount.objects.all()
+    }
+    expected = expected_counts()
+    return {
+        key: (stored.get(key, 0), expected.get(key, 0))
+        for key in set(stored) | set(expected)
+        if stored.get(key, 0) != expected.get(key, 0)
+    }
+
+
+def reconcile(drifted):
+    """Overwrite the drifted counters with their expected values"""
+    with transaction.atomic():
+        for (status, visible, facet, value), (_, expected) in sorted(drifted.items()):
+            FacetCount.objects.update_or_create(
+                status=status, is_publicly_visible=visible, facet=facet, value=value,
+                defaults={'count': expected},
+            )
+        caching.invalidate(caching.FACETS_TAG)
+
+
+def rebuild():
+    """Recount every facet from the profiles and cards"""
+    rows = [
+        FacetCount(status=status, is_publicly_visible=visible, facet=facet, value=value, count=total)
+        for (status, visible, facet, value), total in expected_counts().items()
+    ]
+    with transaction.atomic():
+        FacetCount.objects.all().delete()
+        FacetCount.objects.bulk_create(rows)
+        caching.invalidate(caching.FACETS_TAG)
+    return len(rows)
+
+
+def rebuild_cards():
+    """Recount the public facets from the cards, inside the caller's transaction"""
+    status, visible = CARD_BUCKET
+    FacetCount.objects.filter(status=status, is_publicly_visible=visible).exclude(facet='status').delete()
+    FacetCount.objects.bulk_create(
+        FacetCount(status=status, is_publicly_visible=visible, facet=facet, value=value, count=total)
+        for (_, _, facet, value), total in _expected_card_counts().items()
+    )
+    caching.invalidate(caching.FACETS_TAG)
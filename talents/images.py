@@ -0,0 +1,276 @@
+import base64
+import io
+import logging
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from PIL import Image, ImageOps
+
+from . import caching, showcase
+from .models import ShowcaseCard, TalentPhoto, TalentProfile
+
+# Resized copies of uploaded images (profile_image and TalentPhoto.image).
+#
+# Every width in TALENTS_IMAGE_WIDTHS is written in every format next to the
+# original, e.g. profiles/me.png -> profiles/me.320w.webp and
+# profiles/me.320w.jpg. Names are derived from the original, so templates can
+# build a srcset without touching the database or the storage. Images are
+# never upscaled: a width larger than the original gets the original size.
+# Only pixels are copied, which drops EXIF (GPS position, camera serial...).
+#
+# The same pass stores the intrinsic size, dominant color and a tiny inline
+# preview on the row (DESCRIPTION_FIELDS), so pages can reserve the space and
+# paint something before the real image arrives.
+#
+# schedule() hands that work to a small thread pool once the upload's
+# transaction commits, so the request that stored the file does not wait for
+# Pillow. Until the description is stored, templates link the original
+# (talents/templatetags/talent_images.py). Work lost with a recycled worker is
+# picked up by `manage.py backfill_image_placeholders` and
+# `manage.py generate_image_variants`, which only process what is missing.
+
+logger = logging.getLogger(__name__)
+
+FORMATS = (
+    # (extension, Pillow format, mime type)
+    ('webp', 'WEBP', 'image/webp'),
+    ('jpg', 'JPEG', 'image/jpeg'),
+)
+
+PLACEHOLDER_SIZE = 20
+PLACEHOLDER_QUALITY = 40
+
+# describe() key -> column, per model
+DESCRIPTION_FIELDS = {
+    TalentProfile: {
+        'width': 'profile_image_width',
+        'height': 'profile_image_height',
+        'placeholder': 'profile_image_placeholder',
+        'color': 'profile_image_color',
+    },
+    TalentPhoto: {
+        'width': 'width',
+        'height': 'height',
+        'placeholder': 'placeholder',
+        'color': 'color',
+    },
+}
+CARD_DESCRIPTION_FIELDS = {
+    'width': 'thumbnail_width',
+    'height': 'thumbnail_height',
+    'placeholder': 'thumbnail_placeholder',
+    'color': 'thumbnail_color',
+}
+
+
+def workers():
+    """Threads resizing uploads in the background; 0 resizes in the committing thread"""
+    return getattr(settings, 'TALENTS_IMAGE_WORKERS', 2)
+
+
+def widths():
+    return sorted(getattr(settings, 'TALENTS_IMAGE_WIDTHS', (160, 320, 640, 1280)))
+
+
+def quality():
+    return getattr(settings, 'TALENTS_IMAGE_QUALITY', 80)
+
+
+def variant_name(name, width, extension):
+    """Storage name (or URL) of one derivative of name"""
+    root, _ = posixpath.splitext(name)
+    return f'{root}.{width}w.{extension}'
+
+
+def variant_urls(image, extension):
+    """[(url, width)] for a FieldFile or the URL of an original"""
+    if hasattr(image, 'name'):
+        return [(image.storage.url(variant_name(image.name, width, extension)), width) for width in widths()]
+    return [(variant_name(image, width, extension), width) for width in widths()]
+
+
+def _prepare(image, pillow_format):
+    if pillow_format == 'JPEG' and image.mode != 'RGB':
+        # JPEG has no alpha channel: flatten onto white
+        rgba = image.convert('RGBA')
+        background = Image.new('RGB', rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        return background
+    if pillow_format == 'WEBP' and image.mode not in ('RGB', 'RGBA'):
+        return image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+    return image
+
+
+def _targets(name, force, storage):
+    return [
+        (width, extension, pillow_format)
+        for width in widths()
+        for extension, pillow_format, _ in FORMATS
+        if force or not storage.exists(variant_name(name, width, extension))
+    ]
+
+
+def _load(name, storage):
+    with storage.open(name, 'rb') as handle:
+        original = Image.open(handle)
+        original.load()
+    # Apply the EXIF orientation before it is dropped
+    return ImageOps.exif_transpose(original)
+
+
+def _write_variants(original, name, targets, storage):
+    written = 0
+    resized = {}
+    for width, extension, pillow_format in targets:
+        if width not in resized:
+            if width < original.width:
+                height = max(1, round(original.height * width / original.width))
+                resized[width] = original.resize((width, height), Image.LANCZOS)
+            else:
+                resized[width] = original
+        buffer = io.BytesIO()
+        _prepare(resized[width], pillow_format).save(
+            buffer, pillow_format, quality=quality(), optimize=pillow_format == 'JPEG',
+        )
+        target = variant_name(name, width, extension)
+        content = ContentFile(buffer.getvalue())
+        if hasattr(storage, 'store_exact'):
+            # Content-addressed storage would rename the variant after its hash
+            storage.store_exact(target, content)
+        else:
+            if storage.exists(target):
+                storage.delete(target)
+            storage.save(target, content)
+        written += 1
+    return written
+
+
+def generate_variants(name, force=False, storage=None):
+    """
+    Write every missing derivative of the image stored under name and return
+    how many files were written. Runs in backfill worker processes too, so it
+    only takes plain arguments.
+    """
+    storage = storage or default_storage
+    targets = _targets(name, force, storage)
+    if not targets:
+        return 0
+    return _write_variants(_load(name, storage), name, targets, storage)
+
+
+def describe(image):
+    """
+    Intrinsic size, dominant color and a ~20px inline preview of an image,
+    rendered while the real file loads.
+    """
+    thumb = _prepare(image, 'JPEG').copy()
+    thumb.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    buffer = io.BytesIO()
+    thumb.save(buffer, 'WEBP', quality=PLACEHOLDER_QUALITY)
+    # Most frequent color of a 4-color reduction of the preview
+    reduced = thumb.quantize(colors=4)
+    palette = reduced.getpalette()
+    _, index = max(reduced.getcolors())
+    red, green, blue = palette[index * 3:index * 3 + 3]
+    return {
+        'width': image.width,
+        'height': image.height,
+        'placeholder': 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode(),
+        'color': f'#{red:02x}{green:02x}{blue:02x}',
+    }
+
+
+def process(name, storage=None):
+    """Write the missing derivatives of name and return describe() of the original"""
+    storage = storage or default_storage
+    original = _load(name, storage)
+    _write_variants(original, name, _targets(name, False, storage), storage)
+    return describe(original)
+
+
+def description_of(image):
+    """describe() values stored for a FieldFile, {} if its model has none"""
+    columns = DESCRIPTION_FIELDS.get(type(getattr(image, 'instance', None)))
+    if not columns or image.field.name not in ('profile_image', 'image'):
+        return {}
+    return {key: getattr(image.instance, column) for key, column in columns.items()}
+
+
+def save_description(model, pk, field_name, name, info):
+    """
+    Store describe() output on the row, if it still holds that file, and on
+    the showcase card that shows it.
+    """
+    columns = {column: info[key] for key, column in DESCRIPTION_FIELDS[model].items()}
+    if not model.objects.filter(pk=pk, **{field_name: name}).update(**columns):
+        return
+    if model is TalentPhoto:
+        talent_id = TalentPhoto.objects.filter(pk=pk).values_list('talent_id', flat=True).first()
+        caching.invalidate(caching.profile_tag(talent_id))
+        return
+    caching.invalidate(caching.profile_tag(pk))
+    cards = ShowcaseCard.objects.filter(pk=pk, thumbnail_url=default_storage.url(name))
+    tags = showcase.listing_tags(cards.values('pk', 'role', 'registration_type', 'city', 'gender_identification'))
+    if cards.update(**{column: info[key] for key, column in CARD_DESCRIPTION_FIELDS.items()}):
+        caching.invalidate(*tags)
+
+
+def delete_variants(name, storage=None):
+    storage = storage or default_storage
+    for width in widths():
+        for extension, _, _ in FORMATS:
+            target = variant_name(name, width, extension)
+            if storage.exists(target):
+                storage.delete(target)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _executor_instance():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=workers(), thread_name_prefix='talents-images')
+        return _executor
+
+
+def _generate(name, storage, model, pk, field_name):
+    try:
+        info = process(name, storage=storage)
+        save_description(model, pk, field_name, name, info)
+    except Exception:
+        # Pages keep linking the original; the backfill commands retry
+        logger.exception('Could not process image %s of %s %s', name, model.__name__, pk)
+
+
+def _generate_in_thread(*args):
+    try:
+        _generate(*args)
+    finally:
+        # Pool threads would otherwise keep their own connection open
+        connection.close()
+
+
+def schedule(image):
+    """
+    Generate the derivatives and placeholder of a FieldFile in the background
+    once the current transaction commits
+    """
+    if not image:
+        return
+    args = (image.name, image.storage, type(image.instance), image.instance.pk, image.field.name)
+
+    def submit():
+        if workers():
+            _executor_instance().submit(_generate_in_thread, *args)
+        else:
+            _generate(*args)
+
+    transaction.on_commit(submit)
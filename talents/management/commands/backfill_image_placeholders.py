@@ -0,0 +1,89 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from talents import caching, images, showcase
+from talents.models import ShowcaseCard, TalentPhoto, TalentProfile
+
+# (model, image field) pairs that carry a placeholder
+SOURCES = ((TalentProfile, 'profile_image'), (TalentPhoto, 'image'))
+
+
+def _process(name):
+    try:
+        return name, images.process(name), None
+    except OSError as exc:
+        return name, None, str(exc)
+
+
+class Command(BaseCommand):
+    help = 'Compute the size, dominant color and inline placeholder of existing profile images and photos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Number of worker processes')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--force', action='store_true', help='Recompute rows that already have a placeholder')
+
+    def handle(self, *args, **options):
+        rows = {}
+        for model, field in SOURCES:
+            queryset = model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+            if not options['force']:
+                queryset = queryset.filter(**{f'{images.DESCRIPTION_FIELDS[model]["width"]}__isnull': True})
+            rows[model] = list(queryset.values_list('pk', field))
+        # Identical uploads share a file, so each name is decoded once
+        names = {name for model_rows in rows.values() for _, name in model_rows}
+
+        described = {}
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup) as pool:
+            futures = [pool.submit(_process, name) for name in sorted(names)]
+            for future in as_completed(futures):
+                name, info, error = future.result()
+                if error:
+                    self.stderr.write(f'{name}: {error}')
+                else:
+                    described[name] = info
+
+        updated = 0
+        for model, model_rows in rows.items():
+            columns = images.DESCRIPTION_FIELDS[model]
+            objects = []
+            for pk, name in model_rows:
+                if name not in described:
+                    continue
+                instance = model(pk=pk)
+                for key, column in columns.items():
+                    setattr(instance, column, described[name][key])
+                objects.append(instance)
+            model.objects.bulk_update(objects, list(columns.values()), batch_size=options['batch_size'])
+            updated += len(objects)
+
+        cards = self.update_cards(rows[TalentProfile], described, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Described {len(described)} of {len(names)} images: {updated} rows and {cards} showcase cards updated.'
+        ))
+
+    def update_cards(self, profile_rows, described, batch_size):
+        """Copy the placeholders onto cards that show the same image"""
+        urls = {pk: default_storage.url(name) for pk, name in profile_rows if name in described}
+        names = {pk: name for pk, name in profile_rows}
+        cards = [
+            card for card in ShowcaseCard.objects.filter(pk__in=list(urls))
+            if card.thumbnail_url == urls[card.pk]
+        ]
+        for card in cards:
+            for key, column in images.CARD_DESCRIPTION_FIELDS.items():
+                setattr(card, column, described[names[card.pk]][key])
+        with transaction.atomic():
+            ShowcaseCard.objects.bulk_update(cards, list(images.CARD_DESCRIPTION_FIELDS.values()), batch_size=batch_size)
+            caching.invalidate(*showcase.listing_tags(
+                {'pk': card.pk, 'role': card.role, 'registration_type': card.registration_type,
+                 'city': card.city, 'gender_identification': card.gender_identification}
+                for card in cards
+            ))
+            caching.invalidate(*(caching.profile_tag(pk) for pk in urls))
+        return len(cards)
@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.template.loader import get_template
+from django.utils import timezone
+
+from talents import roles
+from talents.models import ShowcaseCard
+
+# The role emoji as the card spelled it before talents/roles.py
+LEGACY_EMOJI = (
+    "{% if talent.role == 'dancer' %}💃\n"
+    "{% elif talent.role == 'acrobat' %}🤸\n"
+    "{% elif talent.role == 'performer' %}🎭\n"
+    "{% elif talent.role == 'musician' %}🎵\n"
+    "{% elif talent.role == 'entertainer' %}🎪\n"
+    "{% elif talent.role == 'bar_service' %}🍸\n"
+    "{% endif %}"
+)
+CARD_TEMPLATE = 'talents/showcase_card.html'
+
+
+class Command(BaseCommand):
+    help = 'Time rendering the showcase grid: the card include with role filters against the old inline card with {% if %} chains'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cards', type=int, default=1000, help='Cards per render')
+        parser.add_argument('--repeat', type=int, default=5, help='Renders per variant; the fastest counts')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        cards = [
+            ShowcaseCard(
+                profile_id=index + 1, public_id=f'TT-BENCH-{index:05d}', display_name=f'Talent {index}',
+                role=role.value, role_label=role.label, registration_type='group' if index % 4 == 0 else 'personal',
+                city='Istanbul', experience='3-5 years', bio_excerpt='Twenty words of biography ' * 5,
+                has_video=index % 2 == 0, has_cv=index % 3 == 0, created_at=now,
+            )
+            for index, role in zip(range(options['cards']), roles.ROLES * (options['cards'] // len(roles.ROLES) + 1))
+        ]
+        engine = engines['django']
+        source = get_template(CARD_TEMPLATE).template.source
+        load, body = source.split('\n', 1)
+        variants = [
+            ('inline card, {% if %} chains',
+             engine.from_string(f"{load}{{% for talent in cards %}}{body.replace('{{ talent.role|role_emoji }}', LEGACY_EMOJI)}{{% endfor %}}")),
+            ('card include, role_emoji filter',
+             engine.from_string(f"{{% for talent in cards %}}{{% include '{CARD_TEMPLATE}' %}}{{% endfor %}}")),
+        ]
+        for name, template in variants:
+            timings = []
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                template.render({'cards': cards})
+                timings.append(time.perf_counter() - start)
+            per_thousand = min(timings) * 1000 * 1000 / len(cards)
+            self.stdout.write(f'{name:<34} {per_thousand:8.1f} ms per 1000 cards')
@@ -0,0 +1,173 @@
+import asyncio
+import importlib.util
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from talents.models import ShowcaseCard
+
+# The two ways to run the site (see gunicorn.conf.py)
+SERVERS = (
+    ('gunicorn sync (WSGI)', 'tale_of_talents.wsgi', 'sync'),
+    ('gunicorn uvicorn (ASGI)', 'tale_of_talents.asgi', 'uvicorn.workers.UvicornWorker'),
+)
+REQUEST_TIMEOUT = 10
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def _fetch(port, path):
+    """Status of one GET over a fresh connection, read to the end"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n\r\n'.encode())
+        await writer.drain()
+        status_line = await reader.readline()
+        while await reader.read(65536):
+            pass
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def _slow_client(port, path, stop):
+    """Send the request headers one line per second, like a client on a bad connection"""
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n'.encode())
+        while not stop.is_set():
+            writer.write(b'X-Slow: 1\r\n')
+            await writer.drain()
+            await asyncio.sleep(1)
+        writer.close()
+    except OSError:
+        pass
+
+
+async def _load(port, paths, concurrency, duration, slow_clients):
+    latencies, errors = [], 0
+    stop = asyncio.Event()
+    slow = [asyncio.create_task(_slow_client(port, paths[0], stop)) for _ in range(slow_clients)]
+    # Let the slow clients take their connections first
+    await asyncio.sleep(0.5 if slow_clients else 0)
+    deadline = time.perf_counter() + duration
+
+    async def client(offset):
+        nonlocal errors
+        index = offset
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                status = await asyncio.wait_for(_fetch(port, paths[index % len(paths)]), REQUEST_TIMEOUT)
+            except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+                status = None
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+            index += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(offset) for offset in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await asyncio.gather(*slow)
+    return latencies, errors, elapsed
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-test the public pages on gunicorn sync workers (WSGI) and on uvicorn workers (ASGI), '
+        'with and without slow clients, and compare throughput and latency'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Worker processes per server')
+        parser.add_argument('--concurrency', type=int, default=32, help='Simultaneous requests')
+        parser.add_argument('--duration', type=float, default=10, help='Seconds per run')
+        parser.add_argument(
+            '--slow-clients', type=int, default=4,
+            help='Connections that trickle their request headers during the second run of each server',
+        )
+
+    def _paths(self):
+        paths = [reverse('home'), reverse('talent_showcase'), reverse('about')]
+        card = ShowcaseCard.objects.order_by('-created_at').values_list('profile_id', flat=True).first()
+        if card is not None:
+            paths.append(reverse('talent_detail', args=[card]))
+        return paths
+
+    def _start(self, app, worker_class, workers):
+        port = _free_port()
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'tale_of_talents.settings')}
+        process = subprocess.Popen(
+            [
+                sys.executable, '-m', 'gunicorn', app, '-k', worker_class, '-w', str(workers),
+                '-b', f'127.0.0.1:{port}', '--max-requests', '0', '--access-logfile', os.devnull,
+            ],
+            cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f'gunicorn {app} -k {worker_class} exited with status {process.returncode}')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return process, port
+            except OSError:
+                time.sleep(0.2)
+        process.kill()
+        raise CommandError(f'gunicorn {app} did not start listening on port {port}')
+
+    def handle(self, *args, **options):
+        for module in ('gunicorn', 'uvicorn'):
+            # The servers run in subprocesses; only check they are installed
+            if importlib.util.find_spec(module) is None:
+                raise CommandError(f'{module} is required (pip install -r requirements.txt)')
+        paths = self._paths()
+        self.stdout.write(f"Pages: {' '.join(paths)}")
+        self.stdout.write(
+            f"{options['workers']} workers per server, {options['concurrency']} concurrent requests, "
+            f"{options['duration']:g}s per run\n"
+        )
+        self.stdout.write(
+            f"{'server':<26}{'slow clients':>13}{'requests':>10}{'req/s':>9}"
+            f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}"
+        )
+        for name, app, worker_class in SERVERS:
+            process, port = self._start(app, worker_class, options['workers'])
+            try:
+                # Warm up: imports, template loading, cached fragments
+                asyncio.run(_load(port, paths, len(paths), 1, 0))
+                for slow_clients in sorted({0, options['slow_clients']}):
+                    latencies, errors, elapsed = asyncio.run(
+                        _load(port, paths, options['concurrency'], options['duration'], slow_clients)
+                    )
+                    if len(latencies) > 1:
+                        p50, p95, p99 = (
+                            statistics.quantiles(latencies, n=100)[index] * 1000 for index in (49, 94, 98)
+                        )
+                    else:
+                        p50 = p95 = p99 = float('nan')
+                    self.stdout.write(
+                        f'{name:<26}{slow_clients:>13}{len(latencies):>10}{len(latencies) / elapsed:>9.1f}'
+                        f'{p50:>9.1f}{p95:>9.1f}{p99:>9.1f}{errors:>8}'
+                    )
+            finally:
+                process.send_signal(signal.SIGTERM)
+                try:
+                    process.wait(timeout=30)
+                except subprocess.TimeoutExpired:
+                    process.kill()
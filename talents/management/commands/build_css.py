@@ -0,0 +1,38 @@
+import gzip
+
+from django.core.management.base import BaseCommand, CommandError
+
+from talents import stylesheet
+
+
+class Command(BaseCommand):
+    help = (
+        'Write static/css/site.css with the Tailwind utilities used by the templates and components '
+        '(collectstatic rebuilds it as well, see talents/stylesheet.py)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Do not write; fail if static/css/site.css is out of date with the templates',
+        )
+
+    def handle(self, *args, **options):
+        css = stylesheet.build()
+        path = stylesheet.output_path()
+        if options['check']:
+            if not path.exists() or path.read_text(encoding='utf-8') != css:
+                raise CommandError(f'{path} is out of date, run manage.py build_css')
+            self.stdout.write(self.style.SUCCESS(f'{path} is up to date.'))
+            return
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(css, encoding='utf-8')
+        size = len(css.encode())
+        compressed = len(gzip.compress(css.encode()))
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {path} ({size / 1024:.1f} KiB, {compressed / 1024:.1f} KiB gzipped).'
+        ))
+        if options['verbosity'] > 1:
+            for name in stylesheet.unknown_classes():
+                self.stdout.write(f'No CSS for class: {name}')
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from talents import caching
+
+
+class Command(BaseCommand):
+    help = 'Show hit/miss/invalidation/eviction counters of the public page cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after printing them')
+
+    def handle(self, *args, **options):
+        stats = caching.stats()
+        if not stats:
+            self.stdout.write('No cache activity recorded.')
+        for namespace, counts in sorted(stats.items()):
+            lookups = counts['hit'] + counts['miss']
+            ratio = f"{100 * counts['hit'] / lookups:.1f}%" if lookups else '-'
+            self.stdout.write(
+                f"{namespace:<10} hits={counts['hit']:<8} misses={counts['miss']:<8} "
+                f"invalidations={counts['invalidate']:<6} evictions={counts['evict']:<6} hit ratio={ratio}"
+            )
+        if options['reset']:
+            caching.reset_stats()
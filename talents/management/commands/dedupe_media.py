@@ -0,0 +1,110 @@
+import os
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from talents import blobs, images, revisions, showcase
+from talents.storage import ContentAddressedStorage
+
+
+class Command(BaseCommand):
+    help = (
+        'Move every referenced upload to its content-addressed name, pointing all '
+        'rows with identical bytes at one file, then recount references.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would change')
+        parser.add_argument(
+            '--delete-orphans', action='store_true',
+            help='Also delete files in the upload directories that no row references',
+        )
+
+    def handle(self, *args, **options):
+        storage = default_storage
+        if not hasattr(storage, 'store_exact'):
+            raise CommandError('DEFAULT_FILE_STORAGE must be talents.storage.ContentAddressedStorage')
+        dry_run = options['dry_run']
+
+        moved = shared = missing = 0
+        freed = 0
+        targets = set()
+        for model, fields in blobs.FILE_FIELDS.items():
+            for field in fields:
+                names = set(model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+                            .values_list(field, flat=True))
+                for name in sorted(names):
+                    if not storage.exists(name):
+                        missing += 1
+                        self.stderr.write(f'Missing file: {name}')
+                        continue
+                    with storage.open(name, 'rb') as handle:
+                        target = ContentAddressedStorage.addressed_name(name, ContentAddressedStorage.digest(handle))
+                    if target == name:
+                        continue
+                    size = storage.size(name)
+                    if target in targets or storage.exists(target):
+                        shared += 1
+                        freed += size
+                    else:
+                        moved += 1
+                    targets.add(target)
+                    self.stdout.write(f'{name} -> {target}')
+                    if dry_run:
+                        continue
+                    if not storage.exists(target):
+                        with storage.open(name, 'rb') as handle:
+                            storage.store_exact(target, handle)
+                    with transaction.atomic():
+                        model.objects.filter(**{field: name}).update(**{field: target})
+                        # Snapshots and diffs store the name too (talents/revisions.py)
+                        revisions.rename_file(name, target)
+                    storage.delete(name)
+                    if field in blobs.IMAGE_FIELDS:
+                        images.delete_variants(name, storage)
+                        images.generate_variants(target, storage=storage)
+
+        if not dry_run:
+            # Rows were updated directly, so recount instead of tracking each move
+            blobs.rebuild()
+            if moved or shared:
+                # Cards embed the old thumbnail URLs
+                showcase.rebuild()
+
+        orphans = self.orphans(storage)
+        for name in orphans:
+            self.stdout.write(f'Unreferenced: {name}')
+            if options['delete_orphans']:
+                freed += storage.size(name)
+                if not dry_run:
+                    storage.delete(name)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Moved {moved} files, merged {shared} duplicates, {missing} missing, '
+            f'{len(orphans)} unreferenced, {freed} bytes freed.'
+        ))
+
+    def orphans(self, storage):
+        """Files in the upload directories that no row (or image variant) points at"""
+        referenced = set(blobs.references())
+        variant_names = {
+            images.variant_name(name, width, extension)
+            for name in referenced
+            for width in images.widths()
+            for extension, _, _ in images.FORMATS
+        }
+        directories = {
+            model._meta.get_field(field).upload_to.rstrip('/')
+            for model, fields in blobs.FILE_FIELDS.items()
+            for field in fields
+        }
+        found = []
+        for directory in sorted(directories):
+            root = storage.path(directory)
+            for dirpath, _, filenames in os.walk(root):
+                for filename in filenames:
+                    name = os.path.relpath(os.path.join(dirpath, filename), storage.location).replace(os.sep, '/')
+                    if name not in referenced and name not in variant_names:
+                        found.append(name)
+        return found
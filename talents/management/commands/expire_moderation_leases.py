@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from talents import queue
+
+
+class Command(BaseCommand):
+    help = 'Return profiles whose moderation lease has expired to the work queue and print moderator throughput'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7, help='Period of the throughput report')
+
+    def handle(self, *args, **options):
+        expired = queue.expire()
+        self.stdout.write(self.style.SUCCESS(f'Expired {expired} moderation leases.'))
+        for row in queue.moderator_stats(options['days']):
+            average = row['average_review_seconds']
+            self.stdout.write(
+                f"{row['moderator__username']}: {row['decided']} decided ({row['per_day']}/day), "
+                f"average review {f'{average} s' if average is not None else '-'}, "
+                f"{row['claimed']} claimed, {row['released']} released, {row['expired']} expired, "
+                f"holding {row['holding']}"
+            )
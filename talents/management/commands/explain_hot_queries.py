@@ -0,0 +1,158 @@
+import re
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from talents.models import (
+    ProfileUpdateHistory, PublicIdSequence, ShowcaseCard, TalentPhoto,
+    TalentProfile, TalentVideo,
+)
+
+
+class Rollback(Exception):
+    pass
+
+
+def hot_queries():
+    """The queries behind the public pages and the moderator dashboard"""
+    sample = TalentProfile.objects.order_by('-created_at', '-id').first()
+    cursor_at = sample.created_at if sample else timezone.now()
+    cursor_id = sample.pk if sample else 0
+    return [
+        ('home / showcase first page',
+         ShowcaseCard.objects.order_by('-created_at', '-pk')[:24]),
+        ('showcase filtered by role',
+         ShowcaseCard.objects.filter(role='dancer').order_by('-created_at', '-pk')[:24]),
+        ('showcase deep page (keyset)',
+         ShowcaseCard.objects.filter(
+             Q(created_at__lt=cursor_at) | Q(created_at=cursor_at, pk__lt=cursor_id)
+         ).order_by('-created_at', '-pk')[:24]),
+        ('public profiles (talents/showcase.py)',
+         TalentProfile.objects.filter(is_publicly_visible=True)
+         .filter(Q(status='approved') | Q(published_revision__isnull=False))
+         .order_by('-created_at', '-id')[:24]),
+        ('moderator dashboard',
+         TalentProfile.objects.order_by('-created_at', '-id')[:50]),
+        ('moderator dashboard by status',
+         TalentProfile.objects.filter(status='pending').order_by('-created_at', '-id')[:50]),
+        ('approved photos of a profile',
+         TalentPhoto.objects.filter(talent_id=cursor_id, is_approved=True)),
+        ('approved videos of a profile',
+         TalentVideo.objects.filter(talent_id=cursor_id, is_approved=True)),
+    ]
+
+
+def plan_problems(plan):
+    """Return the lines of a query plan that read a whole table or sort without an index"""
+    problems = []
+    for line in plan.splitlines():
+        text = line.strip(' |-`')
+        if connection.vendor == 'sqlite':
+            # Django prints SQLite plan rows as "id parent notused detail"
+            text = re.sub(r'^(\d+ ){3}', '', text)
+            if re.match(r'SCAN \S+$', text) or re.match(r'USE TEMP B-TREE FOR .*ORDER BY', text):
+                problems.append(text)
+        elif 'Seq Scan on' in text:
+            problems.append(text)
+    return problems
+
+
+class Command(BaseCommand):
+    help = (
+        'Run EXPLAIN on the hot TalentProfile/ShowcaseCard queries and fail if any '
+        'of them falls back to a sequential scan. Use --seed to run against a '
+        'generated dataset that is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help='Number of profiles to generate first')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan')
+
+    def handle(self, *args, **options):
+        failures = []
+        try:
+            with transaction.atomic():
+                if options['seed']:
+                    self.seed(options['seed'])
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+                for label, queryset in hot_queries():
+                    plan = queryset.explain()
+                    problems = plan_problems(plan)
+                    status = self.style.ERROR('SCAN') if problems else self.style.SUCCESS('ok')
+                    self.stdout.write(f'{status:<4} {label}')
+                    if problems or options['verbose_plans']:
+                        self.stdout.write('     ' + plan.replace('\n', '\n     '))
+                    if problems:
+                        failures.append(label)
+                raise Rollback
+        except Rollback:
+            pass
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot queries use a sequential scan: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS('All hot queries use an index.'))
+
+    def seed(self, count):
+        """Generate count profiles with a realistic status mix, cards, media and history"""
+        now = timezone.now()
+        roles = [value for value, _ in TalentProfile.TALENT_ROLES]
+        statuses = ['approved'] * 6 + ['pending'] * 3 + ['rejected']
+        users = User.objects.bulk_create(
+            User(username=f'seed-{i}@example.com', email=f'seed-{i}@example.com', first_name='Seed', last_name=str(i))
+            for i in range(count)
+        )
+        public_ids = PublicIdSequence.allocate(count=count)
+        profiles = TalentProfile.objects.bulk_create(
+            TalentProfile(
+                user=user,
+                public_id=public_ids[i],
+                phone='000',
+                city=f'City {i % 40}',
+                role=roles[i % len(roles)],
+                experience='1-2 years',
+                bio='Seeded profile',
+                status=statuses[i % len(statuses)],
+                is_publicly_visible=statuses[i % len(statuses)] == 'approved' and i % 7 != 0,
+            )
+            for i, user in enumerate(users)
+        )
+        # created_at is auto_now_add; spread it out so ordering is meaningful
+        for i, profile in enumerate(profiles):
+            profile.created_at = now - timedelta(minutes=i)
+        TalentProfile.objects.bulk_update(profiles, ['created_at'], batch_size=500)
+        ShowcaseCard.objects.bulk_create(
+            ShowcaseCard(
+                profile=profile,
+                public_id=profile.public_id,
+                display_name=f'Seed {i}',
+                role=profile.role,
+                role_label=profile.get_role_display(),
+                registration_type=profile.registration_type,
+                city=profile.city,
+                experience=profile.experience,
+                bio_excerpt=profile.bio,
+                created_at=profile.created_at,
+            )
+            for i, profile in enumerate(profiles)
+            if profile.status == 'approved' and profile.is_publicly_visible
+        )
+        TalentPhoto.objects.bulk_create(
+            TalentPhoto(talent=profile, image='talent_photos/seed.jpg', is_approved=i % 2 == 0)
+            for i, profile in enumerate(profiles)
+        )
+        TalentVideo.objects.bulk_create(
+            TalentVideo(talent=profile, title='Seed', video_url='https://youtu.be/seed', is_approved=i % 2 == 0)
+            for i, profile in enumerate(profiles)
+        )
+        ProfileUpdateHistory.objects.bulk_create(
+            ProfileUpdateHistory(
+                talent=profile, updated_by=users[0], changes_summary='Seeded',
+                previous_status='approved', new_status='pending',
+            )
+            for profile in profiles
+        )
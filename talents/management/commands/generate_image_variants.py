@@ -0,0 +1,46 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+
+from talents import images
+from talents.models import TalentPhoto, TalentProfile
+
+
+def _generate(name, force):
+    try:
+        return name, images.generate_variants(name, force=force), None
+    except OSError as exc:
+        return name, 0, str(exc)
+
+
+class Command(BaseCommand):
+    help = 'Create the resized WebP/JPEG variants of every profile image and talent photo'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Number of worker processes')
+        parser.add_argument('--force', action='store_true', help='Regenerate variants that already exist')
+
+    def handle(self, *args, **options):
+        names = set(
+            TalentProfile.objects.exclude(profile_image='').exclude(profile_image__isnull=True)
+            .values_list('profile_image', flat=True)
+        )
+        names.update(TalentPhoto.objects.exclude(image='').values_list('image', flat=True))
+
+        written = failed = 0
+        # Resizing is CPU bound, so fan out over processes rather than threads
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup) as pool:
+            futures = [pool.submit(_generate, name, options['force']) for name in sorted(names)]
+            for future in as_completed(futures):
+                name, count, error = future.result()
+                if error:
+                    failed += 1
+                    self.stderr.write(f'{name}: {error}')
+                else:
+                    written += count
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Processed {len(names)} images, wrote {written} variants, {failed} failed.'
+        ))
@@ -0,0 +1,46 @@
+from django.contrib.auth import SESSION_KEY
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from talents.sessions import SessionStore
+
+
+class Command(BaseCommand):
+    help = 'Delete expired database sessions in batches (anonymous sessions live in cookies, see talents/sessions.py)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Sessions deleted per query')
+        parser.add_argument(
+            '--anonymous', action='store_true',
+            help='Also delete database sessions without a logged-in user, left over from the old session engine',
+        )
+
+    def _delete(self, keys):
+        deleted = 0
+        for start in range(0, len(keys), self.batch_size):
+            deleted += Session.objects.filter(session_key__in=keys[start:start + self.batch_size]).delete()[0]
+        return deleted
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        expired = 0
+        while True:
+            # Short transactions: one batch per DELETE
+            keys = list(
+                Session.objects.filter(expire_date__lt=timezone.now())
+                .values_list('session_key', flat=True)[:self.batch_size]
+            )
+            if not keys:
+                break
+            expired += self._delete(keys)
+        self.stdout.write(self.style.SUCCESS(f'Deleted {expired} expired sessions.'))
+
+        if options['anonymous']:
+            store = SessionStore()
+            anonymous = [
+                session_key
+                for session_key, data in Session.objects.values_list('session_key', 'session_data').iterator()
+                if SESSION_KEY not in store.decode(data)
+            ]
+            self.stdout.write(self.style.SUCCESS(f'Deleted {self._delete(anonymous)} anonymous sessions.'))
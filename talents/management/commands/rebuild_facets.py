@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from talents import facets
+
+
+class Command(BaseCommand):
+    help = 'Recount the showcase facet table from scratch'
+
+    def handle(self, *args, **options):
+        rows = facets.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} facet counts.'))
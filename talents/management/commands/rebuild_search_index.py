@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from talents import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for all talent profiles'
+
+    def handle(self, *args, **options):
+        engine = search.backend()
+        if engine is None:
+            self.stdout.write(self.style.WARNING('No full-text backend available; search uses icontains.'))
+            return
+        count = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} profiles ({engine}).'))
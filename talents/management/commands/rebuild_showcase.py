@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from talents import showcase
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the ShowcaseCard read model from approved, public profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        count = showcase.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} showcase cards.'))
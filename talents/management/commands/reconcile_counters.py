@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from talents import facets
+
+
+class Command(BaseCommand):
+    help = 'Compare the facet and moderation counters with the profiles and showcase cards and fix any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report the drift')
+
+    def handle(self, *args, **options):
+        drifted = facets.drift()
+        for (status, visible, facet, value), (stored, expected) in sorted(drifted.items()):
+            self.stdout.write(
+                f'{facet}={value} ({status}, public={visible}): stored {stored}, expected {expected}'
+            )
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('Counters match the profiles and showcase cards.'))
+            return
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{len(drifted)} counters have drifted.'))
+            return
+
+        facets.reconcile(drifted)
+        stats, live = facets.moderation_stats(), facets.live_stats()
+        self.stdout.write(self.style.SUCCESS(f'Fixed {len(drifted)} counters. Dashboard stats: {stats}'))
+        if stats != live:
+            # Profiles changed while reconciling; a second run settles it
+            self.stdout.write(self.style.WARNING(f'Live counts differ: {live}'))
@@ -0,0 +1,277 @@
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from . import caching
+from .models import ProfileRevision, TalentPhoto, TalentProfile
+
+# Serving of user uploads (MEDIA_ROOT).
+#
+# Every request is checked against the row that owns the file: images and CVs
+# of published, publicly visible profiles (and approved photos) are public,
+# everything else is only served to its owner and to staff. The bytes are then
+# sent by the proxy when one is configured (MEDIA_SERVE_MODE 'nginx' uses
+# X-Accel-Redirect, 'sendfile' uses X-Sendfile) or streamed by Django with
+# Range, ETag and Cache-Control support.
+#
+# Who owns a file is looked up with a prefix match (an original and its
+# variants share the name up to the extension) that no index serves, so the
+# result is cached per file (cached_owners()). Its entry is tagged with the file's
+# media tag, which talents/blobs.py bumps whenever a row starts or stops
+# referencing the file, and with the profile tags of the owners, which every
+# change of their status, visibility or photo approval bumps.
+#
+# Under ASGI the file is read chunk by chunk in a worker thread and sent from
+# the event loop (stream_async()): a slow download then costs a coroutine,
+# not a thread, and Django 4.2 does not read the whole file into memory first
+# as it does with a synchronous iterator.
+
+# Resized copies written by talents/images.py: <root>.<width>w.<ext>
+VARIANT_RE = re.compile(r'^(?P<root>.+)\.\d+w\.(webp|jpg)$')
+# Content hashes in file names never change meaning, so they can be cached forever
+HASHED_NAME_RE = re.compile(r'[0-9a-f]{16,}')
+
+PUBLIC_MAX_AGE = 60 * 60
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+CHUNK_SIZE = 64 * 1024
+
+
+def serve_mode():
+    return getattr(settings, 'MEDIA_SERVE_MODE', 'stream')
+
+
+def _same_original(stored, name):
+    """Is the stored file name the original of name (itself or one of its variants)?"""
+    if stored == name:
+        return True
+    match = VARIANT_RE.match(name)
+    return bool(match) and posixpath.splitext(stored)[0] == match.group('root')
+
+
+def _stem(name):
+    match = VARIANT_RE.match(name)
+    return match.group('root') if match else posixpath.splitext(name)[0]
+
+
+def _published(status, visible, published_revision):
+    """Same rule as TalentProfile.is_published"""
+    return visible and (published_revision is not None or status == 'approved')
+
+
+def _owners(name):
+    """[(profile_id, is_public)] for every row that references the file"""
+    stem = _stem(name)
+    owners = []
+    if name.startswith('profiles/'):
+        rows = TalentProfile.objects.filter(profile_image__startswith=stem).values_list(
+            'pk', 'profile_image', 'status', 'is_publicly_visible', 'published_revision')
+        owners = [
+            (pk, _published(status, visible, revision))
+            for pk, stored, status, visible, revision in rows
+            if _same_original(stored, name)
+        ]
+    elif name.startswith('cvs/'):
+        rows = TalentProfile.objects.filter(cv_file=name).values_list(
+            'pk', 'status', 'is_publicly_visible', 'published_revision')
+        owners = [(pk, _published(status, visible, revision)) for pk, status, visible, revision in rows]
+    elif name.startswith('talent_photos/'):
+        rows = TalentPhoto.objects.filter(image__startswith=stem).values_list(
+            'talent_id', 'image', 'is_approved', 'talent__status', 'talent__is_publicly_visible',
+            'talent__published_revision')
+        owners = [
+            (talent_id, approved and _published(status, visible, revision))
+            for talent_id, stored, approved, status, visible, revision in rows
+            if _same_original(stored, name)
+        ]
+    field = {'profiles/': 'profile_image', 'cvs/': 'cv_file'}.get(name.split('/', 1)[0] + '/')
+    if field:
+        # Proposed by an edit that waits for review: never public
+        pending = ProfileRevision.objects.filter(status='pending', **{f'changes__{field}__1__startswith': stem})
+        owners += [
+            (talent_id, False)
+            for talent_id, changes in pending.values_list('talent_id', 'changes')
+            if _same_original(changes[field][1], name)
+        ]
+    return owners
+
+
+def cached_owners(name):
+    """_owners(name) through the cache"""
+    tag = caching.media_tag(_stem(name))
+    # Which profiles reference the file decides which tags the answer carries
+    ids = caching.get_or_set(
+        caching.make_key('media', name), [tag],
+        lambda: sorted({pk for pk, _ in _owners(name)}),
+    )
+    return caching.get_or_set(
+        caching.make_key('media', name, *ids),
+        [tag, *(caching.profile_tag(pk) for pk in ids)],
+        lambda: _owners(name),
+    )
+
+
+def access(user, name):
+    """Return 'public', 'private' or None (not allowed) for a media file"""
+    owners = cached_owners(name)
+    if any(is_public for _, is_public in owners):
+        return 'public'
+    if user.is_staff:
+        return 'private'
+    if user.is_authenticated:
+        own_profile = TalentProfile.objects.filter(user=user).values_list('pk', flat=True).first()
+        if own_profile and any(pk == own_profile for pk, _ in owners):
+            return 'private'
+    return None
+
+
+def cache_control(name, visibility):
+    if visibility != 'public':
+        # Approval can be withdrawn at any time: always revalidate
+        return 'private, no-cache'
+    if HASHED_NAME_RE.search(posixpath.basename(name)):
+        return f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    return f'public, max-age={PUBLIC_MAX_AGE}'
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single 'bytes=' range, or None when the
+    header is absent or not one we serve (malformed, several ranges), which
+    means sending the whole file. Raises RangeNotSatisfiable when the range
+    starts past the end of the file.
+    """
+    match = re.fullmatch(r'bytes=(\d*)-(\d*)', (header or '').strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first == '':
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            return None
+        return max(0, size - length), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    end = min(int(last), size - 1) if last else size - 1
+    return start, end
+
+
+class RangeFile:
+    """Read at most length bytes of an open file, starting at its current position"""
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+async def _read_chunks(file, chunk_size):
+    read = sync_to_async(file.read, thread_sensitive=False)
+    while chunk := await read(chunk_size):
+        yield chunk
+
+
+def stream_async(response):
+    """Send a FileResponse through an async iterator (for ASGI requests)"""
+    if response.file_to_stream is not None:
+        response.streaming_content = _read_chunks(response.file_to_stream, response.block_size)
+    return response
+
+
+def _stream(request, full_path, stat, etag):
+    size = stat.st_size
+    response_range = None
+    if request.headers.get('Range') and request.headers.get('If-Range', etag) == etag:
+        try:
+            response_range = parse_range(request.headers['Range'], size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    handle = open(full_path, 'rb')
+    if response_range:
+        start, end = response_range
+        handle.seek(start)
+        response = FileResponse(RangeFile(handle, end - start + 1), status=206)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    else:
+        response = FileResponse(handle)
+    response.block_size = CHUNK_SIZE
+    if isinstance(request, ASGIRequest):
+        stream_async(response)
+    return response
+
+
+def serve(request, path):
+    """Serve a file from MEDIA_ROOT after checking who may see it"""
+    name = posixpath.normpath(path).lstrip('/')
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, name)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    visibility = access(request.user, name)
+    if visibility is None:
+        # Same answer as a missing file, so ids of hidden profiles do not leak
+        raise Http404
+
+    stat = os.stat(full_path)
+    etag = f'"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        mode = serve_mode()
+        if mode == 'nginx':
+            # nginx answers Range and conditional requests itself
+            response = HttpResponse()
+            prefix = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/')
+            response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(name)
+        elif mode == 'sendfile':
+            response = HttpResponse()
+            response['X-Sendfile'] = full_path
+        else:
+            response = _stream(request, full_path, stat, etag)
+        content_type, encoding = mimetypes.guess_type(name)
+        response['Content-Type'] = content_type or 'application/octet-stream'
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Accept-Ranges'] = 'bytes'
+        response['Last-Modified'] = http_date(stat.st_mtime)
+
+    response['ETag'] = etag
+    response['Cache-Control'] = cache_control(name, visibility)
+    if visibility != 'public':
+        patch_vary_headers(response, ('Cookie',))
+    return response
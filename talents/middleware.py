@@ -0,0 +1,37 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from whitenoise import middleware
+
+from .media import stream_async
+
+# WhiteNoise for both WSGI and ASGI.
+#
+# whitenoise.middleware.WhiteNoiseMiddleware is synchronous only, and one
+# synchronous middleware makes Django run everything below it, async views
+# included, through async_to_sync in a thread. This subclass keeps
+# WhiteNoise's behaviour under WSGI and, under ASGI, looks static files up
+# without blocking the event loop and streams them with an async iterator.
+
+
+class WhiteNoiseMiddleware(middleware.WhiteNoiseMiddleware):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file, thread_sensitive=False)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is None:
+            return await self.get_response(request)
+        response = await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
+        return stream_async(response)
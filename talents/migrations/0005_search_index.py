@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.db import migrations
+
+
+FTS5_CREATE = """
+CREATE VIRTUAL TABLE talents_search_fts USING fts5(
+    public_id, group_name, city, bio, first_name, last_name, email,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)
+"""
+
+FTS5_BACKFILL = """
+INSERT INTO talents_search_fts (rowid, public_id, group_name, city, bio, first_name, last_name, email)
+SELECT p.id, p.public_id, p.group_name, p.city, p.bio, u.first_name, u.last_name, u.email
+FROM talents_talentprofile p JOIN auth_user u ON u.id = p.user_id
+"""
+
+PG_CREATE = """
+CREATE TABLE talents_search_document (
+    profile_id bigint PRIMARY KEY REFERENCES talents_talentprofile (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+    document tsvector NOT NULL
+);
+CREATE INDEX talents_search_document_gin ON talents_search_document USING gin (document);
+"""
+
+PG_BACKFILL = """
+INSERT INTO talents_search_document (profile_id, document)
+SELECT p.id,
+    setweight(to_tsvector('simple', coalesce(p.public_id, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(p.group_name, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(p.city, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(p.bio, '')), 'C') ||
+    setweight(to_tsvector('simple', coalesce(u.first_name, '') || ' ' || coalesce(u.last_name, '') || ' ' || coalesce(u.email, '')), 'D')
+FROM talents_talentprofile p JOIN auth_user u ON u.id = p.user_id
+"""
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            try:
+                cursor.execute(FTS5_CREATE)
+            except Exception:
+                # SQLite compiled without FTS5: search falls back to icontains
+                return
+            cursor.execute(FTS5_BACKFILL)
+    elif vendor == 'postgresql':
+        schema_editor.execute(PG_CREATE)
+        schema_editor.execute(PG_BACKFILL)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS talents_search_fts')
+    elif vendor == 'postgresql':
+        schema_editor.execute('DROP TABLE IF EXISTS talents_search_document')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('talents', '0004_remove_talentprofile_last_approved_version_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:23
+
+from collections import Counter
+
+from django.db import migrations, models
+
+
+FACET_FIELDS = {
+    'role': 'role',
+    'registration_type': 'registration_type',
+    'gender': 'gender_identification',
+    'city': 'city',
+}
+
+
+def populate_facet_counts(apps, schema_editor):
+    TalentProfile = apps.get_model('talents', 'TalentProfile')
+    FacetCount = apps.get_model('talents', 'FacetCount')
+    counts = Counter()
+    states = TalentProfile.objects.values('status', 'is_publicly_visible', *FACET_FIELDS.values())
+    for state in states.iterator():
+        for facet, field in FACET_FIELDS.items():
+            value = (state[field] or '').strip()
+            if value:
+                counts[(state['status'], state['is_publicly_visible'], facet, value)] += 1
+    FacetCount.objects.bulk_create(
+        FacetCount(status=status, is_publicly_visible=visible, facet=facet, value=value, count=count)
+        for (status, visible, facet, value), count in counts.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('talents', '0005_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected')], max_length=10)),
+                ('is_publicly_visible', models.BooleanField()),
+                ('facet', models.CharField(choices=[('role', 'Role'), ('registration_type', 'Registration type'), ('gender', 'Gender'), ('city', 'City')], max_length=20)),
+                ('value', models.CharField(max_length=100)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='facetcount',
+            constraint=models.UniqueConstraint(fields=('status', 'is_publicly_visible', 'facet', 'value'), name='talents_facetcount_unique_key'),
+        ),
+        migrations.RunPython(populate_facet_counts, migrations.RunPython.noop),
+    ]
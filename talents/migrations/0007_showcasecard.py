@@ -0,0 +1,70 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils.text import Truncator
+
+
+def populate_showcase_cards(apps, schema_editor):
+    TalentProfile = apps.get_model('talents', 'TalentProfile')
+    TalentVideo = apps.get_model('talents', 'TalentVideo')
+    ShowcaseCard = apps.get_model('talents', 'ShowcaseCard')
+    with_video = set(TalentVideo.objects.filter(is_approved=True).values_list('talent_id', flat=True))
+    cards = []
+    profiles = TalentProfile.objects.filter(status='approved', is_publicly_visible=True).select_related('user')
+    for profile in profiles.iterator():
+        if profile.registration_type == 'group':
+            display_name = profile.group_name or f"Group {profile.public_id}"
+        else:
+            display_name = f"{profile.user.first_name} {profile.user.last_name}".strip()
+        cards.append(ShowcaseCard(
+            profile=profile,
+            public_id=profile.public_id,
+            display_name=display_name[:255],
+            role=profile.role,
+            role_label=profile.get_role_display(),
+            registration_type=profile.registration_type,
+            gender_identification=profile.gender_identification or '',
+            city=profile.city,
+            experience=profile.experience,
+            bio_excerpt=Truncator(profile.bio).words(30),
+            thumbnail_url=profile.profile_image.url if profile.profile_image else '',
+            has_video=profile.pk in with_video,
+            has_cv=bool(profile.cv_file),
+            created_at=profile.created_at,
+        ))
+    ShowcaseCard.objects.bulk_create(cards, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('talents', '0006_facetcount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShowcaseCard',
+            fields=[
+                ('profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='showcase_card', serialize=False, to='talents.talentprofile')),
+                ('public_id', models.CharField(max_length=20)),
+                ('display_name', models.CharField(max_length=255)),
+                ('role', models.CharField(choices=[('dancer', 'Dancer'), ('acrobat', 'Acrobat'), ('performer', 'Performer'), ('musician', 'Musician'), ('entertainer', 'Entertainer'), ('bar_service', 'Bar & Service Staff')], max_length=20)),
+                ('role_label', models.CharField(max_length=50)),
+                ('registration_type', models.CharField(choices=[('personal', 'Personal'), ('group', 'Group')], max_length=10)),
+                ('gender_identification', models.CharField(blank=True, max_length=20)),
+                ('city', models.CharField(max_length=100)),
+                ('experience', models.CharField(max_length=50)),
+                ('bio_excerpt', models.TextField()),
+                ('thumbnail_url', models.CharField(blank=True, max_length=255)),
+                ('has_video', models.BooleanField(default=False)),
+                ('has_cv', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-created_at', '-profile'],
+            },
+        ),
+        migrations.RunPython(populate_showcase_cards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:33
+
+from django.db import migrations, models
+
+
+def seed_sequences(apps, schema_editor):
+    TalentProfile = apps.get_model('talents', 'TalentProfile')
+    PublicIdSequence = apps.get_model('talents', 'PublicIdSequence')
+    highest = {}
+    for public_id in TalentProfile.objects.values_list('public_id', flat=True):
+        parts = (public_id or '').split('-')
+        if len(parts) == 3 and parts[0] == 'TT' and parts[1].isdigit() and parts[2].isdigit():
+            year, value = int(parts[1]), int(parts[2])
+            highest[year] = max(highest.get(year, 0), value)
+    PublicIdSequence.objects.bulk_create(
+        PublicIdSequence(year=year, last_value=value) for year, value in highest.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('talents', '0007_showcasecard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublicIdSequence',
+            fields=[
+                ('year', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('last_value', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
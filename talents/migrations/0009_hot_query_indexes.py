@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('talents', '0008_publicidsequence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='profileupdatehistory',
+            index=models.Index(fields=['talent', 'previous_status', 'new_status', '-updated_at'], name='history_transition_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='showcasecard',
+            index=models.Index(fields=['-created_at', '-profile'], name='card_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='showcasecard',
+            index=models.Index(fields=['role', '-created_at', '-profile'], name='card_role_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='talentphoto',
+            index=models.Index(fields=['talent', 'is_approved'], name='photo_talent_approved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='talentprofile',
+            index=models.Index(fields=['-created_at', '-id'], name='talent_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='talentprofile',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='talent_status_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='talentprofile',
+            index=models.Index(condition=models.Q(('is_publicly_visible', True), ('status', 'approved')), fields=['-created_at', '-id'], name='talent_public_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='talentvideo',
+            index=models.Index(fields=['talent', 'is_approved'], name='video_talent_approved_idx'),
+        ),
+    ]
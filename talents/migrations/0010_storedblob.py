@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:44
+
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def count_references(apps, schema_editor):
+    TalentProfile = apps.get_model('talents', 'TalentProfile')
+    TalentPhoto = apps.get_model('talents', 'TalentPhoto')
+    StoredBlob = apps.get_model('talents', 'StoredBlob')
+    counts = Counter()
+    for row in TalentProfile.objects.values_list('profile_image', 'cv_file').iterator():
+        counts.update(name for name in row if name)
+    counts.update(name for name in TalentPhoto.objects.values_list('image', flat=True) if name)
+    StoredBlob.objects.bulk_create(
+        StoredBlob(name=name, refcount=count) for name, count in counts.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('talents', '0009_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('refcount', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_references, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('talents', '0010_storedblob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='showcasecard',
+            name='thumbnail_color',
+            field=models.CharField(blank=True, max_length=7),
+        ),
+        migrations.AddField(
+            model_name='showcasecard',
+            name='thumbnail_height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='showcasecard',
+            name='thumbnail_placeholder',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='showcasecard',
+            name='thumbnail_width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='talentphoto',
+            name='color',
+            field=models.CharField(blank=True, max_length=7),
+        ),
+        migrations.AddField(
+            model_name='talentphoto',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='talentphoto',
+            name='placeholder',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='talentphoto',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='talentprofile',
+            name='profile_image_color',
+            field=models.CharField(blank=True, max_length=7),
+        ),
+        migrations.AddField(
+            model_name='talentprofile',
+            name='profile_image_height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='talentprofile',
+            name='profile_image_placeholder',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='talentprofile',
+            name='profile_image_width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:49
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_statuses(apps, schema_editor):
+    TalentProfile = apps.get_model('talents', 'TalentProfile')
+    FacetCount = apps.get_model('talents', 'FacetCount')
+    grouped = TalentProfile.objects.values('status', 'is_publicly_visible').annotate(total=Count('id')).order_by()
+    FacetCount.objects.bulk_create(
+        FacetCount(
+            status=row['status'], is_publicly_visible=row['is_publicly_visible'],
+            facet='status', value=row['status'], count=row['total'],
+        )
+        for row in grouped
+    )
+
+
+def remove_statuses(apps, schema_editor):
+    apps.get_model('talents', 'FacetCount').objects.filter(facet='status').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('talents', '0011_image_placeholders'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='facetcount',
+            name='facet',
+            field=models.CharField(choices=[('role', 'Role'), ('registration_type', 'Registration type'), ('gender', 'Gender'), ('city', 'City'), ('status', 'Status')], max_length=20),
+        ),
+        migrations.RunPython(count_statuses, remove_statuses),
+    ]
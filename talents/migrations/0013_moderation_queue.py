@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:55
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('talents', '0012_status_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModeratorStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('claimed', models.PositiveIntegerField(default=0)),
+                ('decided', models.PositiveIntegerField(default=0)),
+                ('queue_decided', models.PositiveIntegerField(default=0)),
+                ('released', models.PositiveIntegerField(default=0)),
+                ('expired', models.PositiveIntegerField(default=0)),
+                ('review_seconds', models.FloatField(default=0)),
+                ('moderator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='moderation_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ModerationLease',
+            fields=[
+                ('talent', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='moderation_lease', serialize=False, to='talents.talentprofile')),
+                ('claimed_at', models.DateTimeField()),
+                ('expires_at', models.DateTimeField()),
+                ('moderator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='moderation_leases', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='moderatorstat',
+            constraint=models.UniqueConstraint(fields=('moderator', 'day'), name='talents_moderatorstat_unique_day'),
+        ),
+        migrations.AddIndex(
+            model_name='moderationlease',
+            index=models.Index(fields=['moderator', 'expires_at'], name='lease_moderator_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='moderationlease',
+            index=models.Index(fields=['expires_at'], name='lease_expiry_idx'),
+        ),
+    ]
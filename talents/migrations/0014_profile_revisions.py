@@ -0,0 +1,78 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+# TalentProfile fields covered by a revision at this point
+REVISION_FIELDS = [
+    'phone', 'city', 'role', 'bio', 'experience', 'profile_image', 'cv_file',
+    'height', 'gender_identification', 'pronouns', 'hair_color', 'eye_color',
+    'agency', 'union_affiliations', 'availability',
+]
+
+
+def snapshot_published(apps, schema_editor):
+    """
+    Freeze what is public today: approved profiles, and pending edits of
+    approved profiles (their rows already carry the edit, the best available)
+    """
+    TalentProfile = apps.get_model('talents', 'TalentProfile')
+    ProfileRevision = apps.get_model('talents', 'ProfileRevision')
+    ProfileUpdateHistory = apps.get_model('talents', 'ProfileUpdateHistory')
+    resubmitted = ProfileUpdateHistory.objects.filter(previous_status='approved', new_status='pending').values('talent_id')
+    profiles = TalentProfile.objects.filter(
+        models.Q(status='approved') | models.Q(status='pending', is_publicly_visible=True, pk__in=resubmitted)
+    )
+    for profile in profiles.iterator():
+        data = {field: getattr(profile, field) for field in REVISION_FIELDS}
+        for field in ('profile_image', 'cv_file'):
+            data[field] = data[field].name if data[field] else ''
+        revision = ProfileRevision.objects.create(
+            talent=profile, number=1, status='approved', changes={}, data=data,
+            reviewed_by_id=profile.approved_by_id, reviewed_at=profile.last_approved_at,
+        )
+        TalentProfile.objects.filter(pk=profile.pk).update(published_revision=revision)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('talents', '0013_moderation_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected')], default='pending', max_length=10)),
+                ('changes', models.JSONField(default=dict)),
+                ('data', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('reviewed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='profile_revisions', to=settings.AUTH_USER_MODEL)),
+                ('reviewed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reviewed_revisions', to=settings.AUTH_USER_MODEL)),
+                ('talent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='talents.talentprofile')),
+            ],
+            options={
+                'ordering': ['talent', '-number'],
+            },
+        ),
+        migrations.AddField(
+            model_name='talentprofile',
+            name='published_revision',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='talents.profilerevision'),
+        ),
+        migrations.AddConstraint(
+            model_name='profilerevision',
+            constraint=models.UniqueConstraint(fields=('talent', 'number'), name='talents_revision_unique_number'),
+        ),
+        migrations.AddConstraint(
+            model_name='profilerevision',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'pending')), fields=('talent',), name='talents_revision_one_pending'),
+        ),
+        migrations.RunPython(snapshot_published, migrations.RunPython.noop),
+    ]
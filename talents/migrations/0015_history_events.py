@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:03
+
+from django.db import migrations, models
+
+
+def classify_events(apps, schema_editor):
+    ProfileUpdateHistory = apps.get_model('talents', 'ProfileUpdateHistory')
+    history = ProfileUpdateHistory.objects.all()
+    history.filter(new_status='pending').update(event='updated')
+    history.filter(new_status='approved').update(event='approved')
+    history.filter(new_status='rejected').update(event='rejected')
+    # Rejected edits of approved profiles end in 'approved'
+    history.filter(new_status='approved', changes_summary__icontains='rejected').update(event='rejected')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('talents', '0014_profile_revisions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profileupdatehistory',
+            name='event',
+            field=models.CharField(blank=True, choices=[('submitted', 'Submitted'), ('updated', 'Updated'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('visibility', 'Visibility changed')], max_length=20),
+        ),
+        migrations.RunPython(classify_events, migrations.RunPython.noop),
+    ]
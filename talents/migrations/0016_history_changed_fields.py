@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('talents', '0015_history_events'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profileupdatehistory',
+            name='changed_fields',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('talents', '0016_history_changed_fields'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='profileupdatehistory',
+            name='history_transition_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='talentprofile',
+            name='talent_public_recent_idx',
+        ),
+        migrations.AddIndex(
+            model_name='talentprofile',
+            index=models.Index(condition=models.Q(('is_publicly_visible', True), models.Q(('status', 'approved'), ('published_revision__isnull', False), _connector='OR')), fields=['-created_at', '-id'], name='talent_public_recent_idx'),
+        ),
+    ]
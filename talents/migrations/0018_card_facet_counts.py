@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:20
+
+from django.db import migrations
+from django.db.models import Count
+
+CARD_FACET_FIELDS = {
+    'role': 'role',
+    'registration_type': 'registration_type',
+    'gender': 'gender_identification',
+    'city': 'city',
+}
+
+
+def count_cards(apps, schema_editor):
+    ShowcaseCard = apps.get_model('talents', 'ShowcaseCard')
+    FacetCount = apps.get_model('talents', 'FacetCount')
+    FacetCount.objects.exclude(facet='status').delete()
+    counts = {}
+    for facet, field in CARD_FACET_FIELDS.items():
+        grouped = ShowcaseCard.objects.exclude(**{field: ''}).values(field).annotate(total=Count('pk')).order_by()
+        for row in grouped:
+            value = row[field].strip()
+            if value:
+                counts[(facet, value)] = counts.get((facet, value), 0) + row['total']
+    FacetCount.objects.bulk_create(
+        FacetCount(status='approved', is_publicly_visible=True, facet=facet, value=value, count=total)
+        for (facet, value), total in counts.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('talents', '0017_public_recent_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(count_cards, migrations.RunPython.noop),
+    ]
@@ -1,18 +1,89 @@
-from django.db import models
+from django.db import connection, models, transaction, OperationalError
+from django.db.models import F
+from django.db.models.fields.files import FieldFile
 from django.contrib.auth.models import User
 from django.urls import reverse
+import copy
+import time
 import uuid
 from django.utils import timezone
 
+from . import roles
+
+class PublicIdSequence(models.Model):
+    """Per-year counter behind the TT-YYYY-NNN public ids"""
+    year = models.PositiveIntegerField(primary_key=True)
+    last_value = models.PositiveIntegerField(default=0)
+    
+    PREFIX = 'TT'
+    
+    # Tries at the counter while the database stays locked past its timeout
+    ALLOCATE_ATTEMPTS = 5
+    
+    @classmethod
+    def format(cls, year, value):
+        return f"{cls.PREFIX}-{year}-{value:03d}"
+    
+    @classmethod
+    def _bump(cls, year, count):
+        """Add count to the year's counter and return its new value, None without a row"""
+        if not connection.features.can_return_columns_from_insert:
+            # No UPDATE ... RETURNING (SQLite before 3.35): read the row back under the write lock
+            if not cls.objects.filter(year=year).update(last_value=F('last_value') + count):
+                return None
+            return cls.objects.values_list('last_value', flat=True).get(year=year)
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {quote(cls._meta.db_table)} SET {quote('last_value')} = {quote('last_value')} + %s "
+                f"WHERE {quote('year')} = %s RETURNING {quote('last_value')}",
+                [count, year],
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
+    
+    @classmethod
+    def allocate(cls, count=1, year=None):
+        """
+        Reserve ``count`` consecutive public ids for ``year`` and return them.
+        
+        The counter row is bumped with a single UPDATE ... RETURNING, which
+        takes the row (PostgreSQL) or database (SQLite) write lock before it
+        reads, so two concurrent callers can never get the same block. Rows of
+        years with existing profiles are seeded by migration 0008; the first
+        id of a new year creates its row with INSERT ... ON CONFLICT DO NOTHING,
+        again a write before any read, so a deferred SQLite transaction never
+        has to upgrade a read lock.
+        """
+        year = year or timezone.now().year
+        for attempt in range(1, cls.ALLOCATE_ATTEMPTS + 1):
+            try:
+                with transaction.atomic():
+                    last_value = cls._bump(year, count)
+                    if last_value is None:
+                        cls.objects.bulk_create([cls(year=year, last_value=0)], ignore_conflicts=True)
+                        last_value = cls._bump(year, count)
+                break
+            except OperationalError:
+                # Still locked by other writers after the database timeout
+                if attempt == cls.ALLOCATE_ATTEMPTS:
+                    raise
+                time.sleep(0.05 * attempt)
+        first = last_value - count + 1
+        return [cls.format(year, value) for value in range(first, last_value + 1)]
+    
+    def __str__(self):
+        return f"{self.year}: {self.last_value}"
+
+def _comparable(value):
+    """A field value as changed_fields() compares it (files by name)"""
+    if isinstance(value, FieldFile):
+        return value.name or None
+    return value
+
 class TalentProfile(models.Model):
-    TALENT_ROLES = [
-        ('dancer', 'Dancer'),
-        ('acrobat', 'Acrobat'),
-        ('performer', 'Performer'),
-        ('musician', 'Musician'),
-        ('entertainer', 'Entertainer'),
-        ('bar_service', 'Bar & Service Staff'),
-    ]
+    # Labels, emoji and descriptions live in talents/roles.py
+    TALENT_ROLES = roles.CHOICES
     
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -39,7 +110,9 @@ class TalentProfile(models.Model):
     registration_type = models.CharField(max_length=10, choices=REGISTRATION_TYPE_CHOICES, default='personal')
     group_name = models.CharField(max_length=100, blank=True, null=True, help_text="Group name (required for group registrations)")
     
-    # Personal information (hidden from public)
+    # Personal information (hidden from public): changing it needs no
+    # moderation and leaves public pages and their caches alone
+    PRIVATE_FIELDS = ('phone', 'email_private')
     phone = models.CharField(max_length=20)
     email_private = models.EmailField(blank=True)
     
@@ -51,6 +124,11 @@ class TalentProfile(models.Model):
     
     # Media
     profile_image = models.ImageField(upload_to='profiles/', blank=True, null=True)
+    # Filled in after upload by talents/images.py
+    profile_image_width = models.PositiveIntegerField(blank=True, null=True)
+    profile_image_height = models.PositiveIntegerField(blank=True, null=True)
+    profile_image_placeholder = models.TextField(blank=True)
+    profile_image_color = models.CharField(max_length=7, blank=True)
     cv_file = models.FileField(upload_to='cvs/', blank=True, null=True)
     
     # Additional details
@@ -68,6 +146,8 @@ class TalentProfile(models.Model):
     is_publicly_visible = models.BooleanField(default=False)
     last_approved_at = models.DateTimeField(blank=True, null=True)
     approved_by = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True, related_name='approved_profiles')
+    # Frozen snapshot read by public pages (see talents/revisions.py)
+    published_revision = models.ForeignKey('ProfileRevision', on_delete=models.SET_NULL, blank=True, null=True, related_name='+')
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -75,13 +155,68 @@ class TalentProfile(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Moderator list, unfiltered and per status, paginated on (created_at, id)
+            models.Index(fields=['-created_at', '-id'], name='talent_recent_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='talent_status_recent_idx'),
+            # Public profiles as talents/showcase.py selects them: published
+            # profiles stay listed while an edit of theirs is pending
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='talent_public_recent_idx',
+                condition=models.Q(is_publicly_visible=True) & (
+                    models.Q(status='approved') | models.Q(published_revision__isnull=False)
+                ),
+            ),
+        ]
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # What the row held when loaded, for changed_fields()
+        instance._loaded_values = instance._current_values()
+        return instance
+    
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        if hasattr(self, '_loaded_values'):
+            self._loaded_values = {**self._loaded_values, **self._current_values(fields)}
+    
+    def _current_values(self, fields=None):
+        return {
+            field.attname: _comparable(getattr(self, field.attname))
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__ and (fields is None or field.name in fields or field.attname in fields)
+        }
+    
+    def changed_fields(self):
+        """
+        Names of the fields that differ from the row as it was loaded (or
+        last saved), None for a profile that did not come from the database
+        """
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return None
+        return [
+            field.name
+            for field in self._meta.concrete_fields
+            if not field.primary_key and field.attname in self.__dict__
+            and (field.attname not in loaded or _comparable(getattr(self, field.attname)) != loaded[field.attname])
+        ]
     
     def save(self, *args, **kwargs):
         if not self.public_id:
-            year = timezone.now().year
-            count = TalentProfile.objects.count()
-            self.public_id = f"TT-{year}-{count:03d}"
+            self.public_id = PublicIdSequence.allocate()[0]
+        if not args and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            changed = None if self._state.adding else self.changed_fields()
+            if changed is not None:
+                if not changed:
+                    # Nothing to write
+                    return
+                # Only the changed columns (updated_at is set by auto_now)
+                kwargs['update_fields'] = [*changed, 'updated_at']
         super().save(*args, **kwargs)
+        self._loaded_values = {**getattr(self, '_loaded_values', {}), **self._current_values(kwargs.get('update_fields'))}
     
     @property
     def display_name(self):
@@ -94,29 +229,31 @@ class TalentProfile(models.Model):
     def is_approved(self):
         return self.status == 'approved'
     
+    @property
+    def is_published(self):
+        """Whether public pages show this profile (its published snapshot)"""
+        return self.is_publicly_visible and (self.published_revision_id is not None or self.status == 'approved')
+    
+    def published_version(self):
+        """
+        Copy of this profile carrying the field values of its published
+        revision, for public rendering while an edit waits for review
+        """
+        revision = self.published_revision
+        if revision is None or revision.data is None:
+            return self
+        published = copy.copy(self)
+        for field, value in revision.data.items():
+            setattr(published, field, value)
+        return published
+    
     @property
     def performance_style(self):
-        styles = {
-            'dancer': 'Contemporary, Latin, Jazz',
-            'acrobat': 'Aerial, Hand Balancing',
-            'performer': 'Theater, Musical',
-            'musician': 'Jazz, Blues, Pop',
-            'entertainer': 'Comedy, Interactive',
-            'bar_service': 'Mixology, Fine Dining',
-        }
-        return styles.get(self.role, 'Various Styles')
+        return roles.get(self.role).style
     
     @property
     def specialties(self):
-        specialties = {
-            'dancer': 'Choreography, Partner Work',
-            'acrobat': 'Silks, Trapeze, Contortion',
-            'performer': 'Character Work, Improv',
-            'musician': 'Multi-instrumental',
-            'entertainer': 'Audience Interaction',
-            'bar_service': 'Craft Cocktails, Wine',
-        }
-        return specialties.get(self.role, 'Multi-disciplinary')
+        return roles.get(self.role).specialties
     
     def __str__(self):
         return f"{self.display_name} ({self.public_id})"
@@ -124,10 +261,20 @@ class TalentProfile(models.Model):
 class TalentPhoto(models.Model):
     talent = models.ForeignKey(TalentProfile, on_delete=models.CASCADE, related_name='photos')
     image = models.ImageField(upload_to='talent_photos/')
+    # Filled in after upload by talents/images.py
+    width = models.PositiveIntegerField(blank=True, null=True)
+    height = models.PositiveIntegerField(blank=True, null=True)
+    placeholder = models.TextField(blank=True)
+    color = models.CharField(max_length=7, blank=True)
     caption = models.CharField(max_length=200, blank=True)
     is_approved = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['talent', 'is_approved'], name='photo_talent_approved_idx'),
+        ]
+    
     def __str__(self):
         return f"Photo for {self.talent.public_id}"
 
@@ -145,6 +292,11 @@ class TalentVideo(models.Model):
     is_approved = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['talent', 'is_approved'], name='video_talent_approved_idx'),
+        ]
+    
     def clean(self):
         from django.core.exceptions import ValidationError
         if self.video_url:
@@ -155,12 +307,188 @@ class TalentVideo(models.Model):
         return f"{self.title} - {self.talent.public_id}"
 
 class ProfileUpdateHistory(models.Model):
+    # What happened, for the moderator event feed (see talents/events.py)
+    EVENT_CHOICES = [
+        ('submitted', 'Submitted'),
+        ('updated', 'Updated'),
+        ('approved', 'Approved'),
+        ('rejected', 'Rejected'),
+        ('visibility', 'Visibility changed'),
+    ]
+    
     talent = models.ForeignKey(TalentProfile, on_delete=models.CASCADE, related_name='update_history')
     updated_by = models.ForeignKey(User, on_delete=models.CASCADE)
     updated_at = models.DateTimeField(auto_now_add=True)
     changes_summary = models.TextField()
     previous_status = models.CharField(max_length=10, choices=TalentProfile.STATUS_CHOICES)
     new_status = models.CharField(max_length=10, choices=TalentProfile.STATUS_CHOICES)
+    event = models.CharField(max_length=20, choices=EVENT_CHOICES, blank=True)
+    # Names of the profile fields the update changed
+    changed_fields = models.JSONField(default=list, blank=True)
+    
+    def __str__(self):
+        return f"{self.talent.public_id} - {self.updated_at.strftime('%Y-%m-%d %H:%M')}"
+
+class ProfileRevision(models.Model):
+    """
+    One submitted version of a profile. changes is the field-level diff
+    {field: [published value, submitted value]} against the snapshot that
+    was public at the time; approving the revision freezes the complete
+    field values in data and makes it the profile's published_revision.
+    """
+    # Profile fields a revision covers (the ones TalentProfileForm edits);
+    # file fields are stored by name
+    FIELDS = [
+        'phone', 'city', 'role', 'bio', 'experience', 'profile_image', 'cv_file',
+        'height', 'gender_identification', 'pronouns', 'hair_color', 'eye_color',
+        'agency', 'union_affiliations', 'availability',
+    ]
+    FILE_FIELDS = ('profile_image', 'cv_file')
+    
+    talent = models.ForeignKey(TalentProfile, on_delete=models.CASCADE, related_name='revisions')
+    number = models.PositiveIntegerField()
+    status = models.CharField(max_length=10, choices=TalentProfile.STATUS_CHOICES, default='pending')
+    changes = models.JSONField(default=dict)
+    data = models.JSONField(blank=True, null=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True, related_name='profile_revisions')
+    created_at = models.DateTimeField(auto_now_add=True)
+    reviewed_by = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True, related_name='reviewed_revisions')
+    reviewed_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['talent', '-number']
+        constraints = [
+            models.UniqueConstraint(fields=['talent', 'number'], name='talents_revision_unique_number'),
+            models.UniqueConstraint(
+                fields=['talent'],
+                condition=models.Q(status='pending'),
+                name='talents_revision_one_pending',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.talent_id} revision {self.number} ({self.status})"
+    
+    def change_list(self):
+        """(label, old value, new value) of every changed field, in form order"""
+        return [
+            (TalentProfile._meta.get_field(field).verbose_name, *self.changes[field])
+            for field in self.FIELDS
+            if field in self.changes
+        ]
+
+
+class FacetCount(models.Model):
+    """Precomputed number of profiles per (status, visibility, facet, value)"""
+    FACET_CHOICES = [
+        ('role', 'Role'),
+        ('registration_type', 'Registration type'),
+        ('gender', 'Gender'),
+        ('city', 'City'),
+        ('status', 'Status'),
+    ]
+    
+    status = models.CharField(max_length=10, choices=TalentProfile.STATUS_CHOICES)
+    is_publicly_visible = models.BooleanField()
+    facet = models.CharField(max_length=20, choices=FACET_CHOICES)
+    value = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['status', 'is_publicly_visible', 'facet', 'value'],
+                name='talents_facetcount_unique_key',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.facet}={self.value} ({self.status}, public={self.is_publicly_visible}): {self.count}"
+
+
+class ShowcaseCard(models.Model):
+    """
+    Read model for public listings, one row per approved and publicly
+    visible profile. Written only by the moderation paths (see
+    talents/showcase.py), so pending edits never leak into listings.
+    """
+    profile = models.OneToOneField(TalentProfile, on_delete=models.CASCADE, primary_key=True, related_name='showcase_card')
+    public_id = models.CharField(max_length=20)
+    display_name = models.CharField(max_length=255)
+    role = models.CharField(max_length=20, choices=TalentProfile.TALENT_ROLES)
+    role_label = models.CharField(max_length=50)
+    registration_type = models.CharField(max_length=10, choices=TalentProfile.REGISTRATION_TYPE_CHOICES)
+    gender_identification = models.CharField(max_length=20, blank=True)
+    city = models.CharField(max_length=100)
+    experience = models.CharField(max_length=50)
+    bio_excerpt = models.TextField()
+    thumbnail_url = models.CharField(max_length=255, blank=True)
+    thumbnail_width = models.PositiveIntegerField(blank=True, null=True)
+    thumbnail_height = models.PositiveIntegerField(blank=True, null=True)
+    thumbnail_placeholder = models.TextField(blank=True)
+    thumbnail_color = models.CharField(max_length=7, blank=True)
+    has_video = models.BooleanField(default=False)
+    has_cv = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at', '-profile']
+        indexes = [
+            models.Index(fields=['-created_at', '-profile'], name='card_recent_idx'),
+            models.Index(fields=['role', '-created_at', '-profile'], name='card_role_recent_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.display_name} ({self.public_id})"
+
+
+class StoredBlob(models.Model):
+    """Number of file fields referencing one stored upload (see talents/blobs.py)"""
+    name = models.CharField(max_length=255, primary_key=True)
+    refcount = models.IntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.name}: {self.refcount}"
+
+
+class ModerationLease(models.Model):
+    """
+    Time-limited claim of a pending profile by one moderator (see
+    talents/queue.py). An expired lease no longer blocks anyone.
+    """
+    talent = models.OneToOneField(TalentProfile, on_delete=models.CASCADE, primary_key=True, related_name='moderation_lease')
+    moderator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='moderation_leases')
+    claimed_at = models.DateTimeField()
+    expires_at = models.DateTimeField()
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['moderator', 'expires_at'], name='lease_moderator_idx'),
+            models.Index(fields=['expires_at'], name='lease_expiry_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.talent_id} claimed by {self.moderator_id} until {self.expires_at:%Y-%m-%d %H:%M}"
+
+
+class ModeratorStat(models.Model):
+    """Daily work-queue counters of one moderator"""
+    moderator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='moderation_stats')
+    day = models.DateField()
+    claimed = models.PositiveIntegerField(default=0)
+    # Every decision, and those made on a lease of the moderator
+    decided = models.PositiveIntegerField(default=0)
+    queue_decided = models.PositiveIntegerField(default=0)
+    released = models.PositiveIntegerField(default=0)
+    expired = models.PositiveIntegerField(default=0)
+    # Sum of claim-to-decision times of the queue_decided profiles
+    review_seconds = models.FloatField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['moderator', 'day'], name='talents_moderatorstat_unique_day'),
+        ]
     
     def __str__(self):
-        return f"{self.talent.public_id} - {self.updated_at.strftime('%Y-%m-%d %H:%M')}"
\ No newline at end of file
+        return f"{self.moderator_id} on {self.day}: {self.decided} decided"
@@ -0,0 +1,130 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import caching, facets, queue, revisions, search, showcase
+from .models import ProfileUpdateHistory, TalentProfile
+
+# Moderation of many profiles at once.
+#
+# moderate() is the single write path behind the moderator dashboard, its
+# bulk endpoint and the TalentProfileAdmin actions. Whatever the number of
+# profiles it runs a fixed handful of queries: one locking SELECT, one
+# bulk_update, one bulk_create of history rows, then the counter, card and
+# cache updates that save() signals would otherwise do row by row.
+# Approving publishes the profile's pending revision and rejecting drops it
+# (talents/revisions.py). Approving or rejecting skips profiles leased to another moderator in the
+# work queue (talents/queue.py) and closes the leases of decided profiles.
+
+ACTIONS = ('approve', 'reject', 'make_public', 'make_private')
+
+# Fields moderate() may change
+UPDATE_FIELDS = ['status', 'is_publicly_visible', 'last_approved_at', 'approved_by', 'updated_at']
+
+# outcome -> (new status, new visibility, history event, history summary);
+# None keeps the value
+OUTCOMES = {
+    'approved': ('approved', True, 'approved', 'Profile approved and made publicly visible'),
+    'reverted': ('approved', None, 'rejected', 'Profile update rejected - the published version stays live'),
+    'rejected': ('rejected', False, 'rejected', 'Profile rejected'),
+    'made_public': (None, True, 'visibility', 'Profile made publicly visible'),
+    'made_private': (None, False, 'visibility', 'Profile hidden from public listings'),
+}
+
+
+class ModerationError(ValueError):
+    pass
+
+
+def _outcome(profile, action):
+    """What an action does to one profile, None when it would change nothing"""
+    if action == 'approve':
+        if profile.status == 'approved' and profile.is_publicly_visible:
+            return None
+        return 'approved'
+    if action == 'reject':
+        if profile.status == 'pending' and profile.published_revision_id:
+            # A pending edit of a published profile: keep the published version
+            return 'reverted'
+        if profile.status == 'rejected' and not profile.is_publicly_visible:
+            return None
+        return 'rejected'
+    if action == 'make_public':
+        return None if profile.is_publicly_visible else 'made_public'
+    return 'made_private' if profile.is_publicly_visible else None
+
+
+def moderate(ids, action, moderator):
+    """
+    Apply action to the profiles with the given ids in one transaction and
+    return {outcome: [profile ids]} for the profiles that changed.
+    """
+    if action not in ACTIONS:
+        raise ModerationError(f'Unknown moderation action: {action}')
+    ids = sorted({int(pk) for pk in ids})
+    if not ids:
+        return {}
+
+    now = timezone.now()
+    results = defaultdict(list)
+    profiles = (
+        TalentProfile.objects.select_for_update(of=('self',))
+        .filter(pk__in=ids)
+        .only(*facets.STATE_FIELDS, *UPDATE_FIELDS, *revisions.PUBLISH_FIELDS)
+    )
+    if action in ('approve', 'reject'):
+        profiles = profiles.exclude(queue.held_by_others(moderator, now))
+    with transaction.atomic():
+        decided = []
+        for profile in profiles:
+            outcome = _outcome(profile, action)
+            if outcome is not None:
+                decided.append((profile, outcome))
+                results[outcome].append(profile.pk)
+        if not decided:
+            return {}
+        changed = [profile for profile, _ in decided]
+        old_states = [facets.state_of(profile) for profile in changed]
+
+        # Pending edits are published or dropped with the decision
+        published = revisions.publish(
+            [profile for profile, outcome in decided if outcome == 'approved'], moderator, now
+        )
+        revisions.discard(results.get('reverted', []) + results.get('rejected', []), moderator, now)
+
+        history = []
+        for profile, outcome in decided:
+            previous_status = profile.status
+            status, visible, event, summary = OUTCOMES[outcome]
+            if status is not None:
+                profile.status = status
+            if visible is not None:
+                profile.is_publicly_visible = visible
+            if outcome == 'approved':
+                profile.last_approved_at = now
+                profile.approved_by = moderator
+            profile.updated_at = now
+            history.append(ProfileUpdateHistory(
+                talent=profile,
+                updated_by=moderator,
+                previous_status=previous_status,
+                new_status=profile.status,
+                event=event,
+                changes_summary=summary,
+            ))
+        new_states = [facets.state_of(profile) for profile in changed]
+
+        # bulk_update skips save() and its signals: do their work here
+        fields = UPDATE_FIELDS + (revisions.PUBLISH_FIELDS if 'approved' in results else [])
+        TalentProfile.objects.bulk_update(changed, fields, batch_size=500)
+        ProfileUpdateHistory.objects.bulk_create(history, batch_size=500)
+        facets.apply_change(old_states, new_states)
+        for profile in TalentProfile.objects.select_related('user').filter(pk__in=[p.pk for p in published]):
+            search.index_profile(profile)
+        # A rejected edit leaves the published version as it was
+        public_ids = [profile.pk for profile, outcome in decided if outcome != 'reverted']
+        showcase.refresh_cards(public_ids)
+        caching.invalidate(*(caching.profile_tag(pk) for pk in public_ids))
+        queue.complete([pk for outcome in queue.DECISIONS for pk in results.get(outcome, ())], moderator, now)
+    return dict(results)
@@ -0,0 +1,165 @@
+import base64
+import json
+import math
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(values):
+    """Turn a tuple of ordering values into an opaque, URL-safe token"""
+    payload = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def _field(model, key):
+    """The model field behind an ordering key, None for an annotation"""
+    if key == 'pk':
+        return model._meta.pk
+    try:
+        return model._meta.get_field(key)
+    except FieldDoesNotExist:
+        return None
+
+
+def decode_cursor(token, model, keys):
+    """Inverse of encode_cursor, converting values back via the model fields"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor(token)
+    if not isinstance(payload, list) or len(payload) != len(keys):
+        raise InvalidCursor(token)
+
+    values = []
+    for key, value in zip(keys, payload):
+        if value is None:
+            raise InvalidCursor(token)
+        field = _field(model, key)
+        try:
+            if field is not None:
+                value = field.to_python(value)
+            elif isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+                # An annotation such as search_rank
+                value = float(value)
+            else:
+                raise InvalidCursor(token)
+        except (ValidationError, ValueError, TypeError):
+            raise InvalidCursor(token)
+        if value is None:
+            raise InvalidCursor(token)
+        values.append(value)
+    return tuple(values)
+
+
+class KeysetPage:
+    def __init__(self, object_list, has_next, has_previous, keys, params):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self._keys = keys
+        self._params = params
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def _cursor_for(self, obj):
+        return encode_cursor([getattr(obj, key) for key in self._keys])
+
+    @property
+    def next_cursor(self):
+        if self.has_next and self.object_list:
+            return self._cursor_for(self.object_list[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous and self.object_list:
+            return self._cursor_for(self.object_list[0])
+        return None
+
+    def _querystring(self, direction, cursor):
+        params = self._params.copy()
+        params.pop('after', None)
+        params.pop('before', None)
+        params[direction] = cursor
+        return params.urlencode()
+
+    @property
+    def next_querystring(self):
+        cursor = self.next_cursor
+        return self._querystring('after', cursor) if cursor else ''
+
+    @property
+    def previous_querystring(self):
+        cursor = self.previous_cursor
+        return self._querystring('before', cursor) if cursor else ''
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination over a descending composite key.
+
+    Every page is fetched with a plain range predicate on the ordering keys,
+    so page N costs the same as page 1 regardless of how deep the user goes.
+    The last key must be unique (normally the primary key).
+    """
+
+    def __init__(self, queryset, keys=('created_at', 'id'), per_page=None):
+        self.queryset = queryset
+        self.keys = tuple(keys)
+        self.per_page = per_page or getattr(settings, 'TALENTS_PAGE_SIZE', 24)
+
+    def _seek(self, values, lookup):
+        condition = Q()
+        for i, key in enumerate(self.keys):
+            clause = Q(**{f'{key}__{lookup}': values[i]})
+            for prev_key, prev_value in zip(self.keys[:i], values[:i]):
+                clause &= Q(**{prev_key: prev_value})
+            condition |= clause
+        return condition
+
+    def get_page(self, params):
+        after = params.get('after')
+        before = params.get('before')
+        descending = [f'-{key}' for key in self.keys]
+        ascending = list(self.keys)
+
+        try:
+            if before:
+                values = decode_cursor(before, self.queryset.model, self.keys)
+                rows = list(
+                    self.queryset.filter(self._seek(values, 'gt'))
+                    .order_by(*ascending)[:self.per_page + 1]
+                )
+                has_previous = len(rows) > self.per_page
+                rows = rows[:self.per_page]
+                rows.reverse()
+                return KeysetPage(rows, True, has_previous, self.keys, params)
+
+            if after:
+                values = decode_cursor(after, self.queryset.model, self.keys)
+                qs = self.queryset.filter(self._seek(values, 'lt'))
+                has_previous = True
+            else:
+                qs = self.queryset
+                has_previous = False
+        except (InvalidCursor, ValueError, TypeError):
+            # A cursor the database cannot compare: start over
+            qs = self.queryset
+            has_previous = False
+
+        rows = list(qs.order_by(*descending)[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        return KeysetPage(rows[:self.per_page], has_next, has_previous, self.keys, params)
@@ -0,0 +1,174 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, OuterRef, Sum
+from django.utils import timezone
+
+from .models import ModerationLease, ModeratorStat, TalentProfile
+
+# Moderator work queue.
+#
+# claim() hands a moderator the oldest pending profiles nobody else holds and
+# records a ModerationLease for each. The profile rows are read with
+# select_for_update(skip_locked=True), so concurrent claims on PostgreSQL pass
+# over each other's candidates instead of waiting; the lease primary key is
+# what finally decides ownership, which keeps SQLite (no row locks, writers
+# serialized) correct as well. A lease ends when the profile is decided
+# (see talents/moderation.py), when it is released, or when it expires; expired
+# leases are ignored right away and purged by the next claim or by the
+# expire_moderation_leases command.
+#
+# ModeratorStat keeps daily counters per moderator for throughput metrics.
+
+# Outcomes of talents.moderation that take a profile out of the queue
+DECISIONS = ('approved', 'reverted', 'rejected')
+
+
+def lease_duration():
+    return timedelta(seconds=getattr(settings, 'MODERATION_LEASE_SECONDS', 15 * 60))
+
+
+def batch_size():
+    return getattr(settings, 'MODERATION_QUEUE_BATCH', 10)
+
+
+def _bump(moderator_id, day, **deltas):
+    lookup = dict(moderator_id=moderator_id, day=day)
+    if ModeratorStat.objects.filter(**lookup).update(**{name: F(name) + value for name, value in deltas.items()}):
+        return
+    try:
+        with transaction.atomic():
+            ModeratorStat.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Created concurrently by another writer
+        ModeratorStat.objects.filter(**lookup).update(**{name: F(name) + value for name, value in deltas.items()})
+
+
+def held_by_others(moderator, now=None):
+    """Exists() of a live lease on a profile row held by another moderator"""
+    return Exists(
+        ModerationLease.objects.filter(talent=OuterRef('pk'), expires_at__gt=now or timezone.now())
+        .exclude(moderator=moderator)
+    )
+
+
+def held(moderator, now=None):
+    """Leases the moderator currently holds, oldest claim first"""
+    return (
+        ModerationLease.objects.filter(moderator=moderator, expires_at__gt=now or timezone.now())
+        .order_by('claimed_at', 'talent_id')
+    )
+
+
+def expire(now=None):
+    """Delete expired leases, counting them against their moderators"""
+    now = now or timezone.now()
+    with transaction.atomic():
+        expired = list(
+            ModerationLease.objects.select_for_update()
+            .filter(expires_at__lte=now)
+            .values_list('talent_id', 'moderator_id', 'expires_at')
+        )
+        if not expired:
+            return 0
+        ModerationLease.objects.filter(talent_id__in=[talent_id for talent_id, _, _ in expired]).delete()
+        per_day = Counter((moderator_id, timezone.localdate(expires_at)) for _, moderator_id, expires_at in expired)
+        for (moderator_id, day), count in per_day.items():
+            _bump(moderator_id, day, expired=count)
+    return len(expired)
+
+
+def claim(moderator, count=None):
+    """
+    Renew the moderator's leases and top them up to count pending profiles.
+    Returns the ids of the profiles now leased to the moderator.
+    """
+    count = count or batch_size()
+    now = timezone.now()
+    expires_at = now + lease_duration()
+    expire(now)
+    with transaction.atomic():
+        wanted = count - held(moderator, now).update(expires_at=expires_at)
+        if wanted > 0:
+            candidates = list(
+                TalentProfile.objects.select_for_update(skip_locked=True, of=('self',))
+                .filter(status='pending')
+                .exclude(Exists(ModerationLease.objects.filter(talent=OuterRef('pk'))))
+                .order_by('created_at', 'id')
+                .values_list('pk', flat=True)[:wanted]
+            )
+            # Lost races show up as conflicts on the lease primary key
+            ModerationLease.objects.bulk_create(
+                [
+                    ModerationLease(talent_id=pk, moderator=moderator, claimed_at=now, expires_at=expires_at)
+                    for pk in candidates
+                ],
+                ignore_conflicts=True,
+            )
+            granted = ModerationLease.objects.filter(
+                talent_id__in=candidates, moderator=moderator, claimed_at=now
+            ).count()
+            if granted:
+                _bump(moderator.pk, timezone.localdate(now), claimed=granted)
+    return list(held(moderator, now).values_list('talent_id', flat=True))
+
+
+def release(moderator, talent_ids=None):
+    """Give the moderator's leases (or some of them) back to the queue"""
+    leases = ModerationLease.objects.filter(moderator=moderator)
+    if talent_ids is not None:
+        leases = leases.filter(talent_id__in=list(talent_ids))
+    with transaction.atomic():
+        released, _ = leases.delete()
+        if released:
+            _bump(moderator.pk, timezone.localdate(), released=released)
+    return released
+
+
+def complete(talent_ids, moderator, now=None):
+    """
+    Close the leases of profiles the moderator has just decided and record
+    the decisions. Must run in the transaction that wrote them.
+    """
+    talent_ids = list(talent_ids)
+    if not talent_ids:
+        return
+    now = now or timezone.now()
+    leases = ModerationLease.objects.filter(talent_id__in=talent_ids)
+    review_times = [
+        (now - claimed_at).total_seconds()
+        for claimed_at in leases.filter(moderator=moderator, expires_at__gt=now).values_list('claimed_at', flat=True)
+    ]
+    leases.delete()
+    _bump(
+        moderator.pk, timezone.localdate(now),
+        decided=len(talent_ids), queue_decided=len(review_times), review_seconds=sum(review_times),
+    )
+
+
+def moderator_stats(days=7):
+    """Per-moderator throughput over the last days, busiest first"""
+    since = timezone.localdate() - timedelta(days=days - 1)
+    holding = Counter(
+        ModerationLease.objects.filter(expires_at__gt=timezone.now()).values_list('moderator_id', flat=True)
+    )
+    rows = (
+        ModeratorStat.objects.filter(day__gte=since)
+        .values('moderator_id', 'moderator__username')
+        .annotate(
+            claimed=Sum('claimed'), decided=Sum('decided'), queue_decided=Sum('queue_decided'),
+            released=Sum('released'), expired=Sum('expired'), review_seconds=Sum('review_seconds'),
+        )
+        .order_by('-decided', 'moderator__username')
+    )
+    stats = []
+    for row in rows:
+        row['holding'] = holding.get(row['moderator_id'], 0)
+        row['per_day'] = round(row['decided'] / days, 1)
+        row['average_review_seconds'] = (
+            round(row['review_seconds'] / row['queue_decided']) if row['queue_decided'] else None
+        )
+        stats.append(row)
+    return stats
@@ -0,0 +1,278 @@
+import copy
+
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from . import blobs, facets, images
+from .models import ProfileRevision, TalentProfile
+
+# Versioned profile edits.
+#
+# A profile that has been published (approved at least once) is never
+# overwritten by its owner: submit() stores the edit as the profile's single
+# pending ProfileRevision, a diff against the published snapshot, and only
+# moves the status to pending. Public pages keep rendering the snapshot
+# (TalentProfile.published_version()), so nothing public changes and no public
+# cache is invalidated until a moderator approves. publish() then applies the
+# diff to the row and freezes the result as the new snapshot inside the
+# moderation transaction (talents/moderation.py); discard() drops a rejected
+# edit. Profiles that were never published are edited in place as before,
+# their revision recording the submission for the moderator.
+#
+# Files proposed by a pending revision hold their own reference in
+# talents/blobs.py until the revision is published or rejected.
+#
+# Only public fields go through moderation: an edit that touches nothing but
+# TalentProfile.PRIVATE_FIELDS (contact details) is written straight to the
+# row, with an UPDATE of just those columns, and the profile keeps its status.
+
+FIELDS = ProfileRevision.FIELDS
+FILE_FIELDS = ProfileRevision.FILE_FIELDS
+# Row fields publish() may change, for the caller's bulk_update
+PUBLISH_FIELDS = FIELDS + ['published_revision'] + list(images.DESCRIPTION_FIELDS[TalentProfile].values())
+
+
+def values_of(profile):
+    """{field: value} of the revisioned fields of a profile, files by name"""
+    values = {}
+    for field in FIELDS:
+        value = getattr(profile, field)
+        if field in FILE_FIELDS:
+            value = value.name if value else ''
+        values[field] = value
+    return values
+
+
+def diff(old, new):
+    """{field: [old value, new value]} for the fields that differ ('' and None are equal)"""
+    return {
+        field: [old.get(field), new[field]]
+        for field in FIELDS
+        if field in new and (old.get(field) or '') != (new[field] or '')
+    }
+
+
+def file_names(changes):
+    """{field: name} of the files a diff proposes"""
+    return {field: change[1] for field, change in changes.items() if field in FILE_FIELDS and change[1]}
+
+
+def pending(profile):
+    return ProfileRevision.objects.filter(talent=profile, status='pending').first()
+
+
+def working_copy(profile):
+    """The profile with its pending edit applied, for the owner's form"""
+    revision = pending(profile) if profile.published_revision_id else None
+    if revision is None:
+        return profile
+    editing = copy.copy(profile)
+    for field, (_, value) in revision.changes.items():
+        setattr(editing, field, value)
+    # changed_fields() then reports what the owner changed in the form
+    editing._loaded_values = editing._current_values()
+    return editing
+
+
+def _store_files(profile):
+    """Save new uploads of an unsaved profile without saving the row"""
+    for field in FILE_FIELDS:
+        file = getattr(profile, field)
+        if file and not file._committed:
+            file.save(file.name, file.file, save=False)
+
+
+def submit(profile, user):
+    """
+    Record a profile edited by its owner (unsaved, e.g. form.save(commit=False)).
+    Returns (revision, changed): the pending revision moderators have to
+    review, None when the edit needs no review, and the names of the fields
+    the edit changed.
+    """
+    new = profile.pk is None
+    with transaction.atomic():
+        published_id = None
+        if not new:
+            published_id = (
+                TalentProfile.objects.select_for_update().filter(pk=profile.pk)
+                .values_list('published_revision', flat=True).get()
+            )
+        revision = (
+            ProfileRevision.objects.select_for_update().filter(talent_id=profile.pk, status='pending').first()
+            if not new else None
+        )
+        old_files = file_names(revision.changes) if revision else {}
+        changed = profile.changed_fields()
+        if changed is None:
+            # A new profile: everything it fills in
+            changed = [field for field, value in values_of(profile).items() if value]
+        changed = [field for field in changed if field in FIELDS]
+        public = [field for field in changed if field not in TalentProfile.PRIVATE_FIELDS]
+
+        if published_id is None:
+            # Nothing public depends on the row: edit it in place
+            profile.published_revision_id = None
+            if public or new:
+                profile.status = 'pending'
+            # Writes only the changed columns, nothing at all without changes
+            profile.save()
+            if not public and not new and revision is None:
+                return None, changed
+            changes = diff({}, values_of(profile))
+            if not public and not new:
+                # Keep the submission the moderator sees current
+                revision.changes = changes
+                revision.save(update_fields=['changes'])
+                return None, changed
+        else:
+            private = [field for field in changed if field in TalentProfile.PRIVATE_FIELDS]
+            if private:
+                # Contact details skip moderation
+                profile.save(update_fields=[*private, 'updated_at'])
+            if not public:
+                return None, changed
+            _store_files(profile)
+            base = ProfileRevision.objects.values_list('data', flat=True).get(pk=published_id)
+            changes = {
+                field: change for field, change in diff(base, values_of(profile)).items()
+                if field not in TalentProfile.PRIVATE_FIELDS
+            }
+            if 'profile_image' in changes and profile.profile_image:
+                # Variants for the owner's and the moderator's previews
+                images.schedule(profile.profile_image)
+            if not changes:
+                # Edited back to what is published
+                if revision is not None:
+                    # Its file references go with it (see signals.py)
+                    revision.delete()
+                return None, changed
+            queryset = TalentProfile.objects.filter(pk=profile.pk).exclude(status='pending')
+            with facets.track(queryset):
+                queryset.update(status='pending', updated_at=timezone.now())
+
+        if revision is None:
+            number = ProfileRevision.objects.filter(talent_id=profile.pk).aggregate(last=Max('number'))['last'] or 0
+            revision = ProfileRevision(talent=profile, number=number + 1, created_by=user)
+        revision.changes = changes
+        revision.save()
+        blobs.apply_change(old_files, file_names(changes))
+    return revision, changed
+
+
+def publish(profiles, moderator, now):
+    """
+    Apply the pending revision of each (locked) profile to it in memory and
+    freeze the result as its new published snapshot. The caller saves the
+    profiles with PUBLISH_FIELDS in the same transaction. Returns the
+    profiles whose field values changed.
+    """
+    profiles = list(profiles)
+    if not profiles:
+        return []
+    ids = [profile.pk for profile in profiles]
+    revisions = {
+        revision.talent_id: revision
+        for revision in ProfileRevision.objects.select_for_update().filter(talent_id__in=ids, status='pending')
+    }
+    last_numbers = dict(
+        ProfileRevision.objects.filter(talent_id__in=ids).order_by()
+        .values('talent').annotate(last=Max('number')).values_list('talent', 'last')
+    )
+    previous_data = dict(
+        ProfileRevision.objects.filter(
+            pk__in=[profile.published_revision_id for profile in profiles if profile.pk not in revisions]
+        ).values_list('pk', 'data')
+    )
+
+    reviewed, created, changed = [], [], []
+    published = []
+    for profile in profiles:
+        revision = revisions.get(profile.pk)
+        before = values_of(profile)
+        if revision is not None:
+            for field, (_, value) in revision.changes.items():
+                setattr(profile, field, value)
+            # The revision's own file references pass to the row
+            blobs.apply_change(file_names(revision.changes), {})
+            reviewed.append(revision)
+        else:
+            # Approved without a submitted edit (e.g. from the admin)
+            revision = ProfileRevision(
+                talent=profile, number=last_numbers.get(profile.pk, 0) + 1, created_by=moderator,
+                changes=diff(previous_data.get(profile.published_revision_id) or {}, before),
+            )
+            created.append(revision)
+        after = values_of(profile)
+        revision.status = 'approved'
+        revision.data = after
+        revision.reviewed_by = moderator
+        revision.reviewed_at = now
+        published.append((profile, revision))
+
+        if before != after:
+            changed.append(profile)
+            blobs.apply_change(
+                {field: before[field] for field in FILE_FIELDS if before[field]},
+                {field: after[field] for field in FILE_FIELDS if after[field]},
+            )
+            if before['profile_image'] != after['profile_image']:
+                # Described again once the variants are written
+                for column in images.DESCRIPTION_FIELDS[TalentProfile].values():
+                    setattr(profile, column, None if column.endswith(('width', 'height')) else '')
+                images.schedule(profile.profile_image)
+
+    ProfileRevision.objects.bulk_update(reviewed, ['status', 'data', 'reviewed_by', 'reviewed_at'])
+    ProfileRevision.objects.bulk_create(created)
+    for profile, revision in published:
+        profile.published_revision = revision
+    return changed
+
+
+def discard(talent_ids, moderator, now):
+    """Reject the pending revisions of the given profiles"""
+    revisions = list(
+        ProfileRevision.objects.select_for_update()
+        .filter(talent_id__in=list(talent_ids), status='pending')
+        .values_list('pk', 'changes')
+    )
+    for _, changes in revisions:
+        blobs.apply_change(file_names(changes), {})
+    ProfileRevision.objects.filter(pk__in=[pk for pk, _ in revisions]).update(
+        status='rejected', reviewed_by=moderator, reviewed_at=now,
+    )
+
+
+def attach_pending(profiles):
+    """Set .pending_revision on each profile (None without one) in one query"""
+    profiles = list(profiles)
+    revisions = {
+        revision.talent_id: revision
+        for revision in ProfileRevision.objects.filter(
+            talent_id__in=[profile.pk for profile in profiles], status='pending'
+        )
+    }
+    for profile in profiles:
+        profile.pending_revision = revisions.get(profile.pk)
+    return profiles
+
+
+def rename_file(name, target):
+    """
+    Point every revision that stores the file name, in its snapshot or its
+    diff, at target instead. Returns the number of revisions rewritten.
+    """
+    matches = Q()
+    for field in FILE_FIELDS:
+        matches |= Q(**{f'data__{field}': name})
+        matches |= Q(**{f'changes__{field}__0': name}) | Q(**{f'changes__{field}__1': name})
+    with transaction.atomic():
+        found = list(ProfileRevision.objects.select_for_update().filter(matches))
+        for revision in found:
+            for field in FILE_FIELDS:
+                if revision.data and revision.data.get(field) == name:
+                    revision.data[field] = target
+                if field in revision.changes:
+                    revision.changes[field] = [target if value == name else value for value in revision.changes[field]]
+        ProfileRevision.objects.bulk_update(found, ['data', 'changes'])
+    return len(found)
@@ -0,0 +1,34 @@
+from typing import NamedTuple
+
+# Talent roles and what the templates show for them.
+#
+# Built once at import: TalentProfile.TALENT_ROLES is derived from ROLES, and
+# templates read the emoji and texts through the filters in
+# talents/templatetags/talent_roles.py (a dict lookup) instead of comparing
+# the role against every value in an {% if %}/{% elif %} chain.
+
+
+class Role(NamedTuple):
+    value: str
+    label: str
+    emoji: str
+    style: str
+    specialties: str
+
+
+ROLES = (
+    Role('dancer', 'Dancer', '💃', 'Contemporary, Latin, Jazz', 'Choreography, Partner Work'),
+    Role('acrobat', 'Acrobat', '🤸', 'Aerial, Hand Balancing', 'Silks, Trapeze, Contortion'),
+    Role('performer', 'Performer', '🎭', 'Theater, Musical', 'Character Work, Improv'),
+    Role('musician', 'Musician', '🎵', 'Jazz, Blues, Pop', 'Multi-instrumental'),
+    Role('entertainer', 'Entertainer', '🎪', 'Comedy, Interactive', 'Audience Interaction'),
+    Role('bar_service', 'Bar & Service Staff', '🍸', 'Mixology, Fine Dining', 'Craft Cocktails, Wine'),
+)
+CHOICES = [(role.value, role.label) for role in ROLES]
+REGISTRY = {role.value: role for role in ROLES}
+# Empty or unknown roles
+UNKNOWN = Role('', '', '', 'Various Styles', 'Multi-disciplinary')
+
+
+def get(value):
+    return REGISTRY.get(value, UNKNOWN)
@@ -0,0 +1,174 @@
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .models import TalentProfile
+
+# Full-text index over TalentProfile.
+#
+# SQLite uses an FTS5 virtual table keyed by the profile id (rowid), PostgreSQL
+# a tsvector table with a GIN index. Both are created by migration 0005 and kept
+# in sync by the receivers in talents/signals.py. Any other backend, or a
+# SQLite build without FTS5, falls back to the old icontains search.
+
+FTS_TABLE = 'talents_search_fts'
+PG_TABLE = 'talents_search_document'
+
+PUBLIC_COLUMNS = ('public_id', 'group_name', 'city', 'bio')
+PRIVATE_COLUMNS = ('first_name', 'last_name', 'email')
+# TalentProfile fields the document is built from (names and email come
+# through user)
+PROFILE_FIELDS = ('public_id', 'group_name', 'city', 'bio', 'user')
+
+# tsvector weights: public fields use A-C, private ones D, so public searches
+# can restrict the match to A-C.
+PG_DOCUMENT_SQL = (
+    "setweight(to_tsvector('simple', coalesce(%s, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(%s, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(%s, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(%s, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(%s, '') || ' ' || coalesce(%s, '') || ' ' || coalesce(%s, '')), 'D')"
+)
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+_backend_cache = {}
+
+
+def backend():
+    """Return 'fts5', 'postgresql' or None for the default connection"""
+    if connection.alias not in _backend_cache:
+        tables = set(connection.introspection.table_names())
+        if connection.vendor == 'sqlite' and FTS_TABLE in tables:
+            _backend_cache[connection.alias] = 'fts5'
+        elif connection.vendor == 'postgresql' and PG_TABLE in tables:
+            _backend_cache[connection.alias] = 'postgresql'
+        else:
+            _backend_cache[connection.alias] = None
+    return _backend_cache[connection.alias]
+
+
+def tokenize(term):
+    return [token.lower() for token in _TOKEN_RE.findall(term or '')][:10]
+
+
+def _fts5_query(tokens, public_only):
+    expression = ' AND '.join(f'"{token}"*' for token in tokens)
+    if public_only:
+        return '{%s} : (%s)' % (' '.join(PUBLIC_COLUMNS), expression)
+    return expression
+
+
+def _pg_query(tokens, public_only):
+    suffix = ':*ABC' if public_only else ':*'
+    return ' & '.join(f'{token}{suffix}' for token in tokens)
+
+
+def _fallback(queryset, term, public_only):
+    condition = (
+        Q(public_id__icontains=term) |
+        Q(group_name__icontains=term) |
+        Q(city__icontains=term)
+    )
+    if public_only:
+        condition |= Q(bio__icontains=term)
+    else:
+        condition |= (
+            Q(user__first_name__icontains=term) |
+            Q(user__last_name__icontains=term) |
+            Q(user__email__icontains=term)
+        )
+    matching_ids = TalentProfile.objects.filter(condition).values('pk')
+    return queryset.filter(pk__in=matching_ids).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+def search(queryset, term, public_only=True):
+    """
+    Filter a TalentProfile (or ShowcaseCard) queryset by a full-text search term.
+
+    The result is annotated with ``search_rank`` (higher is more relevant) so
+    callers can order and paginate on ``('search_rank', 'pk')``. Every token is
+    matched as a prefix, so results update as the user types.
+    """
+    tokens = tokenize(term)
+    engine = backend()
+    if not tokens or engine is None:
+        return _fallback(queryset, term, public_only)
+
+    # The primary key of both models is the profile id
+    table = queryset.model._meta.db_table
+    pk_column = queryset.model._meta.pk.column
+    if engine == 'fts5':
+        match = _fts5_query(tokens, public_only)
+        matching_ids = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', (match,))
+        rank = RawSQL(
+            f'SELECT -rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid = "{table}"."{pk_column}"',
+            (match,),
+            output_field=FloatField(),
+        )
+    else:
+        match = _pg_query(tokens, public_only)
+        matching_ids = RawSQL(
+            f"SELECT profile_id FROM {PG_TABLE} WHERE document @@ to_tsquery('simple', %s)",
+            (match,),
+        )
+        rank = RawSQL(
+            f"SELECT ts_rank(document, to_tsquery('simple', %s)) FROM {PG_TABLE} "
+            f'WHERE profile_id = "{table}"."{pk_column}"',
+            (match,),
+            output_field=FloatField(),
+        )
+    return queryset.filter(pk__in=matching_ids).annotate(search_rank=rank)
+
+
+def index_profile(profile):
+    """Insert or refresh the search document of one profile"""
+    engine = backend()
+    if engine is None:
+        return
+    user = profile.user
+    values = [
+        profile.public_id, profile.group_name, profile.city, profile.bio,
+        user.first_name, user.last_name, user.email,
+    ]
+    with connection.cursor() as cursor:
+        if engine == 'fts5':
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [profile.pk])
+            columns = ', '.join(PUBLIC_COLUMNS + PRIVATE_COLUMNS)
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, {columns}) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)',
+                [profile.pk] + values,
+            )
+        else:
+            cursor.execute(
+                f'INSERT INTO {PG_TABLE} (profile_id, document) VALUES (%s, {PG_DOCUMENT_SQL}) '
+                'ON CONFLICT (profile_id) DO UPDATE SET document = EXCLUDED.document',
+                [profile.pk] + values,
+            )
+
+
+def unindex_profile(profile_id):
+    engine = backend()
+    if engine is None:
+        return
+    with connection.cursor() as cursor:
+        if engine == 'fts5':
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [profile_id])
+        else:
+            cursor.execute(f'DELETE FROM {PG_TABLE} WHERE profile_id = %s', [profile_id])
+
+
+def rebuild_index():
+    """Re-create every search document from the profile table"""
+    engine = backend()
+    if engine is None:
+        return 0
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE if engine == "fts5" else PG_TABLE}')
+    count = 0
+    for profile in TalentProfile.objects.select_related('user').iterator(chunk_size=500):
+        index_profile(profile)
+        count += 1
+    return count
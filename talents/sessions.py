@@ -0,0 +1,73 @@
+from django.contrib.auth import SESSION_KEY
+from django.contrib.sessions.backends import db
+from django.core import signing
+
+# Session engine (SESSION_ENGINE = 'talents.sessions').
+#
+# Anonymous visitors only ever keep a few small values in their session, so
+# their session data travels in a signed cookie, like Django's signed_cookies
+# engine, and costs no database query. As soon as a user is logged in
+# (the session holds the auth user id) the session is stored in the
+# django_session table as usual, so it can be revoked on the server and
+# nothing about the account is handed to the browser. The two kinds of keys
+# cannot be confused: a signed cookie value contains ':', a database session
+# key never does.
+#
+# Expired database sessions are removed by the purge_sessions command.
+
+COOKIE_SALT = 'talents.sessions'
+
+
+class SessionStore(db.SessionStore):
+
+    @staticmethod
+    def _is_signed(session_key):
+        return bool(session_key) and ':' in session_key
+
+    def _in_database(self):
+        return SESSION_KEY in self._get_session()
+
+    def _signed_key(self):
+        return signing.dumps(self._session, compress=True, salt=COOKIE_SALT, serializer=self.serializer)
+
+    def load(self):
+        if not self._is_signed(self.session_key):
+            return super().load()
+        try:
+            data = signing.loads(
+                self.session_key, serializer=self.serializer, max_age=self.get_session_cookie_age(), salt=COOKIE_SALT,
+            )
+        except Exception:
+            # Bad signature or expired: start over
+            self._session_key = None
+            return {}
+        # Signed data is never trusted with a login
+        return data if SESSION_KEY not in data else {}
+
+    def create(self):
+        if self._in_database():
+            return super().create()
+        # Nothing to store yet; save() signs the data into the cookie
+        self._session_key = None
+        self.modified = True
+
+    def save(self, must_create=False):
+        if self._in_database():
+            if self._is_signed(self.session_key):
+                # Just logged in: move the data into a new database session
+                self._session_key = None
+            return super().save(must_create=must_create)
+        self._session_key = self._signed_key()
+        self.modified = True
+
+    def exists(self, session_key):
+        return False if self._is_signed(session_key) else super().exists(session_key)
+
+    def delete(self, session_key=None):
+        if session_key is None and self._is_signed(self.session_key):
+            self._session_key = None
+            self._session_cache = {}
+            self.modified = True
+            return
+        if not self._is_signed(session_key):
+            super().delete(session_key)
@@ -0,0 +1,124 @@
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils.text import Truncator
+
+from . import caching, facets
+from .models import ShowcaseCard, TalentProfile, TalentVideo
+
+BIO_EXCERPT_WORDS = 30
+
+
+def _approved_videos():
+    return TalentVideo.objects.filter(talent=OuterRef('pk'), is_approved=True)
+
+
+def _public_profiles():
+    # Published profiles stay listed while an edit of theirs is pending
+    return (
+        TalentProfile.objects.filter(is_publicly_visible=True)
+        .filter(Q(status='approved') | Q(published_revision__isnull=False))
+        .select_related('user', 'published_revision')
+        .annotate(has_video=Exists(_approved_videos()))
+    )
+
+
+def listing_tags(cards):
+    """Cache tags of the list pages that may show any of the given cards"""
+    tags = {caching.HOME_TAG, caching.SHOWCASE_TAG}
+    for card in cards:
+        tags.add(caching.profile_tag(card['pk']))
+        tags.add(caching.facet_tag('role', card['role']))
+        tags.add(caching.facet_tag('registration_type', card['registration_type']))
+        tags.add(caching.facet_tag('city', card['city']))
+        if card['gender_identification']:
+            tags.add(caching.facet_tag('gender', card['gender_identification']))
+    return tags
+
+
+def _card_values(queryset):
+    return list(queryset.values('pk', 'role', 'registration_type', 'city', 'gender_identification'))
+
+
+def build_card(profile):
+    """
+    Build an unsaved ShowcaseCard from the published version of a profile
+    annotated with has_video
+    """
+    profile = profile.published_version()
+    return ShowcaseCard(
+        profile=profile,
+        public_id=profile.public_id,
+        display_name=profile.display_name[:255],
+        role=profile.role,
+        role_label=profile.get_role_display(),
+        registration_type=profile.registration_type,
+        gender_identification=profile.gender_identification or '',
+        city=profile.city,
+        experience=profile.experience,
+        bio_excerpt=Truncator(profile.bio).words(BIO_EXCERPT_WORDS),
+        thumbnail_url=profile.profile_image.url if profile.profile_image else '',
+        thumbnail_width=profile.profile_image_width,
+        thumbnail_height=profile.profile_image_height,
+        thumbnail_placeholder=profile.profile_image_placeholder,
+        thumbnail_color=profile.profile_image_color,
+        has_video=profile.has_video,
+        has_cv=bool(profile.cv_file),
+        created_at=profile.created_at,
+    )
+
+
+def refresh_cards(profile_ids):
+    """
+    Re-derive the cards of the given profiles: publish approved and public
+    ones, drop everything else.
+    """
+    profile_ids = list(profile_ids)
+    if not profile_ids:
+        return
+    profiles = list(_public_profiles().filter(pk__in=profile_ids))
+    with transaction.atomic():
+        old_cards = ShowcaseCard.objects.filter(pk__in=profile_ids)
+        old_values = _card_values(old_cards)
+        old_cards.delete()
+        new_cards = ShowcaseCard.objects.bulk_create([build_card(profile) for profile in profiles])
+        new_values = [
+            {'pk': card.pk, 'role': card.role, 'registration_type': card.registration_type,
+             'city': card.city, 'gender_identification': card.gender_identification}
+            for card in new_cards
+        ]
+        facets.apply_card_change(old_values, new_values)
+        caching.invalidate(*listing_tags(old_values), *listing_tags(new_values))
+
+
+def refresh_video_flags(profile_ids):
+    """Update has_video after video moderation without republishing the card"""
+    profile_ids = list(profile_ids)
+    cards = ShowcaseCard.objects.filter(pk__in=profile_ids)
+    caching.invalidate(
+        *listing_tags(_card_values(cards)),
+        *(caching.profile_tag(pk) for pk in profile_ids)
+    )
+    cards.update(
+        has_video=Exists(TalentVideo.objects.filter(talent=OuterRef('pk'), is_approved=True))
+    )
+
+
+def rebuild(batch_size=500):
+    """Drop and rebuild every card from the profile table"""
+    count = 0
+    with transaction.atomic():
+        tags = listing_tags(_card_values(ShowcaseCard.objects.all()))
+        ShowcaseCard.objects.all().delete()
+        batch = []
+        for profile in _public_profiles().iterator(chunk_size=batch_size):
+            batch.append(build_card(profile))
+            if len(batch) >= batch_size:
+                ShowcaseCard.objects.bulk_create(batch)
+                count += len(batch)
+                batch = []
+        ShowcaseCard.objects.bulk_create(batch)
+        count += len(batch)
+        tags |= listing_tags(_card_values(ShowcaseCard.objects.all()))
+        facets.rebuild_cards()
+        caching.invalidate(*tags)
+    return count
@@ -0,0 +1,168 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import blobs, caching, facets, images, revisions, search, showcase
+from .models import ProfileRevision, ShowcaseCard, TalentPhoto, TalentProfile, TalentVideo
+
+
+def _touches(update_fields, fields):
+    """Whether a save limited to update_fields (None: all) may write any of fields"""
+    return update_fields is None or not set(update_fields).isdisjoint(fields)
+
+
+def _public_change(update_fields):
+    """Whether a save may change what public pages show"""
+    return update_fields is None or bool(set(update_fields) - {*TalentProfile.PRIVATE_FIELDS, 'updated_at'})
+
+
+@receiver(pre_save, sender=TalentProfile)
+def remember_facet_state(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._facet_previous = None
+    if raw or not instance.pk or not _touches(update_fields, facets.STATE_FIELDS):
+        return
+    instance._facet_previous = (
+        TalentProfile.objects.filter(pk=instance.pk).values(*facets.STATE_FIELDS).first()
+    )
+
+
+@receiver(post_save, sender=TalentProfile)
+def update_facet_counts(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if _touches(update_fields, facets.STATE_FIELDS):
+        previous = getattr(instance, '_facet_previous', None)
+        facets.apply_change([previous] if previous else [], [facets.state_of(instance)])
+    if _public_change(update_fields):
+        # The detail page renders the live row
+        caching.invalidate(caching.profile_tag(instance.pk))
+
+
+@receiver(post_save, sender=TalentProfile)
+def refresh_showcase_card(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    # moderation.moderate() refreshes the cards of the profiles it decides;
+    # this covers plain saves, e.g. the admin change form
+    if raw or not _touches(update_fields, ['status', 'is_publicly_visible']):
+        return
+    previous = getattr(instance, '_facet_previous', None)
+    if previous is None:
+        if not (created and instance.is_published):
+            return
+    elif (previous['status'], previous['is_publicly_visible']) == (instance.status, instance.is_publicly_visible):
+        return
+    showcase.refresh_cards([instance.pk])
+
+
+@receiver(post_save, sender=TalentProfile)
+def index_talent_profile(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or not _touches(update_fields, search.PROFILE_FIELDS):
+        return
+    search.index_profile(instance)
+
+
+def _file_changed(instance, field):
+    """Whether a save stored a different file in field (remember_stored_files() kept the old name)"""
+    file = getattr(instance, field)
+    return bool(file) and getattr(instance, '_blob_previous', {}).get(field) != file.name
+
+
+@receiver(post_save, sender=TalentProfile)
+def resize_profile_image(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or not _touches(update_fields, ['profile_image']) or not _file_changed(instance, 'profile_image'):
+        return
+    images.schedule(instance.profile_image)
+
+
+@receiver(post_save, sender=TalentPhoto)
+def resize_talent_photo(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Approving a photo or editing its caption leaves the variants as they are
+    if raw or not _touches(update_fields, ['image']) or not _file_changed(instance, 'image'):
+        return
+    images.schedule(instance.image)
+
+
+@receiver(post_save, sender=TalentPhoto)
+@receiver(post_delete, sender=TalentPhoto)
+def invalidate_photo_pages(sender, instance, raw=False, **kwargs):
+    # The detail page and its ETag / Last-Modified list the approved photos
+    if raw:
+        return
+    caching.invalidate(caching.profile_tag(instance.talent_id))
+
+
+@receiver(post_save, sender=TalentVideo)
+@receiver(post_delete, sender=TalentVideo)
+def refresh_video_flag(sender, instance, raw=False, **kwargs):
+    # The detail page lists the approved videos, the card shows whether there are any
+    if raw:
+        return
+    showcase.refresh_video_flags([instance.talent_id])
+
+
+@receiver(pre_save, sender=TalentProfile)
+@receiver(pre_save, sender=TalentPhoto)
+def remember_stored_files(sender, instance, raw=False, update_fields=None, **kwargs):
+    touched = _touches(update_fields, blobs.FILE_FIELDS[sender])
+    instance._blob_previous = blobs.stored_names(sender, instance.pk) if touched and not raw else {}
+
+
+@receiver(post_save, sender=TalentProfile)
+@receiver(post_save, sender=TalentPhoto)
+def count_file_references(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or not _touches(update_fields, blobs.FILE_FIELDS[sender]):
+        return
+    blobs.apply_change(getattr(instance, '_blob_previous', {}), blobs.names_of(instance))
+
+
+@receiver(post_delete, sender=TalentProfile)
+@receiver(post_delete, sender=TalentPhoto)
+def release_file_references(sender, instance, **kwargs):
+    blobs.apply_change(blobs.names_of(instance), {})
+
+
+@receiver(post_delete, sender=ProfileRevision)
+def release_revision_files(sender, instance, **kwargs):
+    # Only pending revisions hold references of their own
+    if instance.status == 'pending':
+        blobs.apply_change(revisions.file_names(instance.changes), {})
+
+
+@receiver(pre_delete, sender=TalentProfile)
+def remember_deleted_state(sender, instance, **kwargs):
+    # The stored row, not the possibly stale instance, holds the counted
+    # state; the cascade drops the card without showcase.refresh_cards()
+    instance._facet_previous = (
+        TalentProfile.objects.filter(pk=instance.pk).values(*facets.STATE_FIELDS).first()
+    )
+    instance._card_previous = list(
+        ShowcaseCard.objects.filter(pk=instance.pk)
+        .values('pk', 'role', 'registration_type', 'city', 'gender_identification')
+    )
+
+
+@receiver(post_delete, sender=TalentProfile)
+def unindex_talent_profile(sender, instance, **kwargs):
+    search.unindex_profile(instance.pk)
+    previous = getattr(instance, '_facet_previous', None)
+    facets.apply_change([previous] if previous else [], [])
+    facets.apply_card_change(getattr(instance, '_card_previous', []), [])
+    # The showcase card is removed by the cascade
+    caching.invalidate(*showcase.listing_tags([{
+        'pk': instance.pk,
+        'role': instance.role,
+        'registration_type': instance.registration_type,
+        'city': instance.city,
+        'gender_identification': instance.gender_identification,
+    }]))
+
+
+@receiver(post_save, sender=User)
+def reindex_user_profile(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Names and email are part of the moderator search document
+    if raw or (update_fields and set(update_fields) <= {'last_login', 'password'}):
+        return
+    try:
+        profile = instance.talent_profile
+    except TalentProfile.DoesNotExist:
+        return
+    search.index_profile(profile)
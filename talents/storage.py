@@ -0,0 +1,83 @@
+import hashlib
+import os
+import posixpath
+import uuid
+
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+from . import stylesheet
+
+# Content-addressed file storage for uploads.
+#
+# A file is stored under the SHA-256 of its bytes inside the directory chosen
+# by upload_to, e.g. cvs/56303.pdf -> cvs/3f/3f2a...c9.pdf. Uploading bytes
+# that are already stored returns the existing name instead of writing a copy,
+# so rows share blobs; talents/blobs.py counts the references and deletes a
+# blob once nothing points at it.
+
+
+class ContentAddressedStorage(FileSystemStorage):
+
+    @staticmethod
+    def digest(content):
+        if getattr(content, 'sha256', None):
+            # Computed while the upload was streamed (talents/uploads.py)
+            return content.sha256
+        sha = hashlib.sha256()
+        for chunk in content.chunks():
+            sha.update(chunk)
+        return sha.hexdigest()
+
+    @staticmethod
+    def addressed_name(name, digest):
+        directory = posixpath.dirname(name)
+        stem, extension = posixpath.splitext(posixpath.basename(name))
+        if stem == digest and posixpath.basename(directory) == digest[:2]:
+            # Already stored under its hash
+            return name
+        extension = extension.lower()
+        return posixpath.join(directory, digest[:2], digest + extension)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.addressed_name(name, self.digest(content))
+        if not self.exists(name):
+            self.store_exact(name, content)
+        return name
+
+    def store_exact(self, name, content):
+        """
+        Write content under exactly this name, replacing any existing file.
+
+        The bytes go to a temporary file that is renamed into place, so a
+        concurrent upload of the same content never sees a partial blob.
+        """
+        temporary = super().save(f'{name}.{uuid.uuid4().hex}.part', content)
+        os.replace(self.path(temporary), self.path(name))
+        return name
+
+
+class StylesheetManifestStorage(CompressedManifestStaticFilesStorage):
+    """
+    WhiteNoise's hashed and compressed static files storage that rebuilds
+    the stylesheet (talents/stylesheet.py) during collectstatic.
+
+    The fresh stylesheet replaces the collected copy of static/css/site.css
+    before the files are hashed, so the css/site.<hash>.css referenced by
+    {% static %} and its .gz always match the templates being deployed.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            name = stylesheet.OUTPUT_NAME
+            if self.exists(name):
+                self.delete(name)
+            self._save(name, ContentFile(stylesheet.build().encode()))
+            paths = {**paths, name: (self, name)}
+        yield from super().post_process(paths, dry_run=dry_run, **options)
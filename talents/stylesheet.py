@@ -0,0 +1,772 @@
+import glob
+import re
+from pathlib import Path
+
+from django.conf import settings
+
+# Build-time stylesheet, replacing the Tailwind CDN script.
+#
+# The CDN script compiled the Tailwind classes in the browser on every page
+# view. Instead, build() scans the files listed in STYLESHEET_CONTENT the way
+# Tailwind's own content scanner does (every word-like token is a candidate,
+# so classes written in {% if %} branches or JavaScript strings count too),
+# keeps the tokens that are Tailwind v3 utilities, and writes preflight plus
+# exactly those rules. Tokens that are not utilities are ignored.
+#
+# Only the part of Tailwind the project uses is implemented: the utilities
+# below, the default theme for them, hover:/focus:/group-hover: and the
+# sm:..2xl: breakpoints. A class outside that subset produces no CSS;
+# `manage.py build_css -v 2` lists the ones found in class attributes.
+#
+# The result is static/css/site.css. The build_css command writes it for
+# development, and talents.storage.StylesheetManifestStorage rebuilds it
+# during collectstatic, so the hashed and precompressed copy that WhiteNoise
+# serves with far-future caching always matches the templates.
+
+OUTPUT_NAME = 'css/site.css'
+
+SCREENS = {'sm': '640px', 'md': '768px', 'lg': '1024px', 'xl': '1280px', '2xl': '1536px'}
+# Selector of a state variant around the class selector, in output order
+STATES = {
+    'group-hover': '.group:hover {}',
+    'hover': '{}:hover',
+    'focus': '{}:focus',
+}
+
+COLORS = {
+    'black': '000000',
+    'white': 'ffffff',
+}
+_SHADES = ('50', '100', '200', '300', '400', '500', '600', '700', '800', '900', '950')
+for _name, _values in {
+    'slate': 'f8fafc f1f5f9 e2e8f0 cbd5e1 94a3b8 64748b 475569 334155 1e293b 0f172a 020617',
+    'gray': 'f9fafb f3f4f6 e5e7eb d1d5db 9ca3af 6b7280 4b5563 374151 1f2937 111827 030712',
+    'red': 'fef2f2 fee2e2 fecaca fca5a5 f87171 ef4444 dc2626 b91c1c 991b1b 7f1d1d 450a0a',
+    'orange': 'fff7ed ffedd5 fed7aa fdba74 fb923c f97316 ea580c c2410c 9a3412 7c2d12 431407',
+    'yellow': 'fefce8 fef9c3 fef08a fde047 facc15 eab308 ca8a04 a16207 854d0e 713f12 422006',
+    'green': 'f0fdf4 dcfce7 bbf7d0 86efac 4ade80 22c55e 16a34a 15803d 166534 14532d 052e16',
+    'teal': 'f0fdfa ccfbf1 99f6e4 5eead4 2dd4bf 14b8a6 0d9488 0f766e 115e59 134e4a 042f2e',
+    'blue': 'eff6ff dbeafe bfdbfe 93c5fd 60a5fa 3b82f6 2563eb 1d4ed8 1e40af 1e3a8a 172554',
+    'indigo': 'eef2ff e0e7ff c7d2fe a5b4fc 818cf8 6366f1 4f46e5 4338ca 3730a3 312e81 1e1b4b',
+    'purple': 'faf5ff f3e8ff e9d5ff d8b4fe c084fc a855f7 9333ea 7e22ce 6b21a8 581c87 3b0764',
+    'pink': 'fdf2f8 fce7f3 fbcfe8 f9a8d4 f472b6 ec4899 db2777 be185d 9d174d 831843 500724',
+}.items():
+    COLORS.update({f'{_name}-{shade}': value for shade, value in zip(_SHADES, _values.split())})
+COLOR_KEYWORDS = {'transparent': 'transparent', 'current': 'currentColor', 'inherit': 'inherit'}
+
+SPACING = {'0': '0px', 'px': '1px'}
+SPACING.update({
+    key: f'{float(key) * 0.25:g}rem'
+    for key in (
+        '0.5 1 1.5 2 2.5 3 3.5 4 5 6 7 8 9 10 11 12 14 16 20 24 28 32 36 40 44 48 52 56 60 64 72 80 96'
+    ).split()
+})
+FONT_SIZES = {
+    'xs': ('0.75rem', '1rem'), 'sm': ('0.875rem', '1.25rem'), 'base': ('1rem', '1.5rem'),
+    'lg': ('1.125rem', '1.75rem'), 'xl': ('1.25rem', '1.75rem'), '2xl': ('1.5rem', '2rem'),
+    '3xl': ('1.875rem', '2.25rem'), '4xl': ('2.25rem', '2.5rem'), '5xl': ('3rem', '1'),
+    '6xl': ('3.75rem', '1'), '7xl': ('4.5rem', '1'), '8xl': ('6rem', '1'), '9xl': ('8rem', '1'),
+}
+FONT_WEIGHTS = {
+    'thin': '100', 'extralight': '200', 'light': '300', 'normal': '400', 'medium': '500',
+    'semibold': '600', 'bold': '700', 'extrabold': '800', 'black': '900',
+}
+LEADING = {'none': '1', 'tight': '1.25', 'snug': '1.375', 'normal': '1.5', 'relaxed': '1.625', 'loose': '2'}
+LEADING.update({str(n): f'{n * 0.25:g}rem' for n in range(3, 11)})
+TRACKING = {
+    'tighter': '-0.05em', 'tight': '-0.025em', 'normal': '0em',
+    'wide': '0.025em', 'wider': '0.05em', 'widest': '0.1em',
+}
+MAX_WIDTHS = {
+    'none': 'none', 'xs': '20rem', 'sm': '24rem', 'md': '28rem', 'lg': '32rem', 'xl': '36rem',
+    '2xl': '42rem', '3xl': '48rem', '4xl': '56rem', '5xl': '64rem', '6xl': '72rem', '7xl': '80rem',
+    'full': '100%', 'min': 'min-content', 'max': 'max-content', 'fit': 'fit-content', 'prose': '65ch',
+}
+MAX_WIDTHS.update({f'screen-{name}': width for name, width in SCREENS.items()})
+RADII = {
+    'none': '0px', 'sm': '0.125rem', '': '0.25rem', 'md': '0.375rem', 'lg': '0.5rem',
+    'xl': '0.75rem', '2xl': '1rem', '3xl': '1.5rem', 'full': '9999px',
+}
+SHADOWS = {
+    'sm': '0 1px 2px 0 {0} / 0.05)',
+    '': '0 1px 3px 0 {0} / 0.1), 0 1px 2px -1px {0} / 0.1)',
+    'md': '0 4px 6px -1px {0} / 0.1), 0 2px 4px -2px {0} / 0.1)',
+    'lg': '0 10px 15px -3px {0} / 0.1), 0 4px 6px -4px {0} / 0.1)',
+    'xl': '0 20px 25px -5px {0} / 0.1), 0 8px 10px -6px {0} / 0.1)',
+    '2xl': '0 25px 50px -12px {0} / 0.25)',
+    'inner': 'inset 0 2px 4px 0 {0} / 0.05)',
+}
+BLUR = {'none': '', 'sm': '4px', '': '8px', 'md': '12px', 'lg': '16px', 'xl': '24px', '2xl': '40px', '3xl': '64px'}
+OPACITIES = {str(n): f'{n / 100:g}' for n in range(0, 101, 5)}
+DURATIONS = ('0', '75', '100', '150', '200', '300', '500', '700', '1000')
+SCALES = ('0', '50', '75', '90', '95', '100', '105', '110', '125', '150')
+TRANSITIONS = {
+    '': 'color, background-color, border-color, text-decoration-color, fill, stroke, opacity, '
+        'box-shadow, transform, filter, backdrop-filter',
+    'all': 'all',
+    'colors': 'color, background-color, border-color, text-decoration-color, fill, stroke',
+    'opacity': 'opacity',
+    'shadow': 'box-shadow',
+    'transform': 'transform',
+}
+TRANSFORM = (
+    'transform:translate(var(--tw-translate-x), var(--tw-translate-y)) rotate(var(--tw-rotate)) '
+    'skewX(var(--tw-skew-x)) skewY(var(--tw-skew-y)) scaleX(var(--tw-scale-x)) scaleY(var(--tw-scale-y))'
+)
+EASE = 'transition-timing-function:cubic-bezier(0.4, 0, 0.2, 1)'
+SIDES = {'t': ('top',), 'r': ('right',), 'b': ('bottom',), 'l': ('left',), 'x': ('left', 'right'), 'y': ('top', 'bottom')}
+CORNERS = {
+    't': ('top-left', 'top-right'), 'r': ('top-right', 'bottom-right'),
+    'b': ('bottom-right', 'bottom-left'), 'l': ('top-left', 'bottom-left'),
+    'tl': ('top-left',), 'tr': ('top-right',), 'br': ('bottom-right',), 'bl': ('bottom-left',),
+}
+GRADIENT_DIRECTIONS = {
+    't': 'top', 'tr': 'top right', 'r': 'right', 'br': 'bottom right',
+    'b': 'bottom', 'bl': 'bottom left', 'l': 'left', 'tl': 'top left',
+}
+CHILDREN = '& > :not([hidden]) ~ :not([hidden])'
+
+PREFLIGHT = """\
+*,::before,::after{box-sizing:border-box;border-width:0;border-style:solid;border-color:#e5e7eb}
+::before,::after{--tw-content:''}
+html,:host{line-height:1.5;-webkit-text-size-adjust:100%;-moz-tab-size:4;tab-size:4;font-family:ui-sans-serif, system-ui, sans-serif, "Apple Color Emoji", "Segoe UI Emoji", "Segoe UI Symbol", "Noto Color Emoji";font-feature-settings:normal;font-variation-settings:normal;-webkit-tap-highlight-color:transparent}
+body{margin:0;line-height:inherit}
+hr{height:0;color:inherit;border-top-width:1px}
+abbr:where([title]){text-decoration:underline dotted}
+h1,h2,h3,h4,h5,h6{font-size:inherit;font-weight:inherit}
+a{color:inherit;text-decoration:inherit}
+b,strong{font-weight:bolder}
+code,kbd,samp,pre{font-family:ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, "Liberation Mono", "Courier New", monospace;font-feature-settings:normal;font-variation-settings:normal;font-size:1em}
+small{font-size:80%}
+sub,sup{font-size:75%;line-height:0;position:relative;vertical-align:baseline}
+sub{bottom:-0.25em}
+sup{top:-0.5em}
+table{text-indent:0;border-color:inherit;border-collapse:collapse}
+button,input,optgroup,select,textarea{font-family:inherit;font-feature-settings:inherit;font-variation-settings:inherit;font-size:100%;font-weight:inherit;line-height:inherit;letter-spacing:inherit;color:inherit;margin:0;padding:0}
+button,select{text-transform:none}
+button,input:where([type='button']),input:where([type='reset']),input:where([type='submit']){-webkit-appearance:button;background-color:transparent;background-image:none}
+:-moz-focusring{outline:auto}
+:-moz-ui-invalid{box-shadow:none}
+progress{vertical-align:baseline}
+::-webkit-inner-spin-button,::-webkit-outer-spin-button{height:auto}
+[type='search']{-webkit-appearance:textfield;outline-offset:-2px}
+::-webkit-search-decoration{-webkit-appearance:none}
+::-webkit-file-upload-button{-webkit-appearance:button;font:inherit}
+summary{display:list-item}
+blockquote,dl,dd,h1,h2,h3,h4,h5,h6,hr,figure,p,pre{margin:0}
+fieldset{margin:0;padding:0}
+legend{padding:0}
+ol,ul,menu{list-style:none;margin:0;padding:0}
+dialog{padding:0}
+textarea{resize:vertical}
+input::placeholder,textarea::placeholder{opacity:1;color:#9ca3af}
+button,[role="button"]{cursor:pointer}
+:disabled{cursor:default}
+img,svg,video,canvas,audio,iframe,embed,object{display:block;vertical-align:middle}
+img,video{max-width:100%;height:auto}
+[hidden]{display:none}
+*,::before,::after,::backdrop{--tw-translate-x:0;--tw-translate-y:0;--tw-rotate:0;--tw-skew-x:0;--tw-skew-y:0;--tw-scale-x:1;--tw-scale-y:1;--tw-ring-inset: ;--tw-ring-offset-width:0px;--tw-ring-offset-color:#fff;--tw-ring-color:rgb(59 130 246 / 0.5);--tw-ring-offset-shadow:0 0 #0000;--tw-ring-shadow:0 0 #0000;--tw-shadow:0 0 #0000;--tw-shadow-colored:0 0 #0000}
+"""
+
+# Candidate tokens: runs of characters that can appear in a class name
+TOKEN_RE = re.compile(r"[^\s\"'`<>{}=,;\\]+")
+# Class attributes, and what counts as a class in them, for unknown_classes()
+CLASS_RE = r'-?[a-z][-a-z0-9:/.\[\]#%]*'
+TEMPLATE_TAG_RE = re.compile(r'{%.*?%}|{{.*?}}')
+CLASS_ATTRIBUTE_RE = re.compile(r"""class(?:Name)?=\{?["'`]([^"'`]*)|'class':\s*'([^']*)'""")
+
+
+# Values
+
+def _arbitrary(value):
+    if value.startswith('[') and value.endswith(']') and len(value) > 2:
+        return value[1:-1].replace('_', ' ')
+    return None
+
+
+def _fraction(value):
+    numerator, slash, denominator = value.partition('/')
+    if slash and numerator.isdigit() and denominator.isdigit() and int(denominator):
+        return f'{int(numerator) * 100 / int(denominator):.6f}'.rstrip('0').rstrip('.') + '%'
+    return None
+
+
+def _spacing(value, extra=None):
+    if extra and value in extra:
+        return extra[value]
+    return SPACING.get(value) or _arbitrary(value)
+
+
+def _size(value, screen):
+    return _spacing(value, {'auto': 'auto', 'full': '100%', 'screen': screen,
+                            'min': 'min-content', 'max': 'max-content', 'fit': 'fit-content'}) or _fraction(value)
+
+
+def _negate(value):
+    if value in ('0px', 'auto'):
+        return value if value == '0px' else None
+    return f'-{value}' if value[0].isdigit() else f'calc({value} * -1)'
+
+
+def _color(value):
+    """(rgb channels or None, keyword or alpha) of a theme colour like 'blue-500' or 'white/80'"""
+    value, slash, alpha = value.partition('/')
+    if slash:
+        alpha = OPACITIES.get(alpha) or _arbitrary(alpha)
+        if alpha is None:
+            return None
+    if value in COLOR_KEYWORDS and not slash:
+        return None, COLOR_KEYWORDS[value]
+    hex_value = COLORS.get(value)
+    if hex_value is None:
+        arbitrary = _arbitrary(value)
+        if not arbitrary or not re.fullmatch(r'#[0-9a-fA-F]{6}', arbitrary):
+            return None
+        hex_value = arbitrary[1:]
+    channels = ' '.join(str(int(hex_value[i:i + 2], 16)) for i in (0, 2, 4))
+    return channels, alpha or None
+
+
+def _paint(value, properties, opacity_variable=None):
+    """Declarations setting properties to a colour, with Tailwind's --tw-*-opacity variable"""
+    color = _color(value)
+    if color is None:
+        return None
+    channels, alpha = color
+    if channels is None:
+        return [f'{prop}:{alpha}' for prop in properties]
+    if alpha is not None:
+        return [f'{prop}:rgb({channels} / {alpha})' for prop in properties]
+    if opacity_variable is None:
+        return [f'{prop}:rgb({channels})' for prop in properties]
+    return [f'{opacity_variable}:1'] + [f'{prop}:rgb({channels} / var({opacity_variable}))' for prop in properties]
+
+
+def _transparent(value):
+    """The colour at zero alpha, where a gradient fades out to"""
+    color = _color(value)
+    if color is None:
+        return None
+    channels = color[0] or '255 255 255'
+    return f'rgb({channels} / 0)'
+
+
+def _color_value(value):
+    declarations = _paint(value, ['c'])
+    return declarations and declarations[0][2:]
+
+
+# Utilities: each returns a list of (selector, declarations) for a utility
+# name, '&' standing for the class selector, or None if the name is not one
+# of its utilities. PLUGINS lists them in Tailwind's order, which is the
+# order of the rules in the stylesheet: a later utility wins over an earlier
+# one on the same element (pt-4 over p-6).
+
+def _rule(*declarations):
+    return [('&', list(declarations))]
+
+
+def _exact(table):
+    def utility(name):
+        declarations = table.get(name)
+        return _rule(*declarations) if declarations else None
+    return utility
+
+
+def _prefixed(prefixes, values, negative=False):
+    """Utilities '<prefix>-<value>' setting the prefix's properties to values(value)"""
+    def utility(name):
+        negate = negative and name.startswith('-')
+        name = name[1:] if negate else name
+        for prefix, properties in prefixes.items():
+            if name.startswith(prefix + '-'):
+                value = values(name[len(prefix) + 1:])
+                if value is not None and negate:
+                    value = _negate(value)
+                if value is None:
+                    return None
+                return _rule(*(f'{prop}:{value}' for prop in properties))
+        return None
+    return utility
+
+
+def _sides(prefix, property_template, values, negative=False, sides=('x', 'y', 't', 'r', 'b', 'l')):
+    return _prefixed(
+        {f'{prefix}{side}': [property_template.format(s) for s in SIDES[side]] for side in sides},
+        values, negative,
+    )
+
+
+def _line_clamp(name):
+    if not name.startswith('line-clamp-'):
+        return None
+    value = name[len('line-clamp-'):]
+    if value == 'none':
+        return _rule('overflow:visible', 'display:block', '-webkit-box-orient:horizontal', '-webkit-line-clamp:none')
+    if not value.isdigit():
+        return None
+    return _rule('overflow:hidden', 'display:-webkit-box', '-webkit-box-orient:vertical', f'-webkit-line-clamp:{value}')
+
+
+def _aspect(name):
+    if not name.startswith('aspect-'):
+        return None
+    value = {'auto': 'auto', 'square': '1 / 1', 'video': '16 / 9'}.get(name[7:]) or _arbitrary(name[7:])
+    return value and _rule(f'aspect-ratio:{value}')
+
+
+def _span(prefix, prop):
+    def utility(name):
+        if not name.startswith(prefix):
+            return None
+        value = name[len(prefix):]
+        if value == 'full':
+            return _rule(f'{prop}:1 / -1')
+        return _rule(f'{prop}:span {value} / span {value}') if value.isdigit() else None
+    return utility
+
+
+def _grid_template(prefix, prop):
+    def utility(name):
+        if not name.startswith(prefix):
+            return None
+        value = name[len(prefix):]
+        if value == 'none':
+            return _rule(f'{prop}:none')
+        return _rule(f'{prop}:repeat({value}, minmax(0, 1fr))') if value.isdigit() else None
+    return utility
+
+
+def _translate(name):
+    negate = name.startswith('-')
+    name = name[1:] if negate else name
+    for axis in ('x', 'y'):
+        if name.startswith(f'translate-{axis}-'):
+            value = _size(name[12:], '100%')
+            if value is not None and negate:
+                value = _negate(value)
+            return value and _rule(f'--tw-translate-{axis}:{value}', TRANSFORM)
+    return None
+
+
+def _scale(name):
+    for prefix, axes in (('scale-', 'xy'), ('scale-x-', 'x'), ('scale-y-', 'y')):
+        value = name[len(prefix):]
+        if name.startswith(prefix) and value in SCALES:
+            return _rule(*(f'--tw-scale-{axis}:{int(value) / 100:g}' for axis in axes), TRANSFORM)
+    return None
+
+
+def _space(name):
+    negate = name.startswith('-')
+    name = name[1:] if negate else name
+    for axis, prop in (('x', 'margin-left'), ('y', 'margin-top')):
+        if name.startswith(f'space-{axis}-'):
+            value = _spacing(name[8:])
+            if value is not None and negate:
+                value = _negate(value)
+            return value and [(CHILDREN, [f'{prop}:{value}'])]
+    return None
+
+
+def _divide_width(name):
+    for axis, (start, end) in (('x', ('left', 'right')), ('y', ('top', 'bottom'))):
+        if name == f'divide-{axis}' or name.startswith(f'divide-{axis}-'):
+            width = name[9:] or '1'
+            if not width.isdigit():
+                return None
+            return [(CHILDREN, [f'border-{start}-width:{width}px', f'border-{end}-width:0px'])]
+    return None
+
+
+def _divide_color(name):
+    declarations = name.startswith('divide-') and _paint(name[7:], ['border-color'], '--tw-divide-opacity')
+    return declarations and [(CHILDREN, declarations)]
+
+
+def _rounded(name):
+    if name != 'rounded' and not name.startswith('rounded-'):
+        return None
+    corner, _, value = name[8:].partition('-')
+    if corner in CORNERS:
+        properties = [f'border-{c}-radius' for c in CORNERS[corner]]
+    else:
+        properties, value = ['border-radius'], name[8:]
+    radius = RADII.get(value) or _arbitrary(value)
+    return radius and _rule(*(f'{prop}:{radius}' for prop in properties))
+
+
+def _border_width(name):
+    if name != 'border' and not name.startswith('border-'):
+        return None
+    side, _, value = name[7:].partition('-')
+    if side not in SIDES:
+        side, value = '', name[7:]
+    if value == '':
+        width = '1px'
+    elif value.isdigit():
+        width = f'{value}px'
+    else:
+        width = _arbitrary(value)
+        if width is None or width.startswith('#'):
+            return None
+    if not side:
+        return _rule(f'border-width:{width}')
+    return _rule(*(f'border-{s}-width:{width}' for s in SIDES[side]))
+
+
+def _border_color(name):
+    if not name.startswith('border-'):
+        return None
+    side, _, value = name[7:].partition('-')
+    if side not in SIDES or not value:
+        side, value = '', name[7:]
+    properties = [f'border-{s}-color' for s in SIDES[side]] if side else ['border-color']
+    return _rule_or_none(_paint(value, properties, '--tw-border-opacity'))
+
+
+def _rule_or_none(declarations):
+    return _rule(*declarations) if declarations else None
+
+
+def _colored(prefix, properties, opacity_variable=None, selector='&'):
+    def utility(name):
+        if not name.startswith(prefix):
+            return None
+        declarations = _paint(name[len(prefix):], properties, opacity_variable)
+        return declarations and [(selector, declarations)]
+    return utility
+
+
+def _opacity_variable(prefix, variable):
+    def utility(name):
+        value = name.startswith(prefix) and OPACITIES.get(name[len(prefix):])
+        return value and _rule(f'{variable}:{value}')
+    return utility
+
+
+def _gradient_direction(name):
+    direction = name.startswith('bg-gradient-to-') and GRADIENT_DIRECTIONS.get(name[15:])
+    return direction and _rule(f'background-image:linear-gradient(to {direction}, var(--tw-gradient-stops))')
+
+
+def _gradient_stop(name):
+    stop, _, value = name.partition('-')
+    if stop not in ('from', 'via', 'to') or not value:
+        return None
+    color, transparent = _color_value(value), _transparent(value)
+    if color is None:
+        return None
+    if stop == 'from':
+        return _rule(f'--tw-gradient-from:{color}', f'--tw-gradient-to:{transparent}',
+                     '--tw-gradient-stops:var(--tw-gradient-from), var(--tw-gradient-to)')
+    if stop == 'via':
+        return _rule(f'--tw-gradient-to:{transparent}',
+                     f'--tw-gradient-stops:var(--tw-gradient-from), {color}, var(--tw-gradient-to)')
+    return _rule(f'--tw-gradient-to:{color}')
+
+
+def _fill(name):
+    color = name.startswith('fill-') and _color_value(name[5:])
+    return color and _rule(f'fill:{color}')
+
+
+def _font_size(name):
+    size = name.startswith('text-') and FONT_SIZES.get(name[5:])
+    return size and _rule(f'font-size:{size[0]}', f'line-height:{size[1]}')
+
+
+def _shadow(name):
+    if name != 'shadow' and not name.startswith('shadow-'):
+        return None
+    value = name[7:]
+    if value == 'none':
+        return _rule('--tw-shadow:0 0 #0000', '--tw-shadow-colored:0 0 #0000',
+                     'box-shadow:var(--tw-ring-offset-shadow, 0 0 #0000), var(--tw-ring-shadow, 0 0 #0000), var(--tw-shadow)')
+    shadow = SHADOWS.get(value)
+    if shadow is None:
+        return None
+    return _rule(
+        '--tw-shadow:' + shadow.format('rgb(0 0 0'),
+        '--tw-shadow-colored:' + re.sub(r'\{0\} / [\d.]+\)', 'var(--tw-shadow-color)', shadow),
+        'box-shadow:var(--tw-ring-offset-shadow, 0 0 #0000), var(--tw-ring-shadow, 0 0 #0000), var(--tw-shadow)',
+    )
+
+
+def _shadow_color(name):
+    color = name.startswith('shadow-') and _color_value(name[7:])
+    return color and _rule(f'--tw-shadow-color:{color}', '--tw-shadow:var(--tw-shadow-colored)')
+
+
+def _ring_width(name):
+    if name != 'ring' and not name.startswith('ring-'):
+        return None
+    width = name[5:] or '3'
+    if not width.isdigit():
+        return None
+    return _rule(
+        '--tw-ring-offset-shadow:var(--tw-ring-inset) 0 0 0 var(--tw-ring-offset-width) var(--tw-ring-offset-color)',
+        f'--tw-ring-shadow:var(--tw-ring-inset) 0 0 0 calc({width}px + var(--tw-ring-offset-width)) var(--tw-ring-color)',
+        'box-shadow:var(--tw-ring-offset-shadow), var(--tw-ring-shadow), var(--tw-shadow, 0 0 #0000)',
+    )
+
+
+def _ring_offset_width(name):
+    width = name.startswith('ring-offset-') and name[12:]
+    return width and width.isdigit() and _rule(f'--tw-ring-offset-width:{width}px')
+
+
+def _blur(prefix, properties):
+    def utility(name):
+        if name != prefix and not name.startswith(prefix + '-'):
+            return None
+        radius = BLUR.get(name[len(prefix) + 1:])
+        if radius is None:
+            return None
+        value = f'blur({radius})' if radius else 'none'
+        return _rule(*(f'{prop}:{value}' for prop in properties))
+    return utility
+
+
+def _transition(name):
+    if name != 'transition' and not name.startswith('transition-'):
+        return None
+    if name == 'transition-none':
+        return _rule('transition-property:none')
+    properties = TRANSITIONS.get(name[11:])
+    return properties and _rule(f'transition-property:{properties}', EASE, 'transition-duration:150ms')
+
+
+def _keywords(prefix, prop, values):
+    return _exact({f'{prefix}{value}': [f'{prop}:{css}'] for value, css in values.items()})
+
+
+def _same(*values):
+    return {value: value for value in values}
+
+
+def _inset(value):
+    return _size(value, '100%')
+
+
+PLUGINS = [
+    _exact({
+        'sr-only': ['position:absolute', 'width:1px', 'height:1px', 'padding:0', 'margin:-1px', 'overflow:hidden',
+                    'clip:rect(0, 0, 0, 0)', 'white-space:nowrap', 'border-width:0'],
+        'not-sr-only': ['position:static', 'width:auto', 'height:auto', 'padding:0', 'margin:0', 'overflow:visible',
+                        'clip:auto', 'white-space:normal'],
+    }),
+    _keywords('pointer-events-', 'pointer-events', _same('none', 'auto')),
+    _exact({'visible': ['visibility:visible'], 'invisible': ['visibility:hidden'], 'collapse': ['visibility:collapse']}),
+    _exact({value: [f'position:{value}'] for value in ('static', 'fixed', 'absolute', 'relative', 'sticky')}),
+    _prefixed({'inset': ['top', 'right', 'bottom', 'left']}, _inset, negative=True),
+    _prefixed({'inset-x': ['left', 'right'], 'inset-y': ['top', 'bottom']}, _inset, negative=True),
+    _prefixed({side: [side] for side in ('top', 'right', 'bottom', 'left')}, _inset, negative=True),
+    _prefixed({'z': ['z-index']}, lambda value: value if value == 'auto' or value.isdigit() else None),
+    _prefixed({'order': ['order']}, lambda value: value if value.isdigit() else {'first': '-9999', 'last': '9999', 'none': '0'}.get(value)),
+    _span('col-span-', 'grid-column'),
+    _span('row-span-', 'grid-row'),
+    _keywords('float-', 'float', _same('left', 'right', 'none')),
+    _prefixed({'m': ['margin']}, lambda value: _spacing(value, {'auto': 'auto'}), negative=True),
+    _sides('m', 'margin-{}', lambda value: _spacing(value, {'auto': 'auto'}), negative=True, sides=('x', 'y')),
+    _sides('m', 'margin-{}', lambda value: _spacing(value, {'auto': 'auto'}), negative=True, sides=('t', 'r', 'b', 'l')),
+    _exact({'box-border': ['box-sizing:border-box'], 'box-content': ['box-sizing:content-box']}),
+    _line_clamp,
+    _exact({
+        value: [f'display:{value}']
+        for value in ('block', 'inline-block', 'inline', 'flex', 'inline-flex', 'table', 'table-row', 'table-cell',
+                      'grid', 'inline-grid', 'contents', 'list-item')
+    } | {'hidden': ['display:none']}),
+    _aspect,
+    _prefixed({'h': ['height']}, lambda value: _size(value, '100vh')),
+    _prefixed({'max-h': ['max-height']}, lambda value: _size(value, '100vh')),
+    _prefixed({'min-h': ['min-height']}, lambda value: _size(value, '100vh')),
+    _prefixed({'w': ['width']}, lambda value: _size(value, '100vw')),
+    _prefixed({'min-w': ['min-width']}, lambda value: _size(value, '100vw')),
+    _prefixed({'max-w': ['max-width']}, lambda value: MAX_WIDTHS.get(value) or _arbitrary(value)),
+    _exact({'flex-1': ['flex:1 1 0%'], 'flex-auto': ['flex:1 1 auto'], 'flex-initial': ['flex:0 1 auto'],
+            'flex-none': ['flex:none']}),
+    _exact({'flex-shrink': ['flex-shrink:1'], 'flex-shrink-0': ['flex-shrink:0'],
+            'shrink': ['flex-shrink:1'], 'shrink-0': ['flex-shrink:0']}),
+    _exact({'flex-grow': ['flex-grow:1'], 'flex-grow-0': ['flex-grow:0'], 'grow': ['flex-grow:1'], 'grow-0': ['flex-grow:0']}),
+    _translate,
+    _scale,
+    _exact({'transform': [TRANSFORM], 'transform-none': ['transform:none']}),
+    _keywords('cursor-', 'cursor', _same('auto', 'default', 'pointer', 'wait', 'text', 'move', 'not-allowed')),
+    _keywords('select-', 'user-select', _same('none', 'text', 'all', 'auto')),
+    _exact({'resize-none': ['resize:none'], 'resize-y': ['resize:vertical'], 'resize-x': ['resize:horizontal'],
+            'resize': ['resize:both']}),
+    _keywords('list-', 'list-style-type', _same('none', 'disc', 'decimal')),
+    _exact({'appearance-none': ['appearance:none']}),
+    _grid_template('grid-cols-', 'grid-template-columns'),
+    _grid_template('grid-rows-', 'grid-template-rows'),
+    _keywords('flex-', 'flex-direction', {'row': 'row', 'row-reverse': 'row-reverse', 'col': 'column',
+                                          'col-reverse': 'column-reverse'}),
+    _keywords('flex-', 'flex-wrap', _same('wrap', 'wrap-reverse', 'nowrap')),
+    _keywords('items-', 'align-items', {'start': 'flex-start', 'end': 'flex-end', 'center': 'center',
+                                        'baseline': 'baseline', 'stretch': 'stretch'}),
+    _keywords('justify-', 'justify-content', {'start': 'flex-start', 'end': 'flex-end', 'center': 'center',
+                                              'between': 'space-between', 'around': 'space-around',
+                                              'evenly': 'space-evenly'}),
+    _prefixed({'gap': ['gap']}, _spacing),
+    _prefixed({'gap-x': ['column-gap'], 'gap-y': ['row-gap']}, _spacing),
+    _space,
+    _divide_width,
+    _divide_color,
+    _keywords('self-', 'align-self', {'auto': 'auto', 'start': 'flex-start', 'end': 'flex-end', 'center': 'center',
+                                      'stretch': 'stretch'}),
+    _keywords('overflow-', 'overflow', _same('auto', 'hidden', 'visible', 'scroll')),
+    _keywords('overflow-x-', 'overflow-x', _same('auto', 'hidden', 'visible', 'scroll')),
+    _keywords('overflow-y-', 'overflow-y', _same('auto', 'hidden', 'visible', 'scroll')),
+    _exact({'truncate': ['overflow:hidden', 'text-overflow:ellipsis', 'white-space:nowrap']}),
+    _keywords('whitespace-', 'white-space', _same('normal', 'nowrap', 'pre', 'pre-line', 'pre-wrap')),
+    _exact({'break-words': ['overflow-wrap:break-word'], 'break-all': ['word-break:break-all']}),
+    _rounded,
+    _border_width,
+    _keywords('border-', 'border-style', _same('solid', 'dashed', 'dotted', 'double', 'none')),
+    _border_color,
+    _opacity_variable('border-opacity-', '--tw-border-opacity'),
+    _colored('bg-', ['background-color'], '--tw-bg-opacity'),
+    _opacity_variable('bg-opacity-', '--tw-bg-opacity'),
+    _gradient_direction,
+    _exact({'bg-none': ['background-image:none']}),
+    _gradient_stop,
+    _keywords('bg-', 'background-size', _same('auto', 'cover', 'contain')),
+    _exact({'bg-clip-text': ['-webkit-background-clip:text', 'background-clip:text'],
+            'bg-clip-border': ['background-clip:border-box'], 'bg-clip-padding': ['background-clip:padding-box']}),
+    _keywords('bg-', 'background-position', {'center': 'center', 'top': 'top', 'bottom': 'bottom'}),
+    _exact({'bg-no-repeat': ['background-repeat:no-repeat']}),
+    _fill,
+    _keywords('object-', 'object-fit', _same('contain', 'cover', 'fill', 'none', 'scale-down')),
+    _keywords('object-', 'object-position', _same('center', 'top', 'bottom', 'left', 'right')),
+    _prefixed({'p': ['padding']}, _spacing),
+    _sides('p', 'padding-{}', _spacing, sides=('x', 'y')),
+    _sides('p', 'padding-{}', _spacing, sides=('t', 'r', 'b', 'l')),
+    _keywords('text-', 'text-align', _same('left', 'center', 'right', 'justify', 'start', 'end')),
+    _keywords('align-', 'vertical-align', _same('baseline', 'top', 'middle', 'bottom', 'text-top', 'text-bottom')),
+    _exact({
+        'font-sans': ['font-family:ui-sans-serif, system-ui, sans-serif, "Apple Color Emoji", "Segoe UI Emoji", '
+                      '"Segoe UI Symbol", "Noto Color Emoji"'],
+        'font-serif': ['font-family:ui-serif, Georgia, Cambria, "Times New Roman", Times, serif'],
+        'font-mono': ['font-family:ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, "Liberation Mono", '
+                      '"Courier New", monospace'],
+    }),
+    _font_size,
+    _keywords('font-', 'font-weight', FONT_WEIGHTS),
+    _exact({'uppercase': ['text-transform:uppercase'], 'lowercase': ['text-transform:lowercase'],
+            'capitalize': ['text-transform:capitalize'], 'normal-case': ['text-transform:none']}),
+    _exact({'italic': ['font-style:italic'], 'not-italic': ['font-style:normal']}),
+    _prefixed({'leading': ['line-height']}, lambda value: LEADING.get(value) or _arbitrary(value)),
+    _prefixed({'tracking': ['letter-spacing']}, lambda value: TRACKING.get(value) or _arbitrary(value)),
+    _colored('text-', ['color'], '--tw-text-opacity'),
+    _opacity_variable('text-opacity-', '--tw-text-opacity'),
+    _exact({'underline': ['text-decoration-line:underline'], 'overline': ['text-decoration-line:overline'],
+            'line-through': ['text-decoration-line:line-through'], 'no-underline': ['text-decoration-line:none']}),
+    _colored('placeholder-', ['color'], '--tw-placeholder-opacity', selector='&::placeholder'),
+    _prefixed({'opacity': ['opacity']}, OPACITIES.get),
+    _shadow,
+    _shadow_color,
+    _exact({'outline-none': ['outline:2px solid transparent', 'outline-offset:2px'], 'outline': ['outline-style:solid']}),
+    _ring_width,
+    _exact({'ring-inset': ['--tw-ring-inset:inset']}),
+    _colored('ring-', ['--tw-ring-color'], '--tw-ring-opacity'),
+    _ring_offset_width,
+    _colored('ring-offset-', ['--tw-ring-offset-color']),
+    _blur('blur', ['filter']),
+    _blur('backdrop-blur', ['-webkit-backdrop-filter', 'backdrop-filter']),
+    _transition,
+    _prefixed({'duration': ['transition-duration']}, lambda value: f'{value}ms' if value in DURATIONS else None),
+    _keywords('ease-', 'transition-timing-function', {
+        'linear': 'linear', 'in': 'cubic-bezier(0.4, 0, 1, 1)', 'out': 'cubic-bezier(0, 0, 0.2, 1)',
+        'in-out': 'cubic-bezier(0.4, 0, 0.2, 1)'}),
+]
+
+
+def utility(name):
+    """(plugin index, rules) of a utility name without variants, or None"""
+    for index, plugin in enumerate(PLUGINS):
+        rules = plugin(name)
+        if rules:
+            return index, rules
+    return None
+
+
+def escape(class_name):
+    escaped = re.sub(r'([^a-zA-Z0-9_-])', r'\\\1', class_name)
+    if escaped[0].isdigit():
+        escaped = f'\\3{escaped[0]} {escaped[1:]}'
+    return escaped
+
+
+def _parse(token):
+    """(screen, state, plugin index, rules) of a class, or None if it is not a utility"""
+    *variants, name = token.split(':')
+    screen = state = None
+    for variant in variants:
+        if variant in SCREENS and screen is None and state is None:
+            screen = variant
+        elif variant in STATES and state is None:
+            state = variant
+        else:
+            return None
+    found = utility(name) if name else None
+    if found is None:
+        return None
+    return screen, state, found[0], found[1]
+
+
+def _css_rules(token, state, rules):
+    selector = STATES[state].format(f'.{escape(token)}') if state else f'.{escape(token)}'
+    return [f"{pattern.replace('&', selector)}{{{';'.join(declarations)}}}" for pattern, declarations in rules]
+
+
+def content_files():
+    base = Path(settings.BASE_DIR)
+    for pattern in settings.STYLESHEET_CONTENT:
+        yield from sorted(Path(path) for path in glob.glob(str(base / pattern), recursive=True))
+
+
+def candidates():
+    tokens = set()
+    for path in content_files():
+        tokens.update(TOKEN_RE.findall(path.read_text(encoding='utf-8')))
+    return tokens
+
+
+def unknown_classes():
+    """Words in class attributes of the content files that produce no CSS"""
+    unknown = set()
+    for path in content_files():
+        # Template tags and variables inside the attribute are not classes
+        text = TEMPLATE_TAG_RE.sub(' ', path.read_text(encoding='utf-8'))
+        for match in CLASS_ATTRIBUTE_RE.finditer(text):
+            for token in TOKEN_RE.findall(match.group(1) or match.group(2) or ''):
+                if token != 'group' and re.fullmatch(CLASS_RE, token) and _parse(token) is None:
+                    unknown.add(token)
+    return sorted(unknown)
+
+
+def build(tokens=None):
+    """The stylesheet for the utilities among tokens (default: everything in STYLESHEET_CONTENT)"""
+    parsed = []
+    for token in candidates() if tokens is None else tokens:
+        found = _parse(token)
+        if found:
+            screen, state, index, rules = found
+            state_order = list(STATES).index(state) + 1 if state else 0
+            parsed.append(((state_order, index, token), screen, _css_rules(token, state, rules)))
+    parsed.sort(key=lambda item: item[0])
+
+    lines = [PREFLIGHT.rstrip('\n')]
+    lines.extend(rule for _, screen, rules in parsed if screen is None for rule in rules)
+    for screen, width in SCREENS.items():
+        block = [rule for _, rule_screen, rules in parsed if rule_screen == screen for rule in rules]
+        if block:
+            lines.append(f'@media (min-width:{width}){{')
+            lines.extend(block)
+            lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+
+def output_path():
+    return Path(settings.STATICFILES_DIRS[0]) / OUTPUT_NAME
@@ -0,0 +1,36 @@
+from django import template
+
+from talents import caching
+
+register = template.Library()
+
+
+class CacheFragmentNode(template.Node):
+    def __init__(self, nodelist, key, tags):
+        self.nodelist = nodelist
+        self.key = key
+        self.tags = tags
+
+    def render(self, context):
+        key = self.key.resolve(context)
+        if not key:
+            return self.nodelist.render(context)
+        tags = self.tags.resolve(context) or ()
+        return caching.get_or_set(key, tags, lambda: self.nodelist.render(context))
+
+
+@register.tag('cachefragment')
+def do_cachefragment(parser, token):
+    """
+    Cache the enclosed block under a tagged key::
+
+        {% cachefragment cache_key cache_tags %} ... {% endcachefragment %}
+
+    An empty key disables caching, e.g. for authenticated users.
+    """
+    bits = token.split_contents()
+    if len(bits) != 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires a key and a list of tags")
+    nodelist = parser.parse(('endcachefragment',))
+    parser.delete_first_token()
+    return CacheFragmentNode(nodelist, parser.compile_filter(bits[1]), parser.compile_filter(bits[2]))
@@ -0,0 +1,69 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from talents import images
+
+register = template.Library()
+
+
+@register.simple_tag
+def srcset(image, extension='jpg'):
+    """The srcset attribute value for the derivatives of image in one format"""
+    if not image:
+        return ''
+    return ', '.join(f'{url} {width}w' for url, width in images.variant_urls(image, extension))
+
+
+@register.simple_tag
+def responsive_image(image, sizes='100vw', alt='', width=None, height=None, placeholder='', color='', **attrs):
+    """
+    Render a <picture> for an uploaded image (FieldFile) or the URL of one::
+
+        {% responsive_image talent.profile_image sizes="64px" alt=talent.display_name class="w-16 h-16" %}
+
+    WebP is offered first with a JPEG fallback; sizes tells the browser how
+    wide the image is displayed so it downloads the smallest useful width.
+    Intrinsic size and placeholder come from the row for a FieldFile and can
+    be passed explicitly for a URL (e.g. the thumbnail of a ShowcaseCard).
+    The placeholder is painted behind the image until it has loaded.
+
+    The size is stored together with the derivatives (talents/images.py):
+    without it they are not written yet and a plain <img> of the original is
+    rendered instead.
+    """
+    if not image:
+        return ''
+    described = images.description_of(image)
+    width = width or described.get('width')
+    height = height or described.get('height')
+    placeholder = placeholder or described.get('placeholder')
+    color = color or described.get('color')
+    if not (width and height):
+        attrs.setdefault('loading', 'lazy')
+        attrs.setdefault('decoding', 'async')
+        extra = format_html_join('', ' {}="{}"', ((key.replace('_', '-'), value) for key, value in attrs.items()))
+        return format_html('<img src="{}" alt="{}"{}>', getattr(image, 'url', image), alt, extra)
+    attrs.setdefault('width', width)
+    attrs.setdefault('height', height)
+    if placeholder or color:
+        background = ' '.join(part for part in (color, f'url({placeholder})' if placeholder else '') if part)
+        attrs.setdefault('style', f'background: {background} center / cover no-repeat')
+        attrs.setdefault('onload', "this.style.background='none'")
+    fallback_urls = images.variant_urls(image, 'jpg')
+    # Middle width for browsers that ignore srcset
+    src = fallback_urls[len(fallback_urls) // 2][0]
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (mime, srcset(image, extension), sizes)
+            for extension, _, mime in images.FORMATS
+            if extension != 'jpg'
+        ),
+    )
+    attrs.setdefault('loading', 'lazy')
+    attrs.setdefault('decoding', 'async')
+    extra = format_html_join('', ' {}="{}"', ((key.replace('_', '-'), value) for key, value in attrs.items()))
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" alt="{}"{}></picture>',
+        sources, src, srcset(image, 'jpg'), sizes, alt, extra,
+    )
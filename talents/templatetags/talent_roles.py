@@ -0,0 +1,20 @@
+from django import template
+
+from talents import roles
+
+register = template.Library()
+
+
+@register.filter(is_safe=True)
+def role_emoji(value):
+    """The emoji of a role value::
+
+        {{ talent.role|role_emoji }}
+    """
+    return roles.get(value).emoji
+
+
+@register.filter
+def role_info(value):
+    """The talents.roles.Role of a role value (label, emoji, style, specialties)"""
+    return roles.get(value)
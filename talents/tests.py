@@ -0,0 +1,535 @@
+import atexit
+import copy
+import io
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import caches
+from django.http import QueryDict
+from django.template import Context, Template
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from . import events, facets, images, media, moderation, revisions, showcase
+from .management.commands.explain_hot_queries import Command as ExplainCommand, hot_queries, plan_problems
+from .models import ProfileRevision, PublicIdSequence, ShowcaseCard, TalentPhoto, TalentProfile, TalentVideo
+from .pagination import InvalidCursor, KeysetPaginator, decode_cursor, encode_cursor
+
+TEST_DIR = tempfile.mkdtemp(prefix='talents-tests-')
+atexit.register(shutil.rmtree, TEST_DIR, True)
+TEST_CACHES = copy.deepcopy(settings.CACHES)
+TEST_CACHES['shared']['LOCATION'] = f'{TEST_DIR}/cache.sqlite3'
+# A 1x1 GIF
+GIF = (
+    b'GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00\x00\x00\x00'
+    b',\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;'
+)
+
+test_settings = override_settings(
+    CACHES=TEST_CACHES,
+    MEDIA_ROOT=f'{TEST_DIR}/media',
+    # The manifest storage needs collectstatic
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    # Resize in the test thread, which can see the test transaction
+    TALENTS_IMAGE_WORKERS=0,
+)
+
+
+class TalentsTestMixin:
+    def setUp(self):
+        super().setUp()
+        for alias in settings.CACHES:
+            caches[alias].clear()
+
+    def make_profile(self, number, published=True, **fields):
+        user = User.objects.create_user(
+            f'talent{number}@example.com', f'talent{number}@example.com', 'password',
+            first_name=f'Talent{number}', last_name='Example',
+        )
+        values = {
+            'city': 'Istanbul', 'role': 'dancer', 'experience': '1-2 years',
+            'bio': f'Talent number {number}', 'phone': '5550000000',
+            'status': 'approved' if published else 'pending', 'is_publicly_visible': published,
+        }
+        values.update(fields)
+        return TalentProfile.objects.create(user=user, **values)
+
+    def make_admin(self):
+        return User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+
+@test_settings
+class TalentsTestCase(TalentsTestMixin, TestCase):
+    pass
+
+
+@test_settings
+class TalentsTransactionTestCase(TalentsTestMixin, TransactionTestCase):
+    pass
+
+
+class ShowcaseCardTests(TalentsTestCase):
+    def test_created_public_profile_gets_a_card(self):
+        profile = self.make_profile(1)
+        self.assertTrue(ShowcaseCard.objects.filter(pk=profile.pk).exists())
+        self.assertFalse(ShowcaseCard.objects.filter(pk=self.make_profile(2, published=False).pk).exists())
+
+    def test_hiding_a_profile_in_the_admin_removes_its_card(self):
+        profile = self.make_profile(1)
+        self.assertTrue(ShowcaseCard.objects.filter(pk=profile.pk).exists())
+        self.client.force_login(self.make_admin())
+        url = reverse('admin:talents_talentprofile_change', args=[profile.pk])
+        form = self.client.get(url).context['adminform'].form
+        data = {
+            name: form[name].value() for name in form.fields
+            if form[name].value() is not None and name not in ('profile_image', 'cv_file')
+        }
+        data['is_publicly_visible'] = ''
+
+        response = self.client.post(url, data)
+
+        self.assertEqual(response.status_code, 302)
+        profile.refresh_from_db()
+        self.assertFalse(profile.is_publicly_visible)
+        self.assertFalse(ShowcaseCard.objects.filter(pk=profile.pk).exists())
+        showcase = self.client.get(reverse('talent_showcase'))
+        self.assertNotContains(showcase, reverse('talent_detail', args=[profile.pk]))
+
+
+class RoleFilterTests(TalentsTestCase):
+    def test_role_options_show_the_role_emoji(self):
+        self.make_profile(1)
+        self.assertContains(self.client.get(reverse('talent_showcase')), '💃 Dancer (1)')
+        self.client.force_login(self.make_admin())
+        self.assertContains(self.client.get(reverse('moderator_dashboard')), '🍸 Bar &amp; Service Staff')
+
+
+class ModeratorEventTests(TalentsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.make_admin()
+        self.client.force_login(self.admin)
+        self.url = reverse('moderator_events')
+
+    def test_no_stream_under_wsgi(self):
+        self.assertEqual(self.client.get(self.url).status_code, 204)
+
+    @override_settings(MODERATION_EVENTS_STREAM_SECONDS=0)
+    async def test_stream_under_asgi(self):
+        await sync_to_async(self.async_client.force_login)(self.admin)
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+    def test_poll(self):
+        profile = self.make_profile(1, published=False)
+        after = events.latest_id()
+        moderation.moderate([profile.pk], 'approve', self.admin)
+
+        batch = self.client.get(self.url, {'poll': 1, 'after': after}).json()
+
+        self.assertEqual([event['public_id'] for event in batch['events']], [profile.public_id])
+        self.assertEqual(batch['events'][-1]['stats']['approved'], 1)
+        self.assertEqual(batch['last_id'], batch['events'][-1]['id'])
+        self.assertEqual(self.client.get(self.url, {'poll': 1, 'after': batch['last_id']}).json()['events'], [])
+
+
+class LocationFilterTests(TalentsTestCase):
+    def test_location_is_normalized_for_the_query_and_the_cache(self):
+        izmir = self.make_profile(1, city='Izmir')
+        ankara = self.make_profile(2, city='Ankara')
+        url = reverse('talent_showcase')
+
+        first = self.client.get(url, {'location': ' IZMIR '})
+        second = self.client.get(url, {'location': 'izmir'})
+
+        for response in (first, second):
+            self.assertEqual(response.context['location_filter'], 'izmir')
+            self.assertContains(response, reverse('talent_detail', args=[izmir.pk]))
+            self.assertNotContains(response, reverse('talent_detail', args=[ankara.pk]))
+            self.assertContains(response, '<option value="Izmir" selected>')
+        self.assertEqual(first.context['cache_key'], second.context['cache_key'])
+
+
+class ResponsiveImageTests(TalentsTestCase):
+    def render(self, image):
+        return Template('{% load talent_images %}{% responsive_image image alt="Photo" %}').render(
+            Context({'image': image})
+        )
+
+    def test_original_until_the_variants_exist(self):
+        profile = self.make_profile(1, profile_image=SimpleUploadedFile('face.gif', GIF, 'image/gif'))
+        html = self.render(profile.profile_image)
+        self.assertIn(f'<img src="{profile.profile_image.url}" alt="Photo"', html)
+        self.assertNotIn('<picture>', html)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            images.schedule(profile.profile_image)
+        profile.refresh_from_db()
+        html = self.render(profile.profile_image)
+        self.assertIn('<picture>', html)
+        self.assertIn('.320w.webp', html)
+
+    def test_failed_processing_is_logged(self):
+        photo = TalentPhoto.objects.create(
+            talent=self.make_profile(1), image=SimpleUploadedFile('broken.jpg', b'not an image', 'image/jpeg'),
+        )
+        with self.assertLogs('talents.images', 'ERROR') as logs:
+            with self.captureOnCommitCallbacks(execute=True):
+                images.schedule(photo.image)
+        self.assertIn(photo.image.name, logs.output[0])
+        photo.refresh_from_db()
+        self.assertIsNone(photo.width)
+        self.assertIn(f'src="{photo.image.url}"', self.render(photo.image))
+
+    def test_only_a_new_file_is_resized(self):
+        with mock.patch('talents.images.schedule') as schedule:
+            photo = TalentPhoto.objects.create(
+                talent=self.make_profile(1), image=SimpleUploadedFile('face.gif', GIF, 'image/gif'),
+            )
+            self.assertEqual(schedule.call_count, 1)
+            photo.is_approved = True
+            photo.caption = 'On stage'
+            photo.save()
+            self.assertEqual(schedule.call_count, 1)
+            photo.image = SimpleUploadedFile('other.gif', GIF + b'\0', 'image/gif')
+            photo.save()
+            self.assertEqual(schedule.call_count, 2)
+
+
+class DetailValidatorTests(TalentsTestCase):
+    def validators(self, profile):
+        response = self.client.get(reverse('talent_detail', args=[profile.pk]))
+        self.assertEqual(response.status_code, 200)
+        return response['ETag'], response['Last-Modified']
+
+    def test_photo_changes_refresh_the_validators(self):
+        profile = self.make_profile(1)
+        photo = TalentPhoto(talent=profile, image=SimpleUploadedFile('photo.gif', GIF, 'image/gif'))
+        photo.save()
+        before = self.validators(profile)
+
+        # Cached validators are invalidated on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            photo.is_approved = True
+            photo.save()
+        approved = self.validators(profile)
+        self.assertNotEqual(approved[0], before[0])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            photo.delete()
+        self.assertEqual(self.validators(profile)[0], before[0])
+
+    def test_video_changes_refresh_the_validators_and_the_card(self):
+        profile = self.make_profile(1)
+        before = self.validators(profile)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            video = TalentVideo.objects.create(
+                talent=profile, title='Reel', video_url='https://www.youtube.com/watch?v=abc', is_approved=True,
+            )
+        self.assertNotEqual(self.validators(profile)[0], before[0])
+        self.assertTrue(ShowcaseCard.objects.get(pk=profile.pk).has_video)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            video.delete()
+        self.assertEqual(self.validators(profile)[0], before[0])
+        self.assertFalse(ShowcaseCard.objects.get(pk=profile.pk).has_video)
+
+
+class PublicFacetCountTests(TalentsTestCase):
+    def test_pending_edit_of_published_profile_keeps_its_counts(self):
+        profile = self.make_profile(1, published=False, role='musician', city='Izmir')
+        moderation.moderate([profile.pk], 'approve', self.make_admin())
+        self.assertEqual(facets.public_counts()['role'], {'musician': 1})
+
+        profile = TalentProfile.objects.get(pk=profile.pk)
+        profile.bio = 'An edit waiting for review'
+        revision, _ = revisions.submit(profile, profile.user)
+
+        self.assertIsNotNone(revision)
+        self.assertEqual(TalentProfile.objects.get(pk=profile.pk).status, 'pending')
+        self.assertTrue(ShowcaseCard.objects.filter(pk=profile.pk).exists())
+        self.assertEqual(facets.public_counts()['role'], {'musician': 1})
+        response = self.client.get(reverse('talent_showcase'))
+        self.assertIn(('musician', 'Musician', 1), response.context['talent_roles'])
+        self.assertIn(('Izmir', 1), response.context['unique_locations'])
+
+    def test_counters_follow_the_cards(self):
+        admin = self.make_admin()
+        profiles = [
+            self.make_profile(number, published=False, role=role, city='Izmir')
+            for number, role in enumerate(['musician', 'musician', 'dancer'], start=1)
+        ]
+        moderation.moderate([profile.pk for profile in profiles], 'approve', admin)
+        self.assertEqual(facets.public_counts()['role'], {'musician': 2, 'dancer': 1})
+
+        moderation.moderate([profiles[0].pk], 'make_private', admin)
+        profiles[2].delete()
+
+        self.assertEqual(facets.public_counts()['role'], {'musician': 1})
+        self.assertEqual(facets.public_counts()['city'], {'Izmir': 1})
+        self.assertEqual(facets.drift(), {})
+        with self.assertNumQueries(1):
+            facets.public_counts()
+
+
+class DedupeMediaTests(TalentsTestCase):
+    def test_revisions_follow_the_moved_files(self):
+        old_name = default_storage.store_exact('profiles/legacy.gif', ContentFile(GIF))
+        proposed = default_storage.store_exact('profiles/proposed.gif', ContentFile(GIF))
+        profile = self.make_profile(1, profile_image=old_name)
+        published = ProfileRevision.objects.create(
+            talent=profile, number=1, status='approved', data=revisions.values_of(profile),
+        )
+        TalentProfile.objects.filter(pk=profile.pk).update(published_revision=published, status='pending')
+        pending = ProfileRevision.objects.create(
+            talent=profile, number=2, changes={'profile_image': [old_name, proposed]},
+        )
+
+        call_command('dedupe_media', stdout=io.StringIO())
+
+        target = TalentProfile.objects.get(pk=profile.pk).profile_image.name
+        self.assertNotEqual(target, old_name)
+        self.assertFalse(default_storage.exists(old_name))
+        published.refresh_from_db()
+        pending.refresh_from_db()
+        self.assertEqual(published.data['profile_image'], target)
+        self.assertEqual(pending.changes['profile_image'], [target, proposed])
+        self.assertEqual(TalentProfile.objects.get(pk=profile.pk).published_version().profile_image.name, target)
+
+
+class RangeTests(TalentsTestCase):
+    def test_single_ranges(self):
+        self.assertEqual(media.parse_range('bytes=0-1', 10), (0, 1))
+        self.assertEqual(media.parse_range('bytes=5-', 10), (5, 9))
+        self.assertEqual(media.parse_range('bytes=-3', 10), (7, 9))
+        self.assertEqual(media.parse_range('bytes=8-20', 10), (8, 9))
+
+    def test_ranges_we_do_not_serve_are_ignored(self):
+        for header in ('', 'bytes=0-1,5-6', 'items=0-1', 'bytes=abc', 'bytes=5-2', 'bytes=-0'):
+            self.assertIsNone(media.parse_range(header, 10), header)
+
+    def test_range_past_the_end(self):
+        for header in ('bytes=10-', 'bytes=12-20'):
+            with self.assertRaises(media.RangeNotSatisfiable):
+                media.parse_range(header, 10)
+
+
+class MediaAccessTests(TalentsTestCase):
+    def test_access_is_cached_until_the_owner_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            profile = self.make_profile(1, published=False, profile_image=SimpleUploadedFile('face.gif', GIF, 'image/gif'))
+        url = profile.profile_image.url
+        self.assertEqual(self.client.get(url).status_code, 404)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            moderation.moderate([profile.pk], 'approve', self.make_admin())
+        self.client.logout()
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), GIF)
+
+    def test_a_new_reference_reaches_the_cached_answer(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            hidden = self.make_profile(1, published=False, profile_image=SimpleUploadedFile('face.gif', GIF, 'image/gif'))
+        url = hidden.profile_image.url
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_profile(2, profile_image=SimpleUploadedFile('same.gif', GIF, 'image/gif'))
+
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+
+class QueryCountTests(TalentsTestCase):
+    """The pages run the same number of queries however many profiles exist"""
+    SIZES = (10, 100, 1000)
+
+    def grow_to(self, size):
+        start = TalentProfile.objects.count()
+        count = size - start
+        users = User.objects.bulk_create(
+            User(username=f'bulk{number}@example.com', email=f'bulk{number}@example.com',
+                 first_name=f'Bulk{number}', last_name='Example')
+            for number in range(start, size)
+        )
+        TalentProfile.objects.bulk_create(
+            TalentProfile(
+                user=user, public_id=public_id, city=['Istanbul', 'Ankara', 'Izmir'][number % 3],
+                role=['dancer', 'musician', 'acrobat'][number % 3], experience='1-2 years',
+                bio=f'Bulk talent {number}', phone='5550000000',
+                status='approved' if number % 2 == 0 else 'pending', is_publicly_visible=number % 2 == 0,
+            )
+            for number, user, public_id in zip(range(start, size), users, PublicIdSequence.allocate(count))
+        )
+        showcase.rebuild()
+        facets.rebuild()
+
+    def assert_constant_queries(self, url):
+        expected = None
+        for size in self.SIZES:
+            self.grow_to(size)
+            for alias in settings.CACHES:
+                caches[alias].clear()
+            with self.subTest(size=size):
+                if expected is None:
+                    with CaptureQueriesContext(connection) as queries:
+                        response = self.client.get(url)
+                    expected = len(queries)
+                else:
+                    with self.assertNumQueries(expected):
+                        response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+    def test_home(self):
+        self.assert_constant_queries(reverse('home'))
+
+    def test_showcase(self):
+        self.assert_constant_queries(reverse('talent_showcase'))
+
+    def test_detail_page(self):
+        self.grow_to(self.SIZES[0])
+        card = ShowcaseCard.objects.order_by('created_at').first()
+        self.assert_constant_queries(reverse('talent_detail', args=[card.pk]))
+
+    def test_moderator_dashboard(self):
+        self.client.force_login(self.make_admin())
+        self.assert_constant_queries(reverse('moderator_dashboard'))
+
+
+class QueryPlanTests(TalentsTestCase):
+    """Every hot query is planned with an index (see manage.py explain_hot_queries)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        ExplainCommand().seed(500)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def test_hot_queries_use_an_index(self):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # Small tables are cheaper to scan: only fail when no index can serve the query
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        for label, queryset in hot_queries():
+            with self.subTest(label):
+                plan = queryset.explain()
+                if connection.vendor == 'sqlite':
+                    self.assertRegex(plan, r'USING (COVERING )?INDEX')
+                elif connection.vendor == 'postgresql':
+                    self.assertRegex(plan, r'Index (Only )?Scan')
+                self.assertEqual(plan_problems(plan), [])
+
+
+class CursorTests(TalentsTestCase):
+    def test_decode_coerces_pk_and_rank(self):
+        self.assertEqual(
+            decode_cursor(encode_cursor([2.5, '7']), TalentProfile, ('search_rank', 'pk')), (2.5, 7)
+        )
+
+    def test_decode_rejects_bad_values(self):
+        for payload, keys in [
+            ([1.0, None], ('search_rank', 'pk')),
+            ([None, 3], ('search_rank', 'pk')),
+            (['high', 3], ('search_rank', 'pk')),
+            ([1.0, 'abc'], ('search_rank', 'pk')),
+            ([1.0, [3]], ('search_rank', 'id')),
+            (['yesterday', 3], ('created_at', 'id')),
+        ]:
+            with self.subTest(payload=payload), self.assertRaises(InvalidCursor):
+                decode_cursor(encode_cursor(payload), TalentProfile, keys)
+
+    def test_bad_cursor_falls_back_to_the_first_page(self):
+        profiles = [self.make_profile(number) for number in range(3)]
+        paginator = KeysetPaginator(TalentProfile.objects.all(), keys=('created_at', 'pk'), per_page=2)
+        for cursor in [encode_cursor([None, None]), encode_cursor(['2024-01-01T00:00:00', 'x']), 'not base64!']:
+            with self.subTest(cursor=cursor):
+                page = paginator.get_page(QueryDict(f'after={cursor}'))
+                self.assertFalse(page.has_previous)
+                self.assertEqual([profile.pk for profile in page], [profiles[2].pk, profiles[1].pk])
+
+
+class PublicIdSequenceTests(TalentsTransactionTestCase):
+    def test_concurrent_allocations_get_distinct_ids(self):
+        threads_count, per_thread = 8, 20
+        allocated, errors = [], []
+        start = threading.Barrier(threads_count)
+
+        def allocate():
+            try:
+                start.wait()
+                for _ in range(per_thread):
+                    allocated.extend(PublicIdSequence.allocate(year=2030))
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=allocate) for _ in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(allocated), threads_count * per_thread)
+        self.assertEqual(len(set(allocated)), len(allocated))
+        self.assertEqual(PublicIdSequence.objects.get(year=2030).last_value, threads_count * per_thread)
+
+    def test_register_creates_user_and_profile_together(self):
+        response = self.client.post(reverse('register'), {
+            'registration_type': 'personal', 'email': 'new@example.com',
+            'password1': 'secret-pass-1', 'password2': 'secret-pass-1',
+            'first_name': 'New', 'last_name': 'Talent',
+        })
+        self.assertEqual(response.status_code, 302)
+        profile = TalentProfile.objects.get(user__email='new@example.com')
+        self.assertRegex(profile.public_id, r'^TT-\d{4}-\d{3}$')
+
+    def test_concurrent_registrations_get_consecutive_ids(self):
+        threads_count = 8
+        statuses, errors = [], []
+        start = threading.Barrier(threads_count)
+
+        def register(number):
+            try:
+                client = self.client_class()
+                start.wait()
+                response = client.post(reverse('register'), {
+                    'registration_type': 'personal', 'email': f'new{number}@example.com',
+                    'password1': 'secret-pass-1', 'password2': 'secret-pass-1',
+                    'first_name': 'New', 'last_name': f'Talent{number}',
+                })
+                statuses.append(response.status_code)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=register, args=(number,)) for number in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(statuses, [302] * threads_count)
+        public_ids = list(TalentProfile.objects.values_list('public_id', flat=True))
+        self.assertEqual(len(set(public_ids)), threads_count)
+        self.assertEqual(sorted(int(public_id.rsplit('-', 1)[1]) for public_id in public_ids), list(range(1, threads_count + 1)))
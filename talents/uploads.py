@@ -0,0 +1,170 @@
+import hashlib
+import io
+from functools import wraps
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+from django.http import HttpResponse
+from django.template.defaultfilters import filesizeformat
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from PIL import Image
+
+# Upload handling for the talent forms.
+#
+# Files are streamed to a temporary file in CHUNK_SIZE pieces and hashed on
+# the way (the content-addressed storage reuses the digest). The type is
+# sniffed from the first bytes, never trusted from the client, and images get
+# their dimensions read from the header. A file that breaks the limits of its
+# field in TALENTS_UPLOAD_LIMITS is dropped as soon as that is known; the rest
+# of it is discarded without being stored, and the reason ends up in
+# request.upload_errors so the view can show it on the form.
+
+CHUNK_SIZE = 64 * 1024
+
+# (mime type, test on the first bytes)
+SIGNATURES = (
+    ('image/jpeg', lambda head: head.startswith(b'\xff\xd8\xff')),
+    ('image/png', lambda head: head.startswith(b'\x89PNG\r\n\x1a\n')),
+    ('image/gif', lambda head: head[:6] in (b'GIF87a', b'GIF89a')),
+    ('image/webp', lambda head: head[:4] == b'RIFF' and head[8:12] == b'WEBP'),
+    ('application/pdf', lambda head: head.startswith(b'%PDF-')),
+)
+
+
+def limits(field_name):
+    return getattr(settings, 'TALENTS_UPLOAD_LIMITS', {}).get(field_name)
+
+
+def sniff(head):
+    for mime, matches in SIGNATURES:
+        if matches(head):
+            return mime
+    return None
+
+
+def image_size(file):
+    """(width, height) read from the header of an image file, None if unreadable"""
+    try:
+        with Image.open(file) as image:
+            return image.size
+    except Exception:
+        return None
+
+
+class LimitedUploadHandler(FileUploadHandler):
+    """Stream uploads to disk, enforcing per-field size, type and pixel limits"""
+    chunk_size = CHUNK_SIZE
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        if request is not None:
+            request.upload_errors = {}
+
+    def drop(self, message):
+        self.request.upload_errors[self.field_name] = message
+        # Not called 'file': the parser would try to close it again
+        if self.upload is not None:
+            self.upload.close()
+            self.upload = None
+
+    def reject(self, message):
+        """Drop the file and have the parser skip the rest of it"""
+        self.drop(message)
+        raise SkipFile(message)
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self.upload = None
+        self.limits = limits(field_name)
+        if self.limits is None:
+            self.reject('Files are not accepted for this field.')
+        self.sha256 = hashlib.sha256()
+        self.dimensions = None
+        self.sniffed_type = None
+        self.upload = TemporaryUploadedFile(file_name, content_type, 0, charset, content_type_extra)
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.upload is None:
+            return None
+        max_size = self.limits.get('max_size')
+        if max_size and start + len(raw_data) > max_size:
+            self.reject(f'The file is too large (maximum {filesizeformat(max_size)}).')
+
+        if start == 0:
+            self.sniffed_type = sniff(raw_data)
+            allowed = self.limits.get('types')
+            if allowed and self.sniffed_type not in allowed:
+                self.reject('This file type is not allowed.')
+            if self.sniffed_type and self.sniffed_type.startswith('image/'):
+                # Usually the whole header is in the first chunk
+                self.dimensions = image_size(io.BytesIO(raw_data))
+                if self.too_many_pixels():
+                    self.reject('The image has too many pixels.')
+
+        self.sha256.update(raw_data)
+        self.upload.write(raw_data)
+        return None
+
+    def too_many_pixels(self):
+        max_pixels = self.limits.get('max_pixels')
+        return bool(self.dimensions and max_pixels and self.dimensions[0] * self.dimensions[1] > max_pixels)
+
+    def file_complete(self, file_size):
+        # SkipFile is not handled at this point, so drop() without raising
+        if self.upload is None:
+            return None
+        if self.sniffed_type is None and self.limits.get('types'):
+            # Empty file
+            self.drop('This file type is not allowed.')
+            return None
+        self.upload.seek(0)
+        if self.sniffed_type and self.sniffed_type.startswith('image/') and self.dimensions is None:
+            # Header larger than the first chunk (e.g. big EXIF block)
+            self.dimensions = image_size(self.upload)
+            self.upload.seek(0)
+            if self.dimensions is None:
+                self.drop('The image could not be read.')
+                return None
+            if self.too_many_pixels():
+                self.drop('The image has too many pixels.')
+                return None
+        self.upload.size = file_size
+        self.upload.content_type = self.sniffed_type or self.content_type
+        self.upload.sha256 = self.sha256.hexdigest()
+        self.upload.image_size = self.dimensions
+        return self.upload
+
+
+def limited_uploads(view):
+    """
+    Use LimitedUploadHandler for the multipart bodies of a view. The handlers
+    must be swapped before CSRF checking reads request.POST, so the check is
+    done here instead of in the middleware.
+    """
+    protected = csrf_protect(view)
+
+    @csrf_exempt
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        limit = getattr(settings, 'TALENTS_UPLOAD_MAX_REQUEST_SIZE', None)
+        try:
+            content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            content_length = 0
+        if limit and content_length > limit:
+            # Refuse the whole body before reading any of it
+            return HttpResponse(
+                f'The upload is too large (maximum {filesizeformat(limit)} per submission).',
+                status=413, content_type='text/plain',
+            )
+        request.upload_handlers = [LimitedUploadHandler(request)]
+        return protected(request, *args, **kwargs)
+
+    return wrapper
+
+
+def add_errors(request, form):
+    """Put the reasons uploads were dropped on the matching form fields"""
+    for field_name, message in getattr(request, 'upload_errors', {}).items():
+        form.add_error(field_name if field_name in form.fields else None, message)
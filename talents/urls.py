@@ -9,6 +9,9 @@ urlpatterns = [
     path('about/', views.about, name='about'),
     path('dashboard/', views.dashboard, name='dashboard'),
     path('moderator/', views.moderator_dashboard, name='moderator_dashboard'),
+    path('moderator/queue/', views.moderator_queue, name='moderator_queue'),
+    path('moderator/bulk/', views.moderator_bulk, name='moderator_bulk'),
+    path('moderator/events/', views.moderator_events, name='moderator_events'),
     path('auth/register/', views.register, name='register'),
     path('auth/login/', auth_views.LoginView.as_view(template_name='registration/login.html'), name='login'),
     path('auth/logout/', auth_views.LogoutView.as_view(), name='logout'),
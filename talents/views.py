@@ -1,43 +1,158 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, authenticate
+from django.contrib.auth.views import redirect_to_login
 from django.contrib.auth.decorators import login_required
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
-from django.db.models import Q
-from django.http import HttpResponseRedirect
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseRedirect, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_POST
 from django.utils.translation import gettext as _
 from django.conf import settings
+from django.urls import reverse
 from django.utils import translation
-from django.utils import timezone
-from .models import TalentProfile, TalentPhoto, TalentVideo, ProfileUpdateHistory
+from django.utils.functional import SimpleLazyObject
+from django.utils.http import url_has_allowed_host_and_scheme
+import hashlib
+from asgiref.sync import sync_to_async
+from .models import TalentProfile, TalentPhoto, TalentVideo, ProfileUpdateHistory, ShowcaseCard
 from .forms import TalentProfileForm, TalentPhotoForm, TalentVideoForm
+from .pagination import KeysetPaginator
+from . import async_decorators, caching, events, facets, moderation, queue, revisions, search, uploads
 from django.contrib.auth.models import User
 
-def home(request):
+# Columns the moderator list renders; everything else stays deferred
+CARD_FIELDS = (
+    'id', 'public_id', 'registration_type', 'group_name', 'city', 'role',
+    'experience', 'bio', 'profile_image', 'profile_image_width',
+    'profile_image_height', 'profile_image_placeholder', 'profile_image_color',
+    'cv_file', 'status', 'published_revision',
+    'is_publicly_visible', 'created_at', 'phone',
+    'user__first_name', 'user__last_name', 'user__email',
+)
+
+def public_cache_key(request, namespace, *parts):
+    """Fragment cache key for anonymous visitors, None for everyone else"""
+    if request.user.is_authenticated:
+        return None
+    return caching.make_key(namespace, translation.get_language(), *parts)
+
+def showcase_cache_tags(filters, known_cities):
+    """Tags a showcase result page depends on, given its normalized filters"""
+    facet_filters = {
+        'role': filters['role'],
+        'registration_type': filters['registration_type'],
+        'gender': filters['gender'],
+        'city': filters['location'],
+    }
+    tags = [caching.facet_tag(facet, value) for facet, value in facet_filters.items() if value != 'all']
+    # Search results and partial location matches can change with any card
+    if not tags or filters['search'] or (
+        filters['location'] != 'all' and filters['location'] not in known_cities
+    ):
+        tags.append(caching.SHOWCASE_TAG)
+    return tags
+
+def _viewer(request):
+    """Part of every validator: the rendered navigation depends on who is asking"""
+    user = request.user.pk if request.user.is_authenticated else 'anon'
+    return f"{user}:{translation.get_language()}"
+
+def listing_etag(request, *args, **kwargs):
+    stamp = caching.public_changed_at()
+    raw = f"{stamp.isoformat()}|{_viewer(request)}|{request.get_full_path()}"
+    return hashlib.md5(raw.encode()).hexdigest()
+
+def listing_last_modified(request, *args, **kwargs):
+    return caching.public_changed_at()
+
+def _detail_validators(request, pk):
+    """(etag, last_modified) of a public profile page, or None when it has none"""
+    if not hasattr(request, '_talent_validators'):
+        request._talent_validators = caching.get_or_set(
+            caching.make_key('validators', pk),
+            [caching.profile_tag(pk)],
+            lambda: _compute_detail_validators(pk) or 'none'
+        )
+    validators = request._talent_validators
+    if validators == 'none':
+        return None
+    stamp, last_modified = validators
+    etag = hashlib.md5(f"{stamp}|{_viewer(request)}".encode()).hexdigest()
+    return etag, last_modified
+
+def _compute_detail_validators(pk):
+    profile = TalentProfile.objects.filter(pk=pk, is_publicly_visible=True).filter(
+        Q(status='approved') | Q(published_revision__isnull=False)
+    ).values('updated_at', 'published_revision', 'published_revision__reviewed_at').first()
+    if profile is None:
+        return None
+    # Only publishing a revision changes the page, not submitting an edit
+    if profile['published_revision']:
+        parts = [str(pk), f"r{profile['published_revision']}"]
+        last_modified = profile['published_revision__reviewed_at'] or profile['updated_at']
+    else:
+        parts = [str(pk), profile['updated_at'].isoformat()]
+        last_modified = profile['updated_at']
+    for model in (TalentPhoto, TalentVideo):
+        media = model.objects.filter(talent_id=pk, is_approved=True).aggregate(
+            count=Count('id'), ids=Sum('id'), latest=Max('created_at')
+        )
+        parts.append(f"{media['count']}:{media['ids']}:{media['latest']}")
+        if media['latest'] and media['latest'] > last_modified:
+            last_modified = media['latest']
+    return hashlib.md5('|'.join(parts).encode()).hexdigest(), last_modified
+
+def detail_etag(request, pk):
+    validators = _detail_validators(request, pk)
+    return validators[0] if validators else None
+
+def detail_last_modified(request, pk):
+    validators = _detail_validators(request, pk)
+    return validators[1] if validators else None
+
+# The public pages are async views: under ASGI a request waiting on the
+# database or the cache holds a coroutine, not a worker thread. Queries
+# every request needs go through the async ORM; template rendering (and the
+# lazy querysets it evaluates when a cached fragment is missing), the cache
+# and request.user stay synchronous and run via sync_to_async.
+arender = sync_to_async(render)
+
+# Personality tags based on role and experience
+PERSONALITY_TAGS = [
+    "PROFESSIONAL", "CREATIVE", "PASSIONATE",
+    "RELIABLE", "ENERGETIC", "VERSATILE",
+    "COLLABORATIVE", "DEDICATED", "INNOVATIVE",
+    "EXPERIENCED", "ADAPTABLE", "SKILLED"
+]
+
+@async_decorators.cache_control(private=True, no_cache=True)
+@async_decorators.condition(etag_func=listing_etag, last_modified_func=listing_last_modified)
+async def home(request):
     """Homepage view"""
-    featured_talents = TalentProfile.objects.filter(status='approved', is_publicly_visible=True)[:6]
+    # Evaluated only when the cached fragment is missing
+    featured_talents = SimpleLazyObject(lambda: list(ShowcaseCard.objects.all()[:6]))
     context = {
         'featured_talents': featured_talents,
+        'cache_key': await sync_to_async(public_cache_key)(request, 'home'),
+        'cache_tags': [caching.HOME_TAG],
     }
-    return render(request, 'talents/home.html', context)
+    return await arender(request, 'talents/home.html', context)
 
-def talent_showcase(request):
+@async_decorators.cache_control(private=True, no_cache=True)
+@async_decorators.condition(etag_func=listing_etag, last_modified_func=listing_last_modified)
+async def talent_showcase(request):
     """Public talent showcase - only shows approved profiles"""
-    # Get all approved profiles that are publicly visible
-    talents = TalentProfile.objects.filter(
-        status='approved',
-        is_publicly_visible=True
-    ).order_by('-created_at')
+    # Showcase cards exist only for approved, publicly visible profiles
+    talents = ShowcaseCard.objects.all()
     
-    # Search functionality
+    # Search functionality (full-text, ranked by relevance)
     search_term = request.GET.get('search', '')
     if search_term:
-        talents = talents.filter(
-            Q(public_id__icontains=search_term) |
-            Q(bio__icontains=search_term) |
-            Q(city__icontains=search_term) |
-            Q(group_name__icontains=search_term)
-        )
+        # Looks up the search backend on first use
+        talents = await sync_to_async(search.search)(talents, search_term, public_only=True)
     
     # Role filter
     role_filter = request.GET.get('role', 'all')
@@ -54,23 +169,56 @@ def talent_showcase(request):
     if gender_filter != 'all':
         talents = talents.filter(gender_identification=gender_filter)
     
-    # Location filter
-    location_filter = request.GET.get('location', 'all')
+    # Location filter, normalized once so the query and the cache key agree
+    location_filter = request.GET.get('location', 'all').strip().lower() or 'all'
     if location_filter != 'all':
         talents = talents.filter(city__icontains=location_filter)
     
-    # Get unique locations and roles for filters
-    unique_locations = TalentProfile.objects.filter(
-        status='approved',
-        is_publicly_visible=True
-    ).values_list('city', flat=True).distinct()
+    # Filter options with precomputed result counts
+    counts = await sync_to_async(caching.get_or_set)(
+        caching.make_key('facets', 'showcase'),
+        [caching.FACETS_TAG],
+        facets.public_counts
+    )
+    unique_locations = sorted(counts['city'].items())
     
-    talent_roles = TalentProfile.TALENT_ROLES
-    registration_types = TalentProfile.REGISTRATION_TYPE_CHOICES
-    gender_choices = TalentProfile.GENDER_CHOICES
+    talent_roles = [
+        (value, label, counts['role'].get(value, 0))
+        for value, label in TalentProfile.TALENT_ROLES
+    ]
+    registration_types = [
+        (value, label, counts['registration_type'].get(value, 0))
+        for value, label in TalentProfile.REGISTRATION_TYPE_CHOICES
+    ]
+    gender_choices = [
+        (value, label, counts['gender'].get(value, 0))
+        for value, label in TalentProfile.GENDER_CHOICES
+    ]
+    
+    # Cursor pagination on (created_at, pk), or relevance when searching.
+    # The page is evaluated only when the cached results fragment is missing.
+    keys = ('search_rank', 'pk') if search_term else ('created_at', 'pk')
+    page = SimpleLazyObject(lambda: KeysetPaginator(talents, keys=keys).get_page(request.GET))
+    
+    filters = {
+        'search': search_term.strip().lower(),
+        'role': role_filter,
+        'registration_type': registration_type_filter,
+        'gender': gender_filter,
+        'location': location_filter,
+    }
+    cache_key = await sync_to_async(public_cache_key)(
+        request, 'showcase',
+        *(filters[name] for name in ('search', 'role', 'registration_type', 'gender', 'location')),
+        request.GET.get('after', ''), request.GET.get('before', '')
+    )
+    known_cities = {city.strip().lower() for city in counts['city']}
     
     context = {
-        'talents': talents,
+        'talents': SimpleLazyObject(lambda: page.object_list),
+        'page': page,
+        'cache_key': cache_key,
+        'cache_tags': showcase_cache_tags(filters, known_cities),
         'search_term': search_term,
         'role_filter': role_filter,
         'registration_type_filter': registration_type_filter,
@@ -81,67 +229,48 @@ def talent_showcase(request):
         'registration_types': registration_types,
         'gender_choices': gender_choices,
     }
-    return render(request, 'talents/showcase.html', context)
+    return await arender(request, 'talents/showcase.html', context)
 
-def talent_detail(request, pk):
+@async_decorators.cache_control(private=True, no_cache=True)
+@async_decorators.condition(etag_func=detail_etag, last_modified_func=detail_last_modified)
+async def talent_detail(request, pk):
     """Individual talent profile view - only shows approved profiles"""
     try:
-        talent = TalentProfile.objects.get(pk=pk)
-        
-        # Check if talent is approved and publicly visible
-        if talent.status != 'approved' or not talent.is_publicly_visible:
-            # For staff members, show the profile anyway
-            if request.user.is_staff:
-                photos = talent.photos.filter(is_approved=True)
-                videos = talent.videos.filter(is_approved=True)
-                
-                personality_tags = [
-                    "PROFESSIONAL", "CREATIVE", "PASSIONATE",
-                    "RELIABLE", "ENERGETIC", "VERSATILE",
-                    "COLLABORATIVE", "DEDICATED", "INNOVATIVE",
-                    "EXPERIENCED", "ADAPTABLE", "SKILLED"
-                ]
-                
-                context = {
-                    'talent': talent,
-                    'photos': photos,
-                    'videos': videos,
-                    'personality_tags': personality_tags,
-                    'is_staff_view': True,
-                }
-                return render(request, 'talents/profile.html', context)
-            else:
-                # For regular users, show 404
-                raise TalentProfile.DoesNotExist
-        else:
-            photos = talent.photos.filter(is_approved=True)
-            videos = talent.videos.filter(is_approved=True)
-            
-            # Personality tags based on role and experience
-            personality_tags = [
-                "PROFESSIONAL", "CREATIVE", "PASSIONATE",
-                "RELIABLE", "ENERGETIC", "VERSATILE",
-                "COLLABORATIVE", "DEDICATED", "INNOVATIVE",
-                "EXPERIENCED", "ADAPTABLE", "SKILLED"
-            ]
-            
-            context = {
-                'talent': talent,
-                'photos': photos,
-                'videos': videos,
-                'personality_tags': personality_tags,
-                'is_staff_view': False,
-            }
-            return render(request, 'talents/profile.html', context)
-            
+        talent = await TalentProfile.objects.select_related('user', 'published_revision').aget(pk=pk)
     except TalentProfile.DoesNotExist:
-        return render(request, 'talents/404.html', status=404)
+        return await arender(request, 'talents/404.html', status=404)
+
+    # Check if talent is approved and publicly visible
+    if talent.is_published:
+        # The published snapshot, even while an edit waits for review
+        talent = talent.published_version()
+        context = {
+            'is_staff_view': False,
+            'cache_key': await sync_to_async(public_cache_key)(request, 'detail', talent.pk),
+            'cache_tags': [caching.profile_tag(talent.pk)],
+        }
+    elif await sync_to_async(_is_staff)(request):
+        # For staff members, show the profile anyway
+        context = {'is_staff_view': True, 'cache_key': None}
+    else:
+        # For regular users, show 404
+        return await arender(request, 'talents/404.html', status=404)
 
-def about(request):
+    context.update({
+        'talent': talent,
+        # Evaluated by the template, only when the cached fragment is missing
+        'photos': talent.photos.filter(is_approved=True),
+        'videos': talent.videos.filter(is_approved=True),
+        'personality_tags': PERSONALITY_TAGS,
+    })
+    return await arender(request, 'talents/profile.html', context)
+
+async def about(request):
     """About page"""
-    return render(request, 'talents/about.html')
+    return await arender(request, 'talents/about.html')
 
 @login_required
+@uploads.limited_uploads
 def dashboard(request):
     """Talent dashboard for profile management"""
     try:
@@ -149,58 +278,75 @@ def dashboard(request):
     except TalentProfile.DoesNotExist:
         talent_profile = None
     
+    # The owner edits their pending revision, if any, not the published version
+    editing = revisions.working_copy(talent_profile) if talent_profile else None
+    
     if request.method == 'POST':
-        form = TalentProfileForm(request.POST, request.FILES, instance=talent_profile)
+        previous_status = talent_profile.status if talent_profile else 'pending'
+        form = TalentProfileForm(request.POST, request.FILES, instance=editing)
+        uploads.add_errors(request, form)
         if form.is_valid():
             profile = form.save(commit=False)
             profile.user = request.user
             
             # If this is a new profile, set initial values
+            # (public_id is allocated by TalentProfile.save())
             if not talent_profile:
-                profile.public_id = f"TT-{timezone.now().year}-{TalentProfile.objects.count():03d}"
-                profile.status = 'pending'
                 profile.is_publicly_visible = False
                 profile.email_private = request.user.email
-            else:
-                # If updating an existing profile, set back to pending for re-approval
-                if talent_profile.status == 'approved':
-                    profile.status = 'pending'
-                    # Keep the profile publicly visible until the update is approved
-                    profile.is_publicly_visible = talent_profile.is_publicly_visible
-                    # Record the update for moderation
-                    ProfileUpdateHistory.objects.create(
-                        talent=profile,
-                        updated_by=request.user,
-                        previous_status='approved',
-                        new_status='pending',
-                        changes_summary="Profile update submitted for review"
-                    )
-                else:
-                    # Profile was already pending or rejected
-                    ProfileUpdateHistory.objects.create(
-                        talent=profile,
-                        updated_by=request.user,
-                        previous_status=talent_profile.status,
-                        new_status='pending',
-                        changes_summary="Profile updated and resubmitted for review"
-                    )
             
-            profile.save()
+            # A published profile stays live as it is; the edit is stored as
+            # a revision until a moderator approves it (see talents/revisions.py).
+            # Only the changed columns are written, and contact details skip review.
+            revision, changed = revisions.submit(profile, request.user)
+            labels = ', '.join(str(TalentProfile._meta.get_field(field).verbose_name) for field in changed)
+            
+            if not talent_profile:
+                ProfileUpdateHistory.objects.create(
+                    talent=profile,
+                    updated_by=request.user,
+                    previous_status='pending',
+                    new_status='pending',
+                    event='submitted',
+                    changed_fields=changed,
+                    changes_summary="Profile submitted for review"
+                )
+            elif revision:
+                # Record the update for moderation
+                ProfileUpdateHistory.objects.create(
+                    talent=profile,
+                    updated_by=request.user,
+                    previous_status=previous_status,
+                    new_status='pending',
+                    event='updated',
+                    changed_fields=changed,
+                    changes_summary=(
+                        f"Profile update submitted for review: {labels}"
+                        if talent_profile.published_revision_id
+                        else f"Profile updated and resubmitted for review: {labels}"
+                    )
+                )
             
             # Show success message based on whether profile was submitted for review
             if not talent_profile:
                 messages.success(request, 'Profile submitted successfully! Your profile will be reviewed by our moderators within 2-3 business days.')
-            elif talent_profile.status == 'approved':
+            elif not changed:
+                messages.info(request, 'Nothing was changed.')
+            elif revision is None and set(changed) <= set(TalentProfile.PRIVATE_FIELDS):
+                messages.success(request, 'Your contact details were updated.')
+            elif revision is None:
+                messages.info(request, 'Your profile matches the published version; there is nothing to review.')
+            elif talent_profile.published_revision_id:
                 messages.success(request, 'Profile updated successfully! Your changes will be reviewed by our moderators before going live.')
             else:
                 messages.success(request, 'Profile updated successfully!')
             
             return redirect('dashboard')
     else:
-        form = TalentProfileForm(instance=talent_profile)
+        form = TalentProfileForm(instance=editing)
     
     context = {
-        'talent_profile': talent_profile,
+        'talent_profile': editing,
         'form': form,
     }
     return render(request, 'talents/dashboard.html', context)
@@ -208,19 +354,12 @@ def dashboard(request):
 @staff_member_required
 def moderator_dashboard(request):
     """Moderator dashboard for reviewing applications"""
-    talents = TalentProfile.objects.all().order_by('-created_at')
+    talents = TalentProfile.objects.select_related('user').only(*CARD_FIELDS)
     
-    # Search functionality
+    # Search functionality (full-text, ranked by relevance)
     search_term = request.GET.get('search', '')
     if search_term:
-        talents = talents.filter(
-            Q(public_id__icontains=search_term) |
-            Q(user__first_name__icontains=search_term) |
-            Q(user__last_name__icontains=search_term) |
-            Q(user__email__icontains=search_term) |
-            Q(group_name__icontains=search_term) |
-            Q(city__icontains=search_term)
-        )
+        talents = search.search(talents, search_term, public_only=False)
     
     # Status filter
     status_filter = request.GET.get('status', 'all')
@@ -242,89 +381,45 @@ def moderator_dashboard(request):
     if role_filter != 'all':
         talents = talents.filter(role=role_filter)
     
-    # Handle approve/reject actions
+    # Handle approve/reject actions (same write path as the bulk endpoint)
     if request.method == 'POST':
         talent_id = request.POST.get('talent_id')
         action = request.POST.get('action')
         
-        if talent_id and action:
-            talent = get_object_or_404(TalentProfile, pk=talent_id)
+        if talent_id and action in ('approve', 'reject'):
+            talent = get_object_or_404(TalentProfile.objects.only('public_id'), pk=talent_id)
+            outcomes = moderation.moderate([talent.pk], action, request.user)
             
-            if action == 'approve':
-                talent.status = 'approved'
-                talent.is_publicly_visible = True
-                talent.last_approved_at = timezone.now()
-                talent.approved_by = request.user
-                talent.save()
-                
-                # Record the approval in update history
-                ProfileUpdateHistory.objects.create(
-                    talent=talent,
-                    updated_by=request.user,
-                    previous_status='pending',
-                    new_status='approved',
-                    changes_summary="Profile approved and made publicly visible"
-                )
-                
+            if 'approved' in outcomes:
                 messages.success(request, f'Profile {talent.public_id} has been approved and is now publicly visible.')
-            
-            elif action == 'reject':
-                # Check if this was an update to an approved profile
-                update_history = ProfileUpdateHistory.objects.filter(
-                    talent=talent,
-                    previous_status='approved',
-                    new_status='pending_review'
-                ).order_by('-updated_at').first()
-                
-                if update_history:
-                    # This was an update to an approved profile - revert changes
-                    talent.status = 'approved'
-                    talent.is_publicly_visible = True
-                    talent.save()
-                    
-                    # Record the rejection in update history
-                    ProfileUpdateHistory.objects.create(
-                        talent=talent,
-                        updated_by=request.user,
-                        previous_status='pending_review',
-                        new_status='approved',
-                        changes_summary="Profile update rejected - reverted to previous version"
-                    )
-                    
-                    messages.success(request, f'Profile update for {talent.public_id} has been rejected. The previous version remains visible.')
-                else:
-                    # This was a new profile - reject and hide
-                    talent.status = 'rejected'
-                    talent.is_publicly_visible = False
-                    talent.save()
-                    
-                    # Record the rejection in update history
-                    ProfileUpdateHistory.objects.create(
-                        talent=talent,
-                        updated_by=request.user,
-                        previous_status='pending',
-                        new_status='rejected',
-                        changes_summary="Profile rejected"
-                    )
-                    
-                    messages.success(request, f'Profile {talent.public_id} has been rejected.')
-    
-    # Calculate stats
-    stats = {
-        'total': TalentProfile.objects.count(),
-        'pending': TalentProfile.objects.filter(status='pending').count(),
-        'approved': TalentProfile.objects.filter(status='approved').count(),
-        'rejected': TalentProfile.objects.filter(status='rejected').count(),
-        'public': TalentProfile.objects.filter(is_publicly_visible=True).count(),
-    }
+            elif 'reverted' in outcomes:
+                messages.success(request, f'Profile update for {talent.public_id} has been rejected. The previous version remains visible.')
+            elif 'rejected' in outcomes:
+                messages.success(request, f'Profile {talent.public_id} has been rejected.')
+            else:
+                messages.info(request, f'Profile {talent.public_id} was not changed: it is already {action}d or claimed by another moderator.')
+        
+    # Stats come from the counters kept by the moderation paths (see talents/facets.py)
+    stats = facets.moderation_stats()
     
     # Get filter choices
     registration_types = TalentProfile.REGISTRATION_TYPE_CHOICES
     gender_choices = TalentProfile.GENDER_CHOICES
     talent_roles = TalentProfile.TALENT_ROLES
     
+    # Cursor pagination on (created_at, id), or relevance when searching
+    keys = ('search_rank', 'id') if search_term else ('created_at', 'id')
+    page = KeysetPaginator(
+        talents,
+        keys=keys,
+        per_page=getattr(settings, 'MODERATOR_PAGE_SIZE', 50)
+    ).get_page(request.GET)
+    
     context = {
-        'talents': talents,
+        'talents': revisions.attach_pending(page.object_list),
+        'page': page,
+        'last_event_id': events.latest_id(),
+        'events_poll_seconds': events.poll_interval(),
         'search_term': search_term,
         'status_filter': status_filter,
         'registration_type_filter': registration_type_filter,
@@ -337,6 +432,78 @@ def moderator_dashboard(request):
     }
     return render(request, 'talents/moderator_dashboard.html', context)
 
+@staff_member_required
+def moderator_queue(request):
+    """Work queue handing each moderator their own batch of pending profiles"""
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        if action == 'claim':
+            leased = queue.claim(request.user)
+            if not leased:
+                messages.info(request, _('No pending profiles are waiting in the queue.'))
+        elif action == 'release':
+            released = queue.release(request.user)
+            messages.success(request, f'{released} profiles returned to the queue.')
+        return redirect('moderator_queue')
+    
+    leases = list(queue.held(request.user).select_related('talent__user'))
+    revisions.attach_pending(lease.talent for lease in leases)
+    context = {
+        'leases': leases,
+        'batch_size': queue.batch_size(),
+        'moderator_stats': queue.moderator_stats(),
+        'stats': facets.moderation_stats(),
+    }
+    return render(request, 'talents/moderator_queue.html', context)
+
+def _is_staff(request):
+    return request.user.is_active and request.user.is_staff
+
+async def moderator_events(request):
+    """Server-Sent Events stream of submissions and moderation decisions (JSON batches with ?poll=1)"""
+    if not await sync_to_async(_is_staff)(request):
+        return redirect_to_login(request.get_full_path(), reverse('admin:login'))
+    # Resume after the last event the browser saw, or the one the page was rendered with
+    try:
+        last_id = int(request.headers.get('Last-Event-ID') or request.GET['after'])
+    except (KeyError, ValueError):
+        last_id = await sync_to_async(events.latest_id)()
+    if request.GET.get('poll'):
+        return JsonResponse(await sync_to_async(events.poll)(last_id))
+    if not isinstance(request, ASGIRequest):
+        # A stream would hold a sync worker for its whole duration: the dashboard polls instead
+        return HttpResponse(status=204)
+    response = StreamingHttpResponse(events.stream(last_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@staff_member_required
+@require_POST
+def moderator_bulk(request):
+    """Apply one moderation action to many profiles in a single transaction"""
+    action = request.POST.get('action')
+    wants_json = request.accepts('application/json') and not request.accepts('text/html')
+    try:
+        ids = [int(pk) for pk in request.POST.getlist('talent_ids')]
+        outcomes = moderation.moderate(ids, action, request.user)
+    except (ValueError, moderation.ModerationError) as exc:
+        if wants_json:
+            return JsonResponse({'error': str(exc)}, status=400)
+        messages.error(request, _('Invalid bulk moderation request.'))
+        return redirect('moderator_dashboard')
+    
+    changed = sum(len(pks) for pks in outcomes.values())
+    if wants_json:
+        return JsonResponse({'action': action, 'requested': len(set(ids)), 'changed': changed, 'outcomes': outcomes})
+    
+    messages.success(request, f'{changed} of {len(set(ids))} selected profiles updated ({action.replace("_", " ")}).')
+    next_url = request.POST.get('next')
+    if next_url and url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}, require_https=request.is_secure()):
+        return HttpResponseRedirect(next_url)
+    return redirect('moderator_dashboard')
+
 def register(request):
     """User registration with support for personal and group registrations"""
     try:
@@ -372,22 +539,31 @@ def register(request):
                 first_name = group_name
                 last_name = "Group"
             
-            # Create user
-            user = User.objects.create_user(
-                username=email,
-                email=email,
-                password=password1,
-                first_name=first_name,
-                last_name=last_name
-            )
+            # Create user and profile together: a failed profile leaves no account behind
+            with transaction.atomic():
+                user = User.objects.create_user(
+                    username=email,
+                    email=email,
+                    password=password1,
+                    first_name=first_name,
+                    last_name=last_name
+                )
             
-            # Create talent profile with registration type
-            talent_profile = TalentProfile.objects.create(
-                user=user,
-                registration_type=registration_type,
-                group_name=group_name if registration_type == 'group' else None,
-                email_private=email
-            )
+                # Create talent profile with registration type
+                talent_profile = TalentProfile.objects.create(
+                    user=user,
+                    registration_type=registration_type,
+                    group_name=group_name if registration_type == 'group' else None,
+                    email_private=email
+                )
+                ProfileUpdateHistory.objects.create(
+                    talent=talent_profile,
+                    updated_by=user,
+                    previous_status='pending',
+                    new_status='pending',
+                    event='submitted',
+                    changes_summary="Account registered"
+                )
             
             # Log user in
             login(request, user)
@@ -418,9 +594,8 @@ def set_language(request):
         if language in [lang[0] for lang in settings.LANGUAGES]:
             # Activate the language for this request
             translation.activate(language)
-            # Store the language preference in session
-            request.session['django_language'] = language
-            # Also set the language cookie for better persistence
+            # LocaleMiddleware reads the preference from the cookie alone,
+            # so the session is left untouched
             response = HttpResponseRedirect(request.META.get('HTTP_REFERER', '/'))
             response.set_cookie(settings.LANGUAGE_COOKIE_NAME, language)
             return response